@@ -4,7 +4,7 @@ Clean FastAPI Application for Document Ingestion Pipeline
 Simple API for document upload and processing
 """
 
-import os
+import asyncio
 import sys
 import logging
 import shutil
@@ -17,12 +17,17 @@ from uuid import uuid4
 parent_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(parent_dir))
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Query
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-from complete_ingestion_pipeline import CompleteIngestionPipeline
+from hyperparameters import IngestionHyperparameters
+from pipeline.utils.config import Config
+from pipeline.utils.job_store import ACTIVE_STATUSES, create_job_store
+from pipeline.utils.openai_gateway import get_all_statistics as get_openai_statistics
+from api.worker import create_pipeline
+from api.worker_pool import IngestionWorkerPool
 
 # Configure logging
 logging.basicConfig(
@@ -50,7 +55,8 @@ app.add_middleware(
 
 # Global pipeline instance
 pipeline = None
-processing_jobs = {}
+worker_pool = None
+job_store = None
 
 # Pydantic models
 class ProcessingStatus(BaseModel):
@@ -75,37 +81,47 @@ class ProcessingResult(BaseModel):
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize the pipeline on startup"""
-    global pipeline
+    """Open the job store and, unless workers run as separate processes, start the worker pool"""
+    global pipeline, worker_pool, job_store
     
     try:
-        # Initialize pipeline
-        config = {
-            "azure_openai_endpoint": os.getenv("AZURE_OPENAI_ENDPOINT"),
-            "azure_openai_api_key": os.getenv("AZURE_OPENAI_API_KEY"),
-            "azure_openai_api_version": os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview"),
-            "azure_search_endpoint": os.getenv("AZURE_SEARCH_ENDPOINT"),
-            "azure_search_api_key": os.getenv("AZURE_SEARCH_API_KEY"),
-            "azure_search_index_name": os.getenv("AZURE_SEARCH_INDEX_NAME", "fundae-knowledgebase"),
-            "azure_storage_connection_string": os.getenv("AZURE_STORAGE_CONNECTION_STRING"),
-            "azure_storage_container_name": os.getenv("AZURE_STORAGE_CONTAINER_NAME", "knowledgebase")
-        }
+        # Jobs live in a durable store so they survive restarts and are shared by every API and worker process
+        job_store = create_job_store()
         
-        pipeline = CompleteIngestionPipeline(config)
-        logger.info("Pipeline initialized successfully")
+        if Config.API_EMBEDDED_WORKERS:
+            pipeline = create_pipeline()
+            logger.info("Pipeline initialized successfully")
+            
+            # Jobs run in a worker pool so that processing never blocks the event loop
+            worker_pool = IngestionWorkerPool(pipeline, job_store)
+            worker_pool.start()
+        else:
+            logger.info("Embedded workers disabled, jobs are served by api/worker.py processes")
         
     except Exception as e:
         logger.error(f"Failed to initialize pipeline: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the worker pool (running jobs go back to the queue) and close the job store"""
+    if worker_pool is not None:
+        await asyncio.to_thread(worker_pool.shutdown)
+    if job_store is not None:
+        job_store.close()
+
 @app.get("/health")
-async def health_check():
+def health_check():
     """Health check endpoint"""
     try:
         return {
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
-            "pipeline_ready": pipeline is not None
+            "pipeline_ready": job_store is not None and (pipeline is not None or not Config.API_EMBEDDED_WORKERS),
+            "jobs": job_store.get_statistics() if job_store else None,
+            "workers": worker_pool.get_statistics() if worker_pool else None,
+            "embedding": pipeline.pipeline.embedding_service.get_usage() if pipeline else None,
+            "openai": get_openai_statistics()
         }
     except Exception as e:
         return {
@@ -114,17 +130,41 @@ async def health_check():
             "timestamp": datetime.now().isoformat()
         }
 
+def _queue_full_error() -> HTTPException:
+    """429 telling the client to retry once the queue has drained"""
+    return HTTPException(
+        status_code=429,
+        detail="Too many documents are being processed, please retry later",
+        headers={"Retry-After": str(IngestionHyperparameters.UPLOAD_RETRY_AFTER)}
+    )
+
+def _save_upload(source, file_path: Path):
+    """Copy the uploaded file to disk"""
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+
+def _get_job(job_id: str) -> Dict[str, Any]:
+    """Get a job from the store or raise 404"""
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 @app.post("/upload", response_model=ProcessingStatus)
 async def upload_document(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     force_reprocess: bool = Query(False, description="Force reprocessing even if file exists in storage")
 ):
     """Upload and process a document"""
     
-    if pipeline is None:
+    if job_store is None:
         raise HTTPException(status_code=500, detail="Pipeline not initialized")
     
+    # Backpressure: reject before reading the upload when no queue slot is free
+    queue_size = IngestionHyperparameters.MAX_CONCURRENT_UPLOADS
+    if await asyncio.to_thread(job_store.count_jobs, "queued") >= queue_size:
+        raise _queue_full_error()
+    
     # Validate file type
     allowed_extensions = ['.pdf', '.docx', '.doc', '.pptx', '.ppt', '.txt', '.md', '.markdown']
     file_ext = Path(file.filename).suffix.lower()
@@ -145,103 +185,33 @@ async def upload_document(
     # Save uploaded file with unique local name but preserve original name for blob storage
     clean_filename = file.filename
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    local_filename = f"{timestamp}_{clean_filename}"
+    local_filename = f"{timestamp}_{job_id[:8]}_{clean_filename}"
     file_path = uploads_dir / local_filename
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await asyncio.to_thread(_save_upload, file.file, file_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
     
-    # Initialize job status
-    processing_jobs[job_id] = {
-        "job_id": job_id,
-        "status": "processing",
-        "filename": clean_filename,
-        "file_path": str(file_path),
-        "progress": {
-            "step": "uploaded",
-            "message": "File uploaded successfully"
-        },
-        "created_at": datetime.now().isoformat(),
-        "updated_at": datetime.now().isoformat(),
-        "result": None
-    }
-    
-    # Start background processing
-    background_tasks.add_task(
-        process_document_background,
-        job_id=job_id,
-        file_path=str(file_path),
-        original_filename=clean_filename,
-        force_reprocess=force_reprocess
+    # Queue for processing (the store re-checks the queue size atomically)
+    job = await asyncio.to_thread(
+        job_store.enqueue, job_id, clean_filename, str(file_path.resolve()), force_reprocess, queue_size
     )
+    if job is None:
+        file_path.unlink(missing_ok=True)
+        raise _queue_full_error()
     
-    return ProcessingStatus(**processing_jobs[job_id])
-
-async def process_document_background(job_id: str, file_path: str, original_filename: str, force_reprocess: bool):
-    """Background task to process document"""
-    
-    try:
-        # Update status to processing
-        processing_jobs[job_id]["status"] = "processing"
-        processing_jobs[job_id]["progress"] = {
-            "step": "processing",
-            "message": "Processing document..."
-        }
-        processing_jobs[job_id]["updated_at"] = datetime.now().isoformat()
-        
-        # Process the document with original filename for blob storage
-        result = pipeline.process_file_with_storage_check(
-            file_path=file_path,
-            original_filename=original_filename,
-            force_reprocess=force_reprocess,
-            save_outputs=True,
-            auto_cleanup=True
-        )
-        
-        # Update job with result
-        processing_jobs[job_id]["status"] = "completed" if result.get("success") else "failed"
-        processing_jobs[job_id]["result"] = result
-        processing_jobs[job_id]["updated_at"] = datetime.now().isoformat()
-        
-        if result.get("success"):
-            processing_jobs[job_id]["progress"] = {
-                "step": "completed",
-                "message": "Document processed successfully"
-            }
-        else:
-            processing_jobs[job_id]["progress"] = {
-                "step": "failed",
-                "message": result.get("error", "Processing failed")
-            }
-            
-    except Exception as e:
-        logger.error(f"Error processing document {filename}: {e}")
-        processing_jobs[job_id]["status"] = "failed"
-        processing_jobs[job_id]["result"] = {"success": False, "error": str(e)}
-        processing_jobs[job_id]["progress"] = {
-            "step": "failed",
-            "message": f"Processing error: {str(e)}"
-        }
-        processing_jobs[job_id]["updated_at"] = datetime.now().isoformat()
+    return ProcessingStatus(**job)
 
 @app.get("/status/{job_id}", response_model=ProcessingStatus)
-async def get_processing_status(job_id: str):
+def get_processing_status(job_id: str):
     """Get processing status for a job"""
-    if job_id not in processing_jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
-    
-    return ProcessingStatus(**processing_jobs[job_id])
+    return ProcessingStatus(**_get_job(job_id))
 
 @app.get("/results/{job_id}", response_model=ProcessingResult)
-async def get_processing_results(job_id: str):
+def get_processing_results(job_id: str):
     """Get processing results for a job"""
-    if job_id not in processing_jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
-    
-    job = processing_jobs[job_id]
-    result = job.get("result", {})
+    job = _get_job(job_id)
+    result = job.get("result") or {}
     
     return ProcessingResult(
         success=result.get("success", False),
@@ -257,8 +227,12 @@ async def get_processing_results(job_id: str):
     )
 
 @app.get("/jobs")
-async def list_jobs():
-    """List all processing jobs"""
+def list_jobs(
+    offset: int = Query(0, ge=0, description="Number of jobs to skip"),
+    limit: int = Query(50, ge=1, le=IngestionHyperparameters.JOB_LIST_MAX_LIMIT, description="Page size"),
+    status: Optional[str] = Query(None, description="Only jobs with this status")
+):
+    """List processing jobs, newest first, one page at a time"""
     return {
         "jobs": [
             {
@@ -268,19 +242,32 @@ async def list_jobs():
                 "created_at": job["created_at"],
                 "updated_at": job["updated_at"]
             }
-            for job in processing_jobs.values()
+            for job in job_store.list_jobs(offset=offset, limit=limit, status=status)
         ],
-        "total": len(processing_jobs)
+        "total": job_store.count_jobs(status),
+        "offset": offset,
+        "limit": limit
     }
 
+@app.post("/jobs/{job_id}/cancel", response_model=ProcessingStatus)
+def cancel_job(job_id: str):
+    """Cancel a queued or running job (a running job stops before uploading, or removes the chunks it already streamed)"""
+    job = _get_job(job_id)
+    if job["status"] not in ACTIVE_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    
+    # Queued jobs are cancelled at once; running ones are stopped by their worker's next heartbeat
+    return ProcessingStatus(**job_store.request_cancel(job_id))
+
 @app.delete("/jobs/{job_id}")
-async def delete_job(job_id: str):
-    """Delete a processing job"""
-    if job_id not in processing_jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
+def delete_job(job_id: str):
+    """Delete a processing job, cancelling it if it has not finished"""
+    job = _get_job(job_id)
     
-    # Remove job from memory
-    del processing_jobs[job_id]
+    # A deleted job loses its lease, which stops the worker running it
+    if job["status"] in ACTIVE_STATUSES:
+        job_store.request_cancel(job_id)
+    job_store.delete_job(job_id)
     
     return {"message": "Job deleted successfully"}
 
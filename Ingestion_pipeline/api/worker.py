@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Ingestion Worker
+Standalone process that serves jobs from the shared job store, so several processes can run behind one API
+"""
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+from pathlib import Path
+
+# Add parent directory to path
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from complete_ingestion_pipeline import CompleteIngestionPipeline
+from pipeline.utils.job_store import create_job_store
+from api.worker_pool import IngestionWorkerPool
+
+logger = logging.getLogger(__name__)
+
+def create_pipeline() -> CompleteIngestionPipeline:
+    """Create the ingestion pipeline from environment variables"""
+    config = {
+        "azure_openai_endpoint": os.getenv("AZURE_OPENAI_ENDPOINT"),
+        "azure_openai_api_key": os.getenv("AZURE_OPENAI_API_KEY"),
+        "azure_openai_api_version": os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview"),
+        "azure_search_endpoint": os.getenv("AZURE_SEARCH_ENDPOINT"),
+        "azure_search_api_key": os.getenv("AZURE_SEARCH_API_KEY"),
+        "azure_search_index_name": os.getenv("AZURE_SEARCH_INDEX_NAME", "fundae-knowledgebase"),
+        "azure_storage_connection_string": os.getenv("AZURE_STORAGE_CONNECTION_STRING"),
+        "azure_storage_container_name": os.getenv("AZURE_STORAGE_CONTAINER_NAME", "knowledgebase")
+    }
+    return CompleteIngestionPipeline(config)
+
+def main():
+    """Run a worker pool until SIGINT/SIGTERM"""
+    parser = argparse.ArgumentParser(description="Serve ingestion jobs from the shared job store")
+    parser.add_argument("--workers", type=int, help="Jobs processed at once (default: MAX_CONCURRENT_UPLOADS)")
+    parser.add_argument("--extraction-processes", type=int,
+                        help="Worker processes for content extraction (default: EXTRACTION_PROCESSES)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    store = create_job_store()
+    worker_pool = IngestionWorkerPool(
+        create_pipeline(),
+        store,
+        max_workers=args.workers,
+        extraction_processes=args.extraction_processes
+    )
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    worker_pool.start()
+    print(f"🚀 Ingestion worker {worker_pool.worker_id} serving {store.get_statistics()['path']}")
+    stop.wait()
+
+    print("🛑 Stopping, running jobs go back to the queue...")
+    worker_pool.shutdown()
+    store.close()
+
+if __name__ == "__main__":
+    main()
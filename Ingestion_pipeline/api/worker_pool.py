@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Ingestion Worker Pool
+Leases upload jobs from the job store: content extraction in worker processes, the rest in worker threads
+"""
+
+import logging
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+from uuid import uuid4
+
+from pipeline import ProcessingCancelled
+from pipeline.extraction_pool import ExtractionPool
+from pipeline.utils.job_store import JobStore
+from hyperparameters import IngestionHyperparameters
+
+logger = logging.getLogger(__name__)
+
+# Bulky result fields that are dropped before the result is written to the job store
+BULKY_RESULT_FIELDS = ('text_content', 'visual_elements', 'image_analyses', 'chunks')
+
+def summarize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a pipeline result to what the job store keeps (counts instead of content)"""
+    summary = {key: value for key, value in result.items() if key not in BULKY_RESULT_FIELDS}
+    if 'chunks' in result:
+        summary.setdefault('chunks_created', len(result['chunks']))
+    if 'image_analyses' in result:
+        summary.setdefault('images_analyzed', len(result['image_analyses']))
+    return summary
+
+class IngestionWorkerPool:
+    """Worker threads that lease jobs from a shared job store, with a process pool for CPU-bound extraction"""
+
+    def __init__(self, pipeline, store: JobStore, max_workers: Optional[int] = None,
+                 extraction_processes: Optional[int] = None, worker_id: Optional[str] = None):
+        """
+        Initialize the worker pool
+
+        Args:
+            pipeline: CompleteIngestionPipeline shared by the worker threads
+            store: Job store to lease jobs from
+            max_workers: Jobs processed at once (defaults to MAX_CONCURRENT_UPLOADS)
+            extraction_processes: Worker processes for content extraction (defaults to EXTRACTION_PROCESSES)
+            worker_id: Lease owner name (defaults to host:pid:random)
+        """
+        self.pipeline = pipeline
+        self.store = store
+        self.max_workers = max_workers or IngestionHyperparameters.MAX_CONCURRENT_UPLOADS
+        self.extraction_processes = extraction_processes or IngestionHyperparameters.EXTRACTION_PROCESSES
+        # Cores left over by the extraction processes go to sharding large PDFs by page
+        self.pdf_shard_processes = max(1, (os.cpu_count() or 1) // self.extraction_processes)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+        self.lease_seconds = IngestionHyperparameters.JOB_LEASE_SECONDS
+        self.heartbeat_seconds = IngestionHyperparameters.JOB_HEARTBEAT_SECONDS
+        self.max_attempts = IngestionHyperparameters.JOB_MAX_ATTEMPTS
+        self.poll_seconds = IngestionHyperparameters.JOB_POLL_SECONDS
+
+        self._cancel_events = {}  # job_id -> Event, for running jobs
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._process_pool = None
+
+        # Metrics
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.leases_lost = 0
+
+    def start(self):
+        """Start the extraction processes, worker threads and heartbeat thread"""
+        self._stopping.clear()
+        self._process_pool = ExtractionPool(self.extraction_processes, self.pdf_shard_processes)
+        for i in range(self.max_workers):
+            thread = threading.Thread(target=self._worker, name=f"ingestion-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat, name="ingestion-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        logger.info(f"Ingestion worker pool {self.worker_id} started: {self.max_workers} workers, "
+                    f"{self.extraction_processes} extraction processes")
+
+    def _worker(self):
+        """Worker thread loop: lease a job, run it, repeat"""
+        while not self._stopping.is_set():
+            try:
+                job = self.store.lease_next(self.worker_id, self.lease_seconds, self.max_attempts)
+            except Exception as e:
+                logger.error(f"Could not lease a job: {e}")
+                job = None
+            if job is None:
+                self._stopping.wait(self.poll_seconds)
+                continue
+            try:
+                self._run_job(job)
+            except Exception as e:
+                logger.error(f"Unexpected error in ingestion worker: {e}")
+
+    def _heartbeat(self):
+        """Renew the leases of running jobs and pass on cancellations requested through the store"""
+        while not self._stopping.wait(self.heartbeat_seconds):
+            with self._lock:
+                running = dict(self._cancel_events)
+            if not running:
+                continue
+            try:
+                leased = self.store.heartbeat(running.keys(), self.worker_id, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Lease heartbeat failed: {e}")
+                continue
+            for job_id, cancel_event in running.items():
+                if job_id not in leased:
+                    # Deleted, or requeued for another worker after a stall: stop before uploading twice
+                    logger.warning(f"Lost the lease on job {job_id}, stopping it")
+                    with self._lock:
+                        self.leases_lost += 1
+                    cancel_event.set()
+                elif leased[job_id] and not cancel_event.is_set():
+                    logger.info(f"Cancellation requested for job {job_id}")
+                    cancel_event.set()
+
+    def _run_job(self, job: Dict[str, Any]):
+        """Process one leased job and record its outcome"""
+        job_id = job['job_id']
+        cancel_event = threading.Event()
+        with self._lock:
+            self._cancel_events[job_id] = cancel_event
+        if job['attempts'] > 1:
+            logger.info(f"Retrying job {job_id} (attempt {job['attempts']})")
+
+        try:
+            result = self.pipeline.process_file_with_storage_check(
+                file_path=job['file_path'],
+                original_filename=job['filename'],
+                force_reprocess=job['force_reprocess'],
+                save_outputs=True,
+                auto_cleanup=True,
+                extract=lambda path: self._extract(path, cancel_event),
+                cancel_event=cancel_event,
+                progress=lambda step, message: self._report_progress(job_id, step, message)
+            )
+        except ProcessingCancelled:
+            result = {'success': False, 'cancelled': True, 'error': 'Processing cancelled'}
+        except Exception as e:
+            logger.error(f"Error processing job {job_id}: {e}")
+            result = {'success': False, 'error': str(e)}
+
+        if result.get('cancelled'):
+            status, message = 'cancelled', "Processing cancelled"
+        elif result.get('success'):
+            status, message = 'completed', "Document processed successfully"
+        else:
+            status, message = 'failed', result.get('error', "Processing failed")
+
+        with self._lock:
+            self._cancel_events.pop(job_id, None)
+            if status == 'completed':
+                self.completed += 1
+            elif status == 'cancelled':
+                self.cancelled += 1
+            else:
+                self.failed += 1
+
+        try:
+            if status == 'cancelled' and self._stopping.is_set():
+                # Interrupted by shutdown rather than by a user: another worker picks it up
+                self.store.release(job_id, self.worker_id)
+            elif not self.store.finish(job_id, self.worker_id, status, message, summarize_result(result)):
+                logger.warning(f"Job {job_id} finished as {status} after its lease was lost")
+        except Exception as e:
+            # The lease expires and the job is retried
+            logger.error(f"Could not record the outcome of job {job_id}: {e}")
+
+    def _report_progress(self, job_id: str, step: str, message: str):
+        """Record the stage a running job has reached in the job store"""
+        try:
+            self.store.update_progress(job_id, self.worker_id, step, message)
+        except Exception as e:
+            # Only the status shown to clients is stale; the job carries on
+            logger.warning(f"Could not record progress of job {job_id}: {e}")
+
+    def _extract(self, file_path: Path, cancel_event: threading.Event) -> Dict[str, Any]:
+        """Run content extraction in a worker process, giving up early if the job is cancelled"""
+        return self._process_pool.extract(file_path, cancel_event)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get worker pool statistics"""
+        with self._lock:
+            running = len(self._cancel_events)
+        return {
+            'worker_id': self.worker_id,
+            'workers': self.max_workers,
+            'extraction_processes': self.extraction_processes,
+            'running': running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'cancelled': self.cancelled,
+            'leases_lost': self.leases_lost
+        }
+
+    def shutdown(self):
+        """
+        Stop leasing and stop the workers
+
+        Running jobs are interrupted and given back to the queue; a process killed before it
+        gets here leaves leases that expire, and those jobs are retried by another worker.
+        """
+        self._stopping.set()
+        with self._lock:
+            for cancel_event in self._cancel_events.values():
+                cancel_event.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        logger.info(f"Ingestion worker pool {self.worker_id} stopped")
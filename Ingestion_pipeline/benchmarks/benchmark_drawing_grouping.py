@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Drawing Grouping Benchmark
+Compares grid/union-find drawing grouping with the previous pairwise seed grouping on synthetic pages
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fitz  # PyMuPDF
+
+from hyperparameters import IngestionHyperparameters
+from pipeline.extractors.pdf_extractor import PDFExtractor
+
+def _make_drawings(count: int, seed: int, scatter: float):
+    """Drawings as page.get_drawings() returns them: clustered diagram strokes plus scattered rules and marks"""
+    rng = random.Random(seed)
+    width, height = 612, 792
+    centers = [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(max(1, count // 200))]
+    drawings = []
+    for _ in range(count):
+        if rng.random() >= scatter:
+            # Stroke of a diagram around one of the cluster centers
+            cx, cy = rng.choice(centers)
+            x, y = rng.gauss(cx, 25), rng.gauss(cy, 25)
+        else:
+            x, y = rng.uniform(0, width), rng.uniform(0, height)
+        w, h = rng.uniform(0.5, 12), rng.uniform(0.5, 12)
+        drawings.append({'rect': fitz.Rect(x, y, x + w, y + h)})
+    return drawings
+
+def _seed_grouping(drawings, threshold):
+    """The previous O(n²) grouping: each ungrouped drawing collects the ungrouped drawings close to it"""
+    groups, used = [], set()
+    for i, drawing in enumerate(drawings):
+        if i in used:
+            continue
+        group = [drawing]
+        used.add(i)
+        r1 = drawing['rect']
+        c1 = ((r1[0] + r1[2]) / 2, (r1[1] + r1[3]) / 2)
+        for j, other in enumerate(drawings):
+            if j in used:
+                continue
+            r2 = other['rect']
+            c2 = ((r2[0] + r2[2]) / 2, (r2[1] + r2[3]) / 2)
+            if ((c1[0] - c2[0]) ** 2 + (c1[1] - c2[1]) ** 2) ** 0.5 < threshold:
+                group.append(other)
+                used.add(j)
+        groups.append(group)
+    return groups
+
+def _pairwise_linkage(drawings, threshold):
+    """Reference single-linkage grouping by comparing every pair (for checking results)"""
+    parent = list(range(len(drawings)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    centers = [((d['rect'][0] + d['rect'][2]) / 2, (d['rect'][1] + d['rect'][3]) / 2) for d in drawings]
+    for i, (x1, y1) in enumerate(centers):
+        for j in range(i):
+            x2, y2 = centers[j]
+            if (x1 - x2) ** 2 + (y1 - y2) ** 2 < threshold ** 2:
+                parent[find(i)] = find(j)
+    return {frozenset(i for i in range(len(drawings)) if find(i) == root) for root in set(map(find, range(len(drawings))))}
+
+def _partition(groups, drawings):
+    index = {id(d): i for i, d in enumerate(drawings)}
+    return {frozenset(index[id(d)] for d in group) for group in groups}
+
+def _time(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark drawing grouping on synthetic pages")
+    parser.add_argument("--drawings", type=int, nargs="+", default=[1000, 5000, 10000],
+                        help="Drawings per synthetic page")
+    parser.add_argument("--threshold", type=float, default=IngestionHyperparameters.PDF_DRAWING_PROXIMITY,
+                        help="Proximity threshold (default: PDF_DRAWING_PROXIMITY)")
+    parser.add_argument("--check-max", type=int, default=5000,
+                        help="Largest page whose groups are checked against pairwise single linkage")
+    parser.add_argument("--scatter", type=float, default=0.1,
+                        help="Fraction of drawings scattered over the page instead of clustered")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+
+    extractor = PDFExtractor.__new__(PDFExtractor)  # grouping needs no temp directory or pool
+    print(f"🚀 Grouping synthetic drawings, proximity threshold {args.threshold}")
+    print("=" * 60)
+    for count in args.drawings:
+        drawings = _make_drawings(count, args.seed, args.scatter)
+        grid_time, groups = _time(extractor._group_drawings_by_proximity, drawings, args.threshold)
+        seed_time, seed_groups = _time(_seed_grouping, drawings, args.threshold)
+        print(f"   - {count} drawings: grid {grid_time * 1000:.1f} ms ({len(groups)} groups), "
+              f"pairwise {seed_time * 1000:.0f} ms ({len(seed_groups)} groups), "
+              f"speedup {seed_time / grid_time:.0f}x")
+        if count <= args.check_max:
+            same = _partition(groups, drawings) == _pairwise_linkage(drawings, args.threshold)
+            print(f"     groups match pairwise single linkage: {'✅' if same else '❌'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Embedding Micro-Batching Benchmark
+Compares per-document embedding requests with the shared micro-batcher for many small concurrent documents
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_azure_openai import FakeAzureOpenAIServer
+
+def _make_documents(count: int, max_chunks: int):
+    """Build small documents of 1..max_chunks chunks, like a stream of TXT/MD uploads"""
+    rng = random.Random(42)
+    return [
+        [{'content': f"Document {d} chunk {c}. " + "Lorem ipsum dolor sit amet. " * rng.randint(5, 35)}
+         for c in range(rng.randint(1, max_chunks))]
+        for d in range(count)
+    ]
+
+def _run(service, documents, concurrency: int) -> float:
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(service.generate_embeddings, [[dict(chunk) for chunk in doc] for doc in documents]))
+    return time.time() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cross-document embedding micro-batching")
+    parser.add_argument("--documents", type=int, default=200, help="Number of small documents")
+    parser.add_argument("--max-chunks", type=int, default=3, help="Maximum chunks per document")
+    parser.add_argument("--concurrency", type=int, default=16, help="Documents embedded at once")
+    parser.add_argument("--latency", type=float, default=0.15, help="Simulated embedding latency (seconds)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 429")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="Retry-After sent with throttled responses")
+    args = parser.parse_args()
+
+    with FakeAzureOpenAIServer(embedding_latency=args.latency, embedding_dimension=256,
+                               throttle_rate=args.throttle_rate, retry_after=args.retry_after) as server:
+        os.environ['AZURE_OPENAI_ENDPOINT'] = server.endpoint
+        os.environ['AZURE_OPENAI_API_KEY'] = "fake"
+        from pipeline.services.embedding_service import EmbeddingService
+
+        documents = _make_documents(args.documents, args.max_chunks)
+        texts = sum(len(doc) for doc in documents)
+        print(f"🚀 Embedding {args.documents} documents ({texts} chunks), {args.concurrency} at a time, "
+              f"simulated latency {args.latency}s, {args.throttle_rate:.0%} throttled")
+        print("=" * 60)
+
+        service = EmbeddingService()
+        service.cache = None  # measure requests, not cache hits
+        service.stop_batching()
+        before = server.request_counts['embeddings']
+        unbatched = _run(service, documents, args.concurrency)
+        unbatched_requests = server.request_counts['embeddings'] - before
+        print(f"   - Per-document: {unbatched:.2f}s, {unbatched_requests} requests")
+
+        service = EmbeddingService()
+        service.cache = None
+        service.start_batching()
+        before = server.request_counts['embeddings']
+        batched = _run(service, documents, args.concurrency)
+        batched_requests = server.request_counts['embeddings'] - before
+        usage = service.get_usage()
+        stats = usage['batching']
+        service.stop_batching()
+        print(f"   - Micro-batched: {batched:.2f}s, {batched_requests} requests")
+        print(f"   - Speedup:       {unbatched / batched:.1f}x, {unbatched_requests / max(batched_requests, 1):.1f}x fewer requests")
+        print(f"   - Packing:       {stats['average_batch_size']:.1f} texts/request ({stats['item_fill']:.0%} of "
+              f"the item limit, {stats['cost_fill']:.0%} of the token limit), "
+              f"avg wait {stats['average_wait_ms']:.0f}ms")
+        print(f"   - Flushed by:    {stats['flush_reasons']}")
+        if 'adaptive' in usage:
+            adaptive = usage['adaptive']
+            print(f"   - Adaptive:      {adaptive['throttled']} throttled, {adaptive['slow_responses']} slow, "
+                  f"ending at {adaptive['batch_size']} texts/{adaptive['batch_tokens']} tokens per request")
+        print(f"   - Tokenizer:     {usage['tokenizer']}")
+
+if __name__ == "__main__":
+    main()
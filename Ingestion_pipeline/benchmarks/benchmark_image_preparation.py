@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Image Preparation Benchmark
+Measures how many extracted images ImagePreparer skips and how many vision upload bytes it saves
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from pipeline.extractors.pdf_extractor import PDFExtractor
+from pipeline.utils.image_preparer import ImagePreparer
+
+def _make_pdf(path: Path, pages: int):
+    """Write a PDF whose pages carry a scanned photo, a logo, a blank fill and a vector diagram"""
+    document = fitz.open()
+    logo = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 24, 24), 0)
+    fill = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 400, 300), 0)
+    for page_num in range(pages):
+        page = document.new_page()
+        page.insert_text((50, 60), f"Section {page_num + 1}", fontsize=14)
+        # Noisy gradient standing in for a full-resolution scan or photograph
+        photo = Image.merge('RGB', [Image.effect_noise((2400, 1800), sigma) for sigma in (20, 30, 40)])
+        photo = Image.blend(photo, Image.linear_gradient('L').resize((2400, 1800)).convert('RGB'), 0.5)
+        page.insert_image(fitz.Rect(50, 80, 350, 305), stream=_png(photo))
+        logo.clear_with(page_num % 256)
+        page.insert_image(fitz.Rect(500, 40, 524, 64), pixmap=logo)
+        fill.clear_with(255)
+        page.insert_image(fitz.Rect(360, 80, 560, 230), pixmap=fill)
+        for i in range(40):
+            x, y = 60 + (i % 20) * 24, 450 + (i // 20) * 24
+            page.draw_rect(fitz.Rect(x, y, x + 18, y + 18), color=(0, 0, 1))
+    document.save(str(path), deflate=True)
+    document.close()
+
+def _png(image: Image.Image) -> bytes:
+    return ImagePreparer._encode(image, 'PNG')
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark image filtering and downscaling before vision analysis")
+    parser.add_argument("--pdf", type=str, help="PDF to extract images from (default: a synthetic one)")
+    parser.add_argument("--pages", type=int, default=10, help="Pages in the synthetic PDF")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(args.pdf) if args.pdf else Path(tmp) / "synthetic_report.pdf"
+        if not args.pdf:
+            _make_pdf(file_path, args.pages)
+        extractor = PDFExtractor(str(Path(tmp) / "images"), shard_processes=1)
+        result = extractor.extract_content(file_path)
+        if not result.get('success'):
+            raise RuntimeError(result.get('error'))
+        elements = result['visual_elements']
+
+        preparer = ImagePreparer()
+        report = preparer.new_report()
+        start = time.perf_counter()
+        preparer.prepare_all(elements, report)
+        elapsed = time.perf_counter() - start
+        extractor.cleanup_temp_files()
+
+    megabyte = 1024 * 1024
+    # Images travel base64-encoded inside the JSON request body
+    sent_before = 4 * -(-report['bytes_in'] // 3)
+    sent_after = 4 * -(-report['bytes_out'] // 3)
+    print(f"🚀 Preparing {report['images']} images from {file_path.name}")
+    print("=" * 60)
+    print(f"   - Skipped: {report['images_skipped']} {report['skip_reasons']}")
+    print(f"   - Vision calls: {report['images']} -> {report['images'] - report['images_skipped']}")
+    print(f"   - Image bytes: {report['bytes_in'] / megabyte:.1f} MB -> {report['bytes_out'] / megabyte:.1f} MB "
+          f"({report['bytes_saved'] / max(report['bytes_in'], 1):.0%} saved)")
+    print(f"   - Request payload: {sent_before / megabyte:.1f} MB -> {sent_after / megabyte:.1f} MB")
+    print(f"   - Preparation time: {elapsed:.2f}s ({elapsed / max(report['images'], 1) * 1000:.0f} ms/image)")
+
+if __name__ == "__main__":
+    main()
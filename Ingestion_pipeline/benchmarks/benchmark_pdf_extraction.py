@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+PDF Extraction Benchmark
+Compares serial and page-sharded PDFExtractor runs on a synthetic large PDF
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fitz  # PyMuPDF
+
+from hyperparameters import IngestionHyperparameters
+from pipeline.extractors.pdf_extractor import PDFExtractor
+
+def _make_pdf(path: Path, pages: int, images_per_page: int, drawings_per_page: int):
+    """Write a PDF whose pages mix text, embedded images and vector drawings, like a scanned manual"""
+    document = fitz.open()
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 400, 300), 0)
+    for page_num in range(pages):
+        page = document.new_page()
+        page.insert_text((50, 60), f"Section {page_num + 1}", fontsize=14)
+        page.insert_textbox(fitz.Rect(50, 80, 550, 300),
+                            " ".join(f"Step {i}: check the valve and record the reading." for i in range(30)),
+                            fontsize=9)
+        for i in range(images_per_page):
+            # Distinct pixels per image so each one is stored (and extracted) separately
+            pixmap.clear_with((page_num * images_per_page + i) % 256)
+            page.insert_image(fitz.Rect(50 + i * 130, 320, 170 + i * 130, 410), pixmap=pixmap)
+        for i in range(drawings_per_page):
+            x, y = 60 + (i % 20) * 24, 450 + (i // 20) * 24
+            page.draw_rect(fitz.Rect(x, y, x + 18, y + 18), color=(0, 0, 1))
+    document.save(str(path), deflate=True)
+    document.close()
+
+def _run(file_path: Path, temp_dir: str, processes: int):
+    extractor = PDFExtractor(temp_dir, shard_processes=processes)
+    if processes > 1:
+        # Start the pool outside the timing: it is kept for every later document
+        extractor._get_shard_pool().submit(os.getpid).result()
+    start = time.time()
+    result = extractor.extract_content(file_path)
+    elapsed = time.time() - start
+    extractor.cleanup_temp_files()
+    if extractor._shard_pool is not None:
+        extractor._shard_pool.shutdown()
+    if not result.get('success'):
+        raise RuntimeError(result.get('error'))
+    return elapsed, result
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Benchmark page-sharded PDF extraction")
+    parser.add_argument("--pages", type=int, default=1000, help="Pages in the synthetic PDF")
+    parser.add_argument("--images", type=int, default=2, help="Embedded images per page")
+    parser.add_argument("--drawings", type=int, default=40, help="Vector drawings per page")
+    parser.add_argument("--processes", type=int, nargs="+",
+                        default=sorted({p for p in (2, 4, 8, cores) if p <= cores}),
+                        help="Process counts to compare against serial extraction")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / "synthetic_manual.pdf"
+        _make_pdf(file_path, args.pages, args.images, args.drawings)
+        temp_dir = str(Path(tmp) / "images")
+
+        print(f"🚀 Extracting a {args.pages}-page PDF ({file_path.stat().st_size / (1024 * 1024):.1f} MB), "
+              f"{cores} cores")
+        print("=" * 60)
+
+        serial, expected = _run(file_path, temp_dir, 1)
+        print(f"   - Serial:      {serial:.2f}s ({args.pages / serial:.0f} pages/s)")
+
+        for processes in args.processes:
+            if processes < 2 or args.pages < IngestionHyperparameters.PDF_SHARD_MIN_PAGES:
+                continue
+            elapsed, result = _run(file_path, temp_dir, processes)
+            same = (result['text_content'] == expected['text_content'] and
+                    [e['id'] for e in result['visual_elements']] == [e['id'] for e in expected['visual_elements']])
+            print(f"   - {processes} processes: {elapsed:.2f}s ({args.pages / elapsed:.0f} pages/s), "
+                  f"speedup {serial / elapsed:.1f}x, efficiency {serial / elapsed / processes:.0%}"
+                  f"{'' if same else ' ⚠️ output differs from serial'}")
+
+if __name__ == "__main__":
+    main()
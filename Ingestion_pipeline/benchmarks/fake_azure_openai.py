@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Fake Azure OpenAI Endpoint
+Local HTTP server emulating chat completion and embedding deployments for benchmarks
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+class FakeAzureOpenAIServer:
+    """Threaded HTTP server that answers Azure OpenAI requests after a simulated latency"""
+
+    def __init__(self, latency: float = 0.5, embedding_latency: float = 0.05,
+                 embedding_dimension: int = 1536, throttle_rate: float = 0.0,
+                 retry_after: float = 1.0, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the fake server
+
+        Args:
+            latency: Seconds to wait before answering a chat completion
+            embedding_latency: Seconds to wait before answering an embedding request
+            embedding_dimension: Dimension of the returned embedding vectors
+            throttle_rate: Fraction of requests answered with HTTP 429
+            retry_after: Retry-After value sent with 429 responses
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        self.latency = latency
+        self.embedding_latency = embedding_latency
+        self.embedding_dimension = embedding_dimension
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+
+        self.request_counts = {'chat': 0, 'embeddings': 0, 'throttled': 0}
+        self._counts_lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer((host, port), self._build_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint(self) -> str:
+        """Base URL to pass as azure_endpoint"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAzureOpenAIServer":
+        """Start serving in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _count(self, key: str):
+        with self._counts_lock:
+            self.request_counts[key] += 1
+
+    def _chat_response(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        prompt_tokens = 850 + len(json.dumps(payload.get('messages', ''))) // 400
+        completion_tokens = min(payload.get('max_tokens') or 300, 120)
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get('model', 'fake'),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "A fake description of the image."}
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    def _embedding_response(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        inputs = payload.get('input', [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+
+        data = []
+        total_tokens = 0
+        for index, text in enumerate(inputs):
+            # Deterministic pseudo-random vector per input text
+            rng = random.Random(str(text))
+            data.append({
+                "object": "embedding",
+                "index": index,
+                "embedding": [rng.uniform(-1.0, 1.0) for _ in range(self.embedding_dimension)]
+            })
+            total_tokens += max(1, len(str(text)) // 4)
+
+        return {
+            "object": "list",
+            "model": payload.get('model', 'fake'),
+            "data": data,
+            "usage": {"prompt_tokens": total_tokens, "total_tokens": total_tokens}
+        }
+
+    def _build_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                encoded = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+
+                if server.throttle_rate and random.random() < server.throttle_rate:
+                    server._count('throttled')
+                    self._send_json(
+                        429,
+                        {"error": {"code": "429", "message": "Rate limit is exceeded."}},
+                        {"Retry-After": str(server.retry_after)}
+                    )
+                    return
+
+                if "/embeddings" in self.path:
+                    server._count('embeddings')
+                    time.sleep(server.embedding_latency)
+                    self._send_json(200, server._embedding_response(payload))
+                elif "/chat/completions" in self.path:
+                    server._count('chat')
+                    time.sleep(server.latency)
+                    self._send_json(200, server._chat_response(payload))
+                else:
+                    self._send_json(404, {"error": {"code": "404", "message": "Unknown route"}})
+
+        return Handler
@@ -6,100 +6,40 @@ Document → Text/Image Analysis → Chunking → Embeddings → Azure AI Search
 
 import os
 import sys
+import time
 import logging
 import hashlib
-import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Callable, List, Optional, Set
 
 sys.path.append(str(Path(__file__).parent))
 
-from pipeline import MultimodalPipeline
+from pipeline import MultimodalPipeline, ProcessingCancelled
+from pipeline.extraction_pool import ExtractionPool
 from pipeline.utils.config import Config
-from pipeline.services.embedding_service import EmbeddingService
+from pipeline.utils.micro_batcher import MicroBatcher
+from pipeline.utils.stage_timer import StageTimer
+from pipeline.utils.memory_monitor import MemoryMonitor
+from pipeline.utils.chunk_records import ChunkRecordWriter
+from pipeline.utils.file_manifest import (
+    FileManifest, file_sha256, prescan, ACTION_SKIP, ACTION_DUPLICATE, ACTION_UPDATE, ACTION_ADD, ACTION_UNREADABLE
+)
+from pipeline.utils.index_generation import IndexGeneration
+from hyperparameters import IngestionHyperparameters
 
 import re
 
+# Formats cheap enough to extract in the calling thread instead of a worker process
+THREAD_EXTRACTED_FORMATS = ('.txt', '.md', '.markdown')
+# Files picked up when a directory is given on the command line
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.doc', '.pptx', '.ppt', '.txt', '.md', '.markdown')
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class ChunkingService:
-    """Semantic chunking service for documents"""
-    
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
-        self.chunk_size = chunk_size
-        self.chunk_overlap = chunk_overlap
-        
-        try:
-            from langchain.text_splitter import RecursiveCharacterTextSplitter
-            self.splitter = RecursiveCharacterTextSplitter(
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-                length_function=len,
-                separators=["\n\n", "\n", " ", ""]
-            )
-            logger.info(f"Chunking service initialized with size={chunk_size}, overlap={chunk_overlap}")
-        except ImportError:
-            logger.error("langchain not available, using basic text splitting")
-            self.splitter = None
-    
-    def chunk_document(self, text_content: str, visual_analysis: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        chunks = []
-        
-        if self.splitter:
-            text_chunks = self.splitter.split_text(text_content)
-        else:
-            text_chunks = self._basic_text_split(text_content)
-        
-        for i, chunk in enumerate(text_chunks):
-            chunks.append({
-                'id': f"text_chunk_{i}",
-                'content': chunk,
-                'chunk_type': 'text',
-                'chunk_index': i,
-                'page_number': self._extract_page_number(chunk)
-            })
-        
-        if visual_analysis:
-            for i, analysis in enumerate(visual_analysis):
-                visual_content = f"[Image Summary: {analysis.get('analysis', '')}]"
-                chunks.append({
-                    'id': f"visual_chunk_{i}",
-                    'content': visual_content,
-                    'chunk_type': 'visual',
-                    'chunk_index': len(chunks) + i,
-                    'page_number': analysis.get('page_number', 0)
-                })
-        
-        return chunks
-    
-    def _basic_text_split(self, text: str) -> List[str]:
-        """Basic text splitting as fallback"""
-        words = text.split()
-        chunks = []
-        current_chunk = []
-        current_length = 0
-        
-        for word in words:
-            if current_length + len(word) + 1 > self.chunk_size and current_chunk:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = [word]
-                current_length = len(word)
-            else:
-                current_chunk.append(word)
-                current_length += len(word) + 1
-        
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
-        
-        return chunks
-    
-    def _extract_page_number(self, chunk: str) -> int:
-        """Extract page number from chunk content"""
-        page_match = re.search(r'--- Page (\d+) ---', chunk)
-        return int(page_match.group(1)) if page_match else 0
-
 class AzureAISearchService:
     """Azure AI Search service for vector storage"""
     
@@ -112,11 +52,14 @@ class AzureAISearchService:
             logger.error("Azure Search configuration missing")
             raise ValueError("AZURE_SEARCH_ENDPOINT and AZURE_SEARCH_KEY required")
         
+        # Vector field sized from the configured embedding model
+        self.vector_field = IngestionHyperparameters.VECTOR_FIELD_NAME
+        self.vector_dimension = IngestionHyperparameters.get_embedding_dimension(Config.EMBEDDING_MODEL)
+        
         try:
             from azure.search.documents import SearchClient
             from azure.core.credentials import AzureKeyCredential
             from azure.search.documents.indexes import SearchIndexClient
-            from azure.search.documents.indexes.models import SearchIndex, SimpleField, SearchableField
             
             self.credential = AzureKeyCredential(self.key)
             self.search_client = SearchClient(self.endpoint, self.index_name, self.credential)
@@ -131,10 +74,18 @@ class AzureAISearchService:
     
     def _ensure_index_exists(self):
         """Ensure the search index exists"""
+        from azure.core.exceptions import ResourceNotFoundError
+        from azure.search.documents.indexes.models import SearchIndex, SimpleField, SearchableField
+        
         try:
-            self.index_client.get_index(self.index_name)
+            index = self.index_client.get_index(self.index_name)
             logger.info(f"Index {self.index_name} already exists")
-        except Exception:
+            
+            self.vector_enabled = self._has_vector_field(index)
+            if not self.vector_enabled:
+                logger.warning(f"Index {self.index_name} has no '{self.vector_field}' field; "
+                               f"vectors will not be uploaded until it is migrated (--migrate-index)")
+        except ResourceNotFoundError:
             logger.info(f"Creating Azure AI Search index: {self.index_name}")
             
             index = SearchIndex(
@@ -147,45 +98,204 @@ class AzureAISearchService:
                     SimpleField(name="page_number", type="Edm.Int32", filterable=True),
                     SimpleField(name="chunk_type", type="Edm.String", filterable=True, facetable=True),
                     SimpleField(name="tags", type="Collection(Edm.String)", filterable=True, facetable=True),
-                    SimpleField(name="upload_date", type="Edm.DateTimeOffset", filterable=True, sortable=True)
-                ]
+                    SimpleField(name="upload_date", type="Edm.DateTimeOffset", filterable=True, sortable=True),
+                    self._build_vector_field()
+                ],
+                vector_search=self._build_vector_search()
             )
             
             self.index_client.create_index(index)
-            logger.info(f"Created index: {self.index_name}")
+            self.vector_enabled = True
+            logger.info(f"Created index: {self.index_name} with {self.vector_dimension}-dimension vector field")
     
-    def upload_chunks(self, chunks: List[Dict[str, Any]], metadata: Dict[str, Any]) -> bool:
-        """Upload chunks to Azure AI Search"""
+    def _has_vector_field(self, index) -> bool:
+        """Check whether an index already has the vector field"""
+        return any(field.name == self.vector_field for field in index.fields)
+    
+    def _build_vector_field(self):
+        """Build the content vector field definition"""
+        from azure.search.documents.indexes.models import SearchField, SearchFieldDataType
+        
+        return SearchField(
+            name=self.vector_field,
+            type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
+            searchable=True,
+            vector_search_dimensions=self.vector_dimension,
+            vector_search_profile_name=IngestionHyperparameters.VECTOR_PROFILE_NAME
+        )
+    
+    def _build_vector_search(self):
+        """Build the HNSW vector search configuration"""
+        from azure.search.documents.indexes.models import (
+            VectorSearch, VectorSearchProfile, HnswAlgorithmConfiguration, HnswParameters
+        )
+        
+        return VectorSearch(
+            algorithms=[
+                HnswAlgorithmConfiguration(
+                    name=IngestionHyperparameters.VECTOR_ALGORITHM_NAME,
+                    parameters=HnswParameters(
+                        m=IngestionHyperparameters.HNSW_M,
+                        ef_construction=IngestionHyperparameters.HNSW_EF_CONSTRUCTION,
+                        ef_search=IngestionHyperparameters.HNSW_EF_SEARCH,
+                        metric=IngestionHyperparameters.VECTOR_METRIC
+                    )
+                )
+            ],
+            profiles=[
+                VectorSearchProfile(
+                    name=IngestionHyperparameters.VECTOR_PROFILE_NAME,
+                    algorithm_configuration_name=IngestionHyperparameters.VECTOR_ALGORITHM_NAME
+                )
+            ]
+        )
+    
+    def _usable_vector(self, embedding: Optional[List[float]]) -> bool:
+        """Check that an embedding can be stored in the vector field"""
+        return (bool(embedding) and len(embedding) == self.vector_dimension
+                and any(x != 0.0 for x in embedding))
+    
+    def migrate_to_vector_index(self, embedding_service) -> Dict[str, Any]:
+        """
+        Upgrade a keyword-only index in place: add the vector field, then backfill vectors
+        
+        Args:
+            embedding_service: EmbeddingService used to embed existing chunk content
+            
+        Returns:
+            Migration statistics
+        """
+        index = self.index_client.get_index(self.index_name)
+        
+        if not self._has_vector_field(index):
+            # Adding fields and vector configuration is allowed on a live index
+            logger.info(f"Adding '{self.vector_field}' field to index {self.index_name}")
+            index.fields.append(self._build_vector_field())
+            index.vector_search = self._build_vector_search()
+            self.index_client.create_or_update_index(index)
+        self.vector_enabled = True
+        
+        stats = {'documents_seen': 0, 'documents_updated': 0, 'documents_failed': 0}
+        batch_size = IngestionHyperparameters.VECTOR_MIGRATION_BATCH_SIZE
+        batch = []
+        
+        # Existing documents keep their ids and fields; only the vector is merged in
+        for doc in self.search_client.search(search_text="*", select=["id", "content"]):
+            batch.append({'id': doc['id'], 'content': doc.get('content', '')})
+            stats['documents_seen'] += 1
+            if len(batch) >= batch_size:
+                self._backfill_vectors(batch, embedding_service, stats)
+                batch = []
+        if batch:
+            self._backfill_vectors(batch, embedding_service, stats)
+        
+        logger.info(f"Vector migration of {self.index_name} completed: {stats}")
+        return stats
+    
+    def _backfill_vectors(self, docs: List[Dict[str, Any]], embedding_service, stats: Dict[str, int]):
+        """Embed a batch of existing documents and merge their vectors into the index"""
+        try:
+            embedded = embedding_service.generate_embeddings(docs)
+        except Exception as e:
+            logger.error(f"Could not embed {len(docs)} documents during vector migration: {e}")
+            stats['documents_failed'] += len(docs)
+            return
+        updates = [
+            {'id': doc['id'], self.vector_field: doc['embedding']}
+            for doc in embedded if self._usable_vector(doc.get('embedding'))
+        ]
+        stats['documents_failed'] += len(docs) - len(updates)
+        
+        if updates:
+            results = self.search_client.merge_documents(updates)
+            succeeded = sum(1 for res in results if getattr(res, 'succeeded', True))
+            stats['documents_updated'] += succeeded
+            stats['documents_failed'] += len(updates) - succeeded
+    
+    def build_documents(self, chunks: List[Dict[str, Any]], metadata: Dict[str, Any],
+                        occurrences: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+        """
+        Build index documents for a file's chunks (IDs are stable across re-ingests of unchanged chunks)
+        
+        Pass the same occurrences dict for every window of a streamed file, so repeated chunk text is
+        numbered across the whole file.
+        """
+        docs = []
+        occurrences = {} if occurrences is None else occurrences
+        for chunk in chunks:
+            chunk_metadata = chunk.get('metadata', {})
+            content_hash = chunk_content_hash(chunk['content'])
+            occurrence = occurrences.get(content_hash, 0)
+            occurrences[content_hash] = occurrence + 1
+            doc = {
+                "id": chunk_document_id(metadata['filename'], content_hash, occurrence),
+                "content": chunk['content'],
+                "filename": metadata['filename'],
+                "chunk_index": chunk.get('chunk_index', chunk_metadata.get('chunk_index', 0)),
+                "page_number": chunk.get('page_number', chunk_metadata.get('page_number', 0)),
+                "chunk_type": chunk.get('chunk_type', chunk_metadata.get('chunk_type', 'text')),
+                "tags": metadata.get('tags', []),
+                "upload_date": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+            }
+            if self.vector_enabled and self._usable_vector(chunk.get('embedding')):
+                doc[self.vector_field] = chunk['embedding']
+            docs.append(doc)
+        return docs
+    
+    def get_document_ids(self, filename: str) -> Set[str]:
+        """IDs of the documents currently indexed for a file"""
+        escaped = filename.replace("'", "''")
+        return {doc['id'] for doc in self.search_client.search(
+            search_text="*", filter=f"filename eq '{escaped}'", select=["id"]
+        )}
+    
+    def delete_documents(self, ids: List[str]) -> bool:
+        """Delete documents from Azure AI Search by ID"""
+        if not ids:
+            return True
+        try:
+            failed = 0
+            for start in range(0, len(ids), IngestionHyperparameters.SEARCH_UPLOAD_BATCH_SIZE):
+                part = ids[start:start + IngestionHyperparameters.SEARCH_UPLOAD_BATCH_SIZE]
+                results = self.search_client.delete_documents([{'id': doc_id} for doc_id in part])
+                failed += sum(1 for res in results if not getattr(res, 'succeeded', True))
+            if failed:
+                logger.error(f"Failed to delete {failed} of {len(ids)} docs from Azure AI Search")
+            return failed == 0
+        except Exception as e:
+            logger.error(f"Error deleting chunks from Azure AI Search: {e}")
+            return False
+    
+    def upload_documents(self, docs: List[Dict[str, Any]]) -> bool:
+        """Upload prepared index documents to Azure AI Search"""
+        return all(self.upload_document_results(docs))
+    
+    def upload_document_results(self, docs: List[Dict[str, Any]]) -> List[bool]:
+        """Upload prepared index documents to Azure AI Search, returning whether each one succeeded"""
         try:
-            docs = []
-            for chunk in chunks:
-                safe_filename = metadata['filename'].replace('.', '_')
-                # Sanitize the id
-                safe_id = sanitize_key(f"{safe_filename}_{chunk['id']}_{uuid.uuid4().hex[:8]}")
-                doc = {
-                    "id": safe_id,
-                    "content": chunk['content'],
-                    "filename": metadata['filename'],
-                    "chunk_index": chunk['chunk_index'],
-                    "page_number": chunk.get('page_number', 0),
-                    "chunk_type": chunk.get('chunk_type', 'text'),
-                    "tags": metadata.get('tags', []),
-                    "upload_date": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-                }
-                docs.append(doc)
             result = self.search_client.upload_documents(docs)
             # Log upload result for each doc
-            all_success = True
+            succeeded = []
             for idx, res in enumerate(result):
                 if hasattr(res, 'succeeded') and not res.succeeded:
                     logger.error(f"Failed to upload doc: {docs[idx]['id']}, error: {getattr(res, 'error_message', 'Unknown error')}")
-                    all_success = False
+                    succeeded.append(False)
                 else:
                     logger.info(f"Uploaded doc: {docs[idx]['id']} to Azure AI Search")
-            return all_success
+                    succeeded.append(True)
+            return succeeded
+        except Exception as e:
+            logger.error(f"Error uploading chunks to Azure AI Search: {e}")
+            return [False] * len(docs)
+    
+    def upload_chunks(self, chunks: List[Dict[str, Any]], metadata: Dict[str, Any]) -> bool:
+        """Upload chunks to Azure AI Search"""
+        try:
+            docs = self.build_documents(chunks, metadata)
         except Exception as e:
             logger.error(f"Error uploading chunks to Azure AI Search: {e}")
             return False
+        return self.upload_documents(docs)
 
 class StorageChecker:
     """Azure Blob Storage service for file storage"""
@@ -209,29 +319,30 @@ class StorageChecker:
             logger.error(f"Failed to initialize Azure Storage: {e}")
             self.storage_available = False
     
-    def file_exists_in_storage(self, file_path: str) -> bool:
+    def file_exists_in_storage(self, file_path: str, blob_name: str = None) -> bool:
         """Check if file exists in blob storage"""
+        return self.get_stored_file_metadata(file_path, blob_name) is not None
+    
+    def get_stored_file_metadata(self, file_path: str, blob_name: str = None) -> Optional[Dict[str, str]]:
+        """Get the blob metadata of a stored file (including its file_hash), or None if it is not stored"""
         if not self.storage_available:
             logger.warning("Storage not available, assuming file doesn't exist")
-            return False
+            return None
         
         try:
-            blob_name = Path(file_path).name
+            if blob_name is None:
+                blob_name = Path(file_path).name
             blob_client = self.container_client.get_blob_client(blob_name)
-            blob_client.get_blob_properties()
+            properties = blob_client.get_blob_properties()
             logger.info(f"File {file_path} exists in storage: True")
-            return True
+            return dict(properties.metadata or {})
         except Exception:
             logger.info(f"File {file_path} exists in storage: False")
-            return False
+            return None
     
     def get_file_hash(self, file_path: str) -> str:
         """Calculate SHA-256 hash of file"""
-        hash_sha256 = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_sha256.update(chunk)
-        return hash_sha256.hexdigest()
+        return file_sha256(file_path)
     
     def upload_to_storage(self, file_path: str, blob_name: str = None, metadata: Dict[str, Any] = None) -> bool:
         """Upload file to Azure Blob Storage"""
@@ -260,19 +371,74 @@ def sanitize_key(key: str) -> str:
     """Sanitize document key for Azure AI Search (letters, digits, _, -, =)"""
     return re.sub(r'[^A-Za-z0-9_\-=]', '_', key)
 
+def chunk_content_hash(content: str) -> str:
+    """Hash of a chunk's whitespace-normalized text"""
+    return hashlib.sha256(" ".join(content.split()).encode('utf-8')).hexdigest()
+
+def chunk_document_id(filename: str, content_hash: str, occurrence: int = 0) -> str:
+    """
+    Deterministic index document ID for a chunk
+    
+    Args:
+        filename: Name the file is indexed under
+        content_hash: chunk_content_hash of the chunk
+        occurrence: How many earlier chunks of the file have the same content
+        
+    Returns:
+        Sanitized document key
+    """
+    safe_filename = filename.replace('.', '_')
+    suffix = f"_{occurrence}" if occurrence else ""
+    return sanitize_key(f"{safe_filename}_{content_hash[:32]}{suffix}")
+
+def expand_file_paths(paths: List[str]) -> List[str]:
+    """Replace directories with the supported files they contain (recursively, sorted)"""
+    expanded = []
+    for path in paths:
+        if os.path.isdir(path):
+            expanded.extend(str(p) for p in sorted(Path(path).rglob("*"))
+                            if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS)
+        else:
+            expanded.append(path)
+    return expanded
+
+def print_prescan_report(report: Dict[str, Any]):
+    """Print what a batch run would skip, update and add"""
+    labels = {ACTION_SKIP: "⏭️ skip", ACTION_DUPLICATE: "⏭️ duplicate", ACTION_UPDATE: "🔁 update",
+              ACTION_ADD: "➕ add", ACTION_UNREADABLE: "❌ unreadable"}
+    print(f"\n🔎 Prescan of {len(report['files'])} files")
+    print("=" * 60)
+    for scanned in report['files']:
+        suffix = f" (same content as {scanned['duplicate_of']})" if scanned['duplicate_of'] else ""
+        print(f"{labels[scanned['action']]:<14} {scanned['file']}{suffix}")
+    counts = report['counts']
+    megabytes = report['bytes_hashed'] / (1024 * 1024)
+    print(f"\n   - Skip: {counts[ACTION_SKIP]} unchanged, {counts[ACTION_DUPLICATE]} duplicates")
+    print(f"   - Update: {counts[ACTION_UPDATE]}")
+    print(f"   - Add: {counts[ACTION_ADD]}")
+    if counts[ACTION_UNREADABLE]:
+        print(f"   - Unreadable: {counts[ACTION_UNREADABLE]}")
+    print(f"   - Hashed: {megabytes:.1f} MB in {report['seconds']:.2f}s "
+          f"({megabytes / max(report['seconds'], 1e-9):.1f} MB/s)")
+
 class CompleteIngestionPipeline:
     """Complete ingestion pipeline with storage checking and vector storage"""
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
-        self.pipeline = MultimodalPipeline(self.config)
+        self.pipeline = MultimodalPipeline({
+            'chunk_size': Config.CHUNK_SIZE,
+            'chunk_overlap': Config.CHUNK_OVERLAP,
+            **self.config
+        })
         self.storage_checker = StorageChecker()
-        self.chunking_service = ChunkingService(
-            chunk_size=self.config.get('chunk_size', Config.CHUNK_SIZE),
-            chunk_overlap=self.config.get('chunk_overlap', Config.CHUNK_OVERLAP)
-        )
-        self.embedding_service = EmbeddingService()
         self.search_service = AzureAISearchService()
+        self.record_writer = ChunkRecordWriter(Config.CHUNK_RECORDS_PATH) if Config.CHUNK_RECORDS_PATH else None
+        self.index_generation = IndexGeneration(Config.INDEX_GENERATION_PATH)
+        self.manifest = FileManifest(Config.FILE_MANIFEST_PATH) if Config.FILE_MANIFEST_PATH else None
+        # Shared upload batcher, set while a parallel batch runs
+        self.upload_batcher = None
+        self.last_batch_report = None
         self.processed_files = []
         self.skipped_files = []
         self.failed_files = []
@@ -283,8 +449,40 @@ class CompleteIngestionPipeline:
                                       original_filename: str = None,
                                       force_reprocess: bool = False,
                                       save_outputs: bool = False,
-                                      auto_cleanup: bool = True) -> Dict[str, Any]:
-        """Process file with storage existence check"""
+                                      auto_cleanup: bool = True,
+                                      extract: Optional[Callable[[Path], Dict[str, Any]]] = None,
+                                      cancel_event: Optional[threading.Event] = None,
+                                      file_hash: Optional[str] = None,
+                                      streaming: Optional[bool] = None,
+                                      progress: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
+        """
+        Process file with storage existence check
+        
+        The file hash is first looked up in the local manifest, so an unchanged file or a copy of an
+        ingested file under a new name is skipped before any network call or extraction. Otherwise a
+        file already in storage is skipped when its stored hash is unchanged. A changed file is
+        re-ingested incrementally (INCREMENTAL_INGESTION): only chunks whose content is new are
+        uploaded, chunks that no longer exist are deleted, and the rest are left untouched.
+        
+        PDFs of STREAMING_MIN_PAGES or more pages are processed page by page (see _process_streaming),
+        in the calling thread even when extract is given. Successful results report the peak RSS
+        seen while the file was processed ('memory').
+        
+        Args:
+            file_path: Local path of the file
+            original_filename: Name the file is stored and indexed under (defaults to the local name)
+            force_reprocess: Process and re-upload every chunk even if the file is unchanged
+            save_outputs: Whether to save intermediate outputs
+            auto_cleanup: Whether to clean up temporary files
+            extract: Runs content extraction elsewhere (e.g. in a worker process)
+            cancel_event: Once set, processing stops before anything is uploaded
+            file_hash: SHA-256 of the file if already computed (e.g. by prescan)
+            streaming: Process page by page (True), in one pass (False), or by page count (None)
+            progress: Called with (stage, message) as processing moves on (e.g. to update a job)
+            
+        Returns:
+            Processing result
+        """
         
         print(f"📄 Processing: {file_path}")
         print("-" * 50)
@@ -295,79 +493,173 @@ class CompleteIngestionPipeline:
             self.failed_files.append({'file': file_path, 'error': error_msg})
             return {'success': False, 'error': error_msg}
         
-        file_exists = self.storage_checker.file_exists_in_storage(file_path)
+        source_name = original_filename if original_filename else Path(file_path).name
+        if file_hash is None:
+            file_hash = self.storage_checker.get_file_hash(file_path)
+        incremental = IngestionHyperparameters.INCREMENTAL_INGESTION
         
-        if file_exists and not force_reprocess:
-            print(f"⏭️ File already exists in storage, skipping processing")
-            self.skipped_files.append(file_path)
-            return {
-                'success': True, 
-                'status': 'skipped', 
-                'reason': 'file_exists_in_storage',
-                'filename': Path(file_path).name
-            }
+        if self.manifest and not force_reprocess:
+            action, entry = self.manifest.classify(source_name, file_hash)
+            if action == ACTION_SKIP:
+                print(f"⏭️ File unchanged since it was ingested, skipping processing")
+                return self._skip(file_path, source_name, 'file_unchanged')
+            if action == ACTION_DUPLICATE:
+                print(f"⏭️ Same content already ingested as {entry['name']}, skipping processing")
+                return self._skip(file_path, source_name, 'duplicate_content', duplicate_of=entry['name'])
         
-        file_hash = self.storage_checker.get_file_hash(file_path)
+        # Files ingested before the manifest existed, or from another machine, are only known to storage
+        stored_metadata = self.storage_checker.get_stored_file_metadata(file_path, blob_name=source_name)
+        file_exists = stored_metadata is not None
         
+        if file_exists and not force_reprocess:
+            unchanged = stored_metadata.get('file_hash') == file_hash
+            if unchanged and self.manifest:
+                self.manifest.record(source_name, file_hash, os.path.getsize(file_path),
+                                     int(stored_metadata.get('chunks_created', 0)))
+            if unchanged or not incremental:
+                print(f"⏭️ File already exists in storage, skipping processing")
+                return self._skip(file_path, source_name,
+                                  'file_unchanged' if unchanged else 'file_exists_in_storage')
+            print(f"🔁 File changed since it was stored, re-ingesting incrementally")
+        
+        with MemoryMonitor() as memory:
+            if self._should_stream(file_path, streaming):
+                result = self._process_streaming(file_path, source_name, file_hash, file_exists,
+                                                 force_reprocess, auto_cleanup, cancel_event, progress)
+            else:
+                result = self._process_whole(file_path, source_name, file_hash, file_exists, force_reprocess,
+                                             save_outputs, auto_cleanup, extract, cancel_event, progress)
+        if result.get('success'):
+            result['memory'] = memory.report()
+            print(f"   - Peak RSS: {result['memory']['peak_rss_mb']:.0f} MB "
+                  f"(+{result['memory']['peak_increase_mb']:.0f} MB)")
+        return result
+    
+    def _should_stream(self, file_path: str, streaming: Optional[bool]) -> bool:
+        """Whether to process a file page by page (forced on or off by streaming, otherwise by page count)"""
+        if streaming is False or not self.pipeline.can_stream(Path(file_path)):
+            return False
+        if streaming:
+            return True
+        min_pages = IngestionHyperparameters.STREAMING_MIN_PAGES
+        if not min_pages:
+            return False
+        try:
+            extractor = self.pipeline.dispatcher.dispatch_extractor(file_path)
+            return extractor.get_page_count(Path(file_path)) >= min_pages
+        except Exception as e:
+            # Unreadable here means unreadable for whole-document extraction too, which reports it
+            logger.warning(f"Could not count pages of {file_path}: {e}")
+            return False
+    
+    def _process_whole(self, file_path: str, source_name: str, file_hash: str, file_exists: bool,
+                       force_reprocess: bool, save_outputs: bool, auto_cleanup: bool,
+                       extract: Optional[Callable[[Path], Dict[str, Any]]],
+                       cancel_event: Optional[threading.Event],
+                       progress: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
+        """Process a document in one pass and upload its chunks (see process_file_with_storage_check)"""
+        incremental = IngestionHyperparameters.INCREMENTAL_INGESTION
         try:
             print(f"🔄 Processing file...")
-            result = self.pipeline.process_document(file_path, save_outputs=save_outputs)
+            result = self.pipeline.process_document(
+                file_path, save_outputs=save_outputs, extract=extract, cancel_event=cancel_event,
+                progress=progress
+            )
+            if not result.get('cancelled') and cancel_event is not None and cancel_event.is_set():
+                result = {'success': False, 'cancelled': True, 'error': 'Processing cancelled',
+                          'filename': Path(file_path).name}
             
-            if result['success']:
-                print(f"🔄 Document processed, creating chunks...")
-                chunks = self.chunking_service.chunk_document(
-                    result['text_content'], 
-                    result.get('visual_analysis', [])
-                )
-                
-                print(f"🔄 Generated {len(chunks)} chunks, creating embeddings...")
-                embedded_chunks = self.embedding_service.generate_embeddings(chunks)
+            if result.get('cancelled'):
+                print(f"⏹️ Processing cancelled")
+            elif result['success']:
+                # Chunks and vectors come straight from the multimodal pipeline (single pass)
+                chunks = result.get('chunks', [])
+                timer = StageTimer()
+                timer.merge(result.get('stage_timings', {}))
                 
-                if embedded_chunks:
-                    print(f"🔄 Generated embeddings, uploading to Azure AI Search...")
+                if chunks:
+                    print(f"🔄 Generated {len(chunks)} embedded chunks, uploading to Azure AI Search...")
+                    if progress is not None:
+                        progress('search_upload', f"Uploading {len(chunks)} chunks...")
                     
                     metadata = {
-                        'filename': Path(file_path).name,
+                        'filename': source_name,
                         'file_path': file_path,
                         'file_hash': file_hash,
                         'tags': self._extract_tags(file_path),
                         'processing_timestamp': datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
                     }
                     
-                    upload_success = self.search_service.upload_chunks(embedded_chunks, metadata)
+                    with timer.stage('search_upload'):
+                        docs = self.search_service.build_documents(chunks, metadata)
+                        # Queried even when no blob records the file: its chunks may be indexed without one
+                        indexed_ids = self._indexed_document_ids(source_name) or set()
+                        if incremental and not force_reprocess:
+                            # Unchanged chunks keep their IDs, so they are already in the index
+                            upload_pairs = [(doc, chunk) for doc, chunk in zip(docs, chunks) if doc['id'] not in indexed_ids]
+                        else:
+                            upload_pairs = list(zip(docs, chunks))
+                        upload_docs = [doc for doc, _ in upload_pairs]
+                        upload_success = self._upload_documents(upload_docs) if upload_docs else True
+                        
+                        stale_ids = sorted(indexed_ids - {doc['id'] for doc in docs})
+                        if upload_success and stale_ids:
+                            # Deleted only after the new chunks are in, so the file never vanishes from search
+                            if not self.search_service.delete_documents(stale_ids):
+                                logger.warning(f"Stale chunks of {source_name} could not be deleted; they stay searchable")
+                                stale_ids = []
                     
                     if upload_success:
-                        print(f"✅ Successfully uploaded {len(embedded_chunks)} chunks to Azure AI Search")
+                        chunks_unchanged = len(docs) - len(upload_docs)
+                        print(f"✅ Successfully uploaded {len(upload_docs)} chunks to Azure AI Search "
+                              f"({chunks_unchanged} unchanged, {len(stale_ids)} deleted)")
+                        
+                        # Keep a local copy of the records for the local retrieval backend
+                        if self.record_writer:
+                            self.record_writer.append(upload_docs, [chunk for _, chunk in upload_pairs])
+                            self.record_writer.append_deletions(stale_ids)
+                        if upload_docs or stale_ids:
+                            self.index_generation.bump([metadata['filename']])
                         
-                        # Use original filename for blob storage if provided
-                        blob_filename = original_filename if original_filename else Path(file_path).name
-                        blob_upload_success = self.storage_checker.upload_to_storage(
-                            file_path, 
-                            blob_name=blob_filename,
-                            metadata={
-                                'file_hash': file_hash,
-                                'processed_date': datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
-                                'chunks_created': str(len(chunks)),
-                                'chunks_uploaded': str(len(embedded_chunks)),
-                                'pipeline_version': '2.0'
-                            }
-                        )
+                        with timer.stage('blob_upload'):
+                            blob_upload_success = self.storage_checker.upload_to_storage(
+                                file_path, 
+                                blob_name=source_name,
+                                metadata={
+                                    'file_hash': file_hash,
+                                    'processed_date': datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+                                    'chunks_created': str(len(chunks)),
+                                    'chunks_uploaded': str(len(upload_docs)),
+                                    'chunks_deleted': str(len(stale_ids)),
+                                    'pipeline_version': '2.0'
+                                }
+                            )
                         
                         result.update({
                             'chunks_created': len(chunks),
-                            'chunks_uploaded': len(embedded_chunks),
+                            'chunks_uploaded': len(upload_docs),
+                            'chunks_unchanged': chunks_unchanged,
+                            'chunks_deleted': len(stale_ids),
                             'vector_storage_success': upload_success,
                             'blob_storage_uploaded': blob_upload_success,
                             'file_hash': file_hash,
                             'processing_timestamp': datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
                             'storage_checked': True,
-                            'file_exists_in_storage': file_exists
+                            'file_exists_in_storage': file_exists,
+                            'stage_timings': timer.report()
                         })
                         
+                        # Recorded only once the blob is stored too, so a failed blob upload is retried
+                        if self.manifest and blob_upload_success:
+                            self.manifest.record(source_name, file_hash, os.path.getsize(file_path), len(chunks))
+                        
                         print(f"   - Chunks created: {len(chunks)}")
                         print(f"   - Images analyzed: {result.get('statistics', {}).get('total_images', 0)}")
+                        self._print_image_preparation(result.get('statistics', {}))
                         print(f"   - Vector storage: {'✅ Success' if upload_success else '❌ Failed'}")
                         print(f"   - Blob storage: {'✅ Success' if blob_upload_success else '❌ Failed'}")
+                        print(f"⏱️ Stage timings:")
+                        print(timer.format_report())
                         
                         self.processed_files.append(result)
                         
@@ -378,7 +670,7 @@ class CompleteIngestionPipeline:
                         result['success'] = False
                         result['error'] = error_msg
                 else:
-                    error_msg = "Failed to generate embeddings"
+                    error_msg = "No chunks were produced for the document"
                     print(f"❌ {error_msg}")
                     self.failed_files.append({'file': file_path, 'error': error_msg})
                     result['success'] = False
@@ -398,6 +690,205 @@ class CompleteIngestionPipeline:
             self.failed_files.append({'file': file_path, 'error': error_msg})
             return {'success': False, 'error': error_msg}
     
+    def _process_streaming(self, file_path: str, source_name: str, file_hash: str, file_exists: bool,
+                           force_reprocess: bool, auto_cleanup: bool,
+                           cancel_event: Optional[threading.Event],
+                           progress: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
+        """
+        Process a document page by page, uploading each window of chunks as soon as it is embedded
+        
+        Peak memory stays at a few pages and one chunk window. Chunks are uploaded while later pages
+        are still processed; a cancelled or failed run deletes the chunks it added, so the index keeps
+        the file as it was. Stale chunks are only deleted, and the file only recorded as ingested, once
+        every window is uploaded.
+        """
+        print(f"🔄 Streaming file page by page...")
+        incremental = IngestionHyperparameters.INCREMENTAL_INGESTION
+        timer = StageTimer()
+        stats = {}
+        metadata = {
+            'filename': source_name,
+            'file_path': file_path,
+            'file_hash': file_hash,
+            'tags': self._extract_tags(file_path),
+            'processing_timestamp': datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        }
+        indexed_ids = self._indexed_document_ids(source_name)
+        # Chunk IDs added by this run can only be told apart when the indexed ones are known
+        rollback = indexed_ids is not None
+        indexed_ids = indexed_ids or set()
+        seen_ids = set()
+        occurrences = {}
+        chunks_uploaded = 0
+        
+        try:
+            for window in self.pipeline.stream_document(file_path, timer, stats, auto_cleanup, cancel_event):
+                with timer.stage('search_upload'):
+                    docs = self.search_service.build_documents(window, metadata, occurrences)
+                    seen_ids.update(doc['id'] for doc in docs)
+                    if incremental and not force_reprocess:
+                        # Unchanged chunks keep their IDs, so they are already in the index
+                        upload_pairs = [(doc, chunk) for doc, chunk in zip(docs, window) if doc['id'] not in indexed_ids]
+                    else:
+                        upload_pairs = list(zip(docs, window))
+                    upload_docs = [doc for doc, _ in upload_pairs]
+                    if upload_docs and not self._upload_documents(upload_docs):
+                        raise RuntimeError("Failed to upload chunks to Azure AI Search")
+                if self.record_writer:
+                    self.record_writer.append(upload_docs, [chunk for _, chunk in upload_pairs])
+                chunks_uploaded += len(upload_docs)
+                logger.info(f"Streamed {stats['total_pages']} pages, {stats['total_chunks']} chunks of {source_name}")
+                if progress is not None:
+                    progress('streaming', f"Processed {stats['total_pages']} pages, {stats['total_chunks']} chunks...")
+        except ProcessingCancelled:
+            print(f"⏹️ Processing cancelled")
+            if rollback:
+                self._discard_uploaded(source_name, seen_ids - indexed_ids)
+            return {'success': False, 'cancelled': True, 'error': 'Processing cancelled',
+                    'filename': Path(file_path).name}
+        except Exception as e:
+            error_msg = f"Error processing file: {e}"
+            print(f"❌ {error_msg}")
+            if rollback:
+                self._discard_uploaded(source_name, seen_ids - indexed_ids)
+            self.failed_files.append({'file': file_path, 'error': error_msg})
+            return {'success': False, 'error': error_msg, 'chunks_uploaded': chunks_uploaded}
+        finally:
+            if chunks_uploaded:
+                self.index_generation.bump([source_name])
+        
+        chunks_created = stats['total_chunks']
+        if not chunks_created:
+            error_msg = "No chunks were produced for the document"
+            print(f"❌ {error_msg}")
+            self.failed_files.append({'file': file_path, 'error': error_msg})
+            return {'success': False, 'error': error_msg}
+        
+        stale_ids = sorted(indexed_ids - seen_ids)
+        if stale_ids:
+            with timer.stage('search_upload'):
+                if not self.search_service.delete_documents(stale_ids):
+                    logger.warning(f"Stale chunks of {source_name} could not be deleted; they stay searchable")
+                    stale_ids = []
+            if self.record_writer:
+                self.record_writer.append_deletions(stale_ids)
+            if stale_ids:
+                self.index_generation.bump([source_name])
+        print(f"✅ Successfully uploaded {chunks_uploaded} chunks to Azure AI Search "
+              f"({chunks_created - chunks_uploaded} unchanged, {len(stale_ids)} deleted)")
+        
+        with timer.stage('blob_upload'):
+            blob_upload_success = self.storage_checker.upload_to_storage(
+                file_path, 
+                blob_name=source_name,
+                metadata={
+                    'file_hash': file_hash,
+                    'processed_date': datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+                    'chunks_created': str(chunks_created),
+                    'chunks_uploaded': str(chunks_uploaded),
+                    'chunks_deleted': str(len(stale_ids)),
+                    'pipeline_version': '2.0'
+                }
+            )
+        if self.manifest and blob_upload_success:
+            self.manifest.record(source_name, file_hash, os.path.getsize(file_path), chunks_created)
+        
+        result = {
+            'success': True,
+            'streamed': True,
+            'filename': Path(file_path).name,
+            'file_path': str(file_path),
+            'file_size': os.path.getsize(file_path),
+            'metadata': stats['metadata'],
+            'statistics': {
+                'total_pages': stats['total_pages'],
+                'total_chunks': chunks_created,
+                'total_images': stats['total_images'],
+                'successful_image_analyses': stats['successful_image_analyses'],
+                'images_skipped': stats['image_preparation']['images_skipped'],
+                'image_bytes_saved': stats['image_preparation']['bytes_saved'],
+                'chunks_with_images': stats['chunks_with_images']
+            },
+            'summaries': {
+                'captioning': stats['captioning'],
+                'image_preparation': stats['image_preparation']
+            },
+            'chunks_created': chunks_created,
+            'chunks_uploaded': chunks_uploaded,
+            'chunks_unchanged': chunks_created - chunks_uploaded,
+            'chunks_deleted': len(stale_ids),
+            'vector_storage_success': True,
+            'blob_storage_uploaded': blob_upload_success,
+            'file_hash': file_hash,
+            'processing_timestamp': datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            'storage_checked': True,
+            'file_exists_in_storage': file_exists,
+            'stage_timings': timer.report()
+        }
+        
+        print(f"   - Pages streamed: {stats['total_pages']}")
+        print(f"   - Chunks created: {chunks_created}")
+        print(f"   - Images analyzed: {stats['total_images']}")
+        self._print_image_preparation(result['statistics'])
+        print(f"   - Blob storage: {'✅ Success' if blob_upload_success else '❌ Failed'}")
+        print(f"⏱️ Stage timings:")
+        print(timer.format_report())
+        
+        self.processed_files.append(result)
+        if auto_cleanup:
+            self._cleanup_temp_files(file_path)
+        return result
+    
+    @staticmethod
+    def _print_image_preparation(statistics: Dict[str, Any]):
+        """Print the images left out of vision analysis and the upload bytes saved by downscaling"""
+        if statistics.get('images_skipped') or statistics.get('image_bytes_saved'):
+            print(f"   - Images skipped: {statistics.get('images_skipped', 0)}, "
+                  f"vision upload saved: {statistics.get('image_bytes_saved', 0) / (1024 * 1024):.1f} MB")
+    
+    def _skip(self, file_path: str, source_name: str, reason: str, **details) -> Dict[str, Any]:
+        """Record a skipped file and build its result"""
+        self.skipped_files.append(file_path)
+        return {
+            'success': True, 
+            'status': 'skipped', 
+            'reason': reason,
+            'filename': source_name,
+            **details
+        }
+    
+    def _indexed_document_ids(self, filename: str) -> Optional[Set[str]]:
+        """IDs already indexed for a file, or None if the index cannot be queried (everything is then re-uploaded)"""
+        try:
+            return self.search_service.get_document_ids(filename)
+        except Exception as e:
+            logger.warning(f"Could not list indexed chunks of {filename}, uploading all of them: {e}")
+            return None
+    
+    def _discard_uploaded(self, filename: str, new_ids: Set[str]):
+        """Delete the chunks an unfinished streaming run added, so the file is indexed as before the run"""
+        if not new_ids:
+            return
+        new_ids = sorted(new_ids)
+        if self.search_service.delete_documents(new_ids):
+            print(f"🧹 Removed {len(new_ids)} chunks uploaded before the run stopped")
+            if self.record_writer:
+                self.record_writer.append_deletions(new_ids)
+        else:
+            logger.warning(f"Chunks uploaded by the unfinished run of {filename} could not be deleted; "
+                           f"they stay searchable until the file is ingested again")
+    
+    def _upload_documents(self, docs: List[Dict[str, Any]]) -> bool:
+        """Upload a file's index documents, through the shared upload batcher when one is running"""
+        batcher = self.upload_batcher
+        if batcher is None:
+            return self.search_service.upload_documents(docs)
+        try:
+            return all(batcher.submit(docs))
+        except Exception as e:
+            logger.error(f"Error uploading chunks to Azure AI Search: {e}")
+            return False
+    
     def _extract_tags(self, file_path: str) -> List[str]:
         """Extract tags from file path and content"""
         tags = []
@@ -446,25 +937,173 @@ class CompleteIngestionPipeline:
     def process_batch_with_storage_check(self, file_paths: List[str],
                                        force_reprocess: bool = False,
                                        save_outputs: bool = False,
-                                       auto_cleanup: bool = True) -> List[Dict[str, Any]]:
-        """Process multiple files with storage checking"""
+                                       auto_cleanup: bool = True,
+                                       workers: int = 1,
+                                       streaming: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Process multiple files with storage checking
         
-        print(f"🚀 Batch Processing {len(file_paths)} Files")
-        print("=" * 60)
+        Files are prescanned first: hashed in parallel once, and copies of already ingested content
+        (or of another file in the batch) are skipped without being processed.
         
-        results = []
-        for i, file_path in enumerate(file_paths, 1):
-            print(f"\n[{i}/{len(file_paths)}] 📄 Processing: {file_path}")
-            print("-" * 50)
+        Args:
+            file_paths: Files to process
+            force_reprocess: Process even if a file already exists in storage
+            save_outputs: Whether to save intermediate outputs
+            auto_cleanup: Whether to clean up temporary files
+            workers: Files processed at once; above 1, extraction runs in worker processes (at most
+                one per CPU) and all files share one embedding batcher and one upload batcher
+            streaming: Process PDFs page by page (True), in one pass (False), or by page count (None)
             
-            result = self.process_file_with_storage_check(
-                file_path, force_reprocess, save_outputs, auto_cleanup
+        Returns:
+            One processing result per file, in order (the throughput report is kept in last_batch_report)
+        """
+        
+        print(f"🚀 Batch Processing {len(file_paths)} Files" + (f" with {workers} workers" if workers > 1 else ""))
+        print("=" * 60)
+        
+        embedding_service = self.pipeline.embedding_service
+        tokens_before = embedding_service.tokens
+        requests_before = embedding_service.requests
+        start_time = time.time()
+        batching = None
+        
+        results = [None] * len(file_paths)
+        pending = []
+        for i, scanned in enumerate(prescan(file_paths, self.manifest)['files']):
+            if scanned['action'] == ACTION_DUPLICATE and not force_reprocess:
+                print(f"⏭️ {scanned['file']} has the same content as {scanned['duplicate_of']}, skipping")
+                results[i] = self._skip(scanned['file'], Path(scanned['file']).name, 'duplicate_content',
+                                        duplicate_of=scanned['duplicate_of'])
+            else:
+                pending.append((i, scanned['file'], scanned['file_hash']))
+        
+        if workers > 1 and len(pending) > 1:
+            pending_results, batching = self._process_batch_parallel(
+                [path for _, path, _ in pending], [file_hash for _, _, file_hash in pending],
+                force_reprocess, save_outputs, auto_cleanup, workers, streaming
             )
-            results.append(result)
+        else:
+            pending_results = []
+            for n, (_, file_path, file_hash) in enumerate(pending, 1):
+                print(f"\n[{n}/{len(pending)}] 📄 Processing: {file_path}")
+                print("-" * 50)
+                
+                result = self.process_file_with_storage_check(
+                    file_path,
+                    force_reprocess=force_reprocess,
+                    save_outputs=save_outputs,
+                    auto_cleanup=auto_cleanup,
+                    file_hash=file_hash,
+                    streaming=streaming
+                )
+                pending_results.append(result)
+        for (i, _, _), result in zip(pending, pending_results):
+            results[i] = result
+        
+        self.last_batch_report = self._build_batch_report(
+            results,
+            workers=workers,
+            elapsed=time.time() - start_time,
+            embedding_tokens=embedding_service.tokens - tokens_before,
+            embedding_requests=embedding_service.requests - requests_before,
+            batching=batching
+        )
         
         self.print_batch_summary()
         return results
     
+    def _process_batch_parallel(self, file_paths: List[str], file_hashes: List[Optional[str]],
+                                force_reprocess: bool, save_outputs: bool, auto_cleanup: bool, workers: int,
+                                streaming: Optional[bool] = None):
+        """
+        Process files concurrently: extraction in worker processes, the rest in threads sharing batchers
+        
+        Returns:
+            (results in input order, batching statistics)
+        """
+        embedding_service = self.pipeline.embedding_service
+        # The embedding batcher normally runs for the service's lifetime (EMBEDDING_MICRO_BATCHING)
+        started_batching = embedding_service.batcher is None
+        embedding_service.start_batching()
+        self.upload_batcher = MicroBatcher(
+            self.search_service.upload_document_results,
+            max_items=IngestionHyperparameters.SEARCH_UPLOAD_BATCH_SIZE,
+            max_wait=IngestionHyperparameters.SEARCH_UPLOAD_MAX_WAIT,
+            name="search-upload-batcher"
+        )
+        # Extraction is CPU-bound, so more processes than cores only add startup cost
+        processes = min(workers, os.cpu_count() or 1)
+        # Cores left over go to sharding large PDFs by page
+        pdf_shard_processes = max(1, (os.cpu_count() or 1) // processes)
+        process_pool = ExtractionPool(processes, pdf_shard_processes)
+        
+        def extract(path: Path) -> Dict[str, Any]:
+            if path.suffix.lower() in THREAD_EXTRACTED_FORMATS:
+                return self.pipeline.dispatcher.extract_content(path)
+            return process_pool.extract(path)
+        
+        results = [None] * len(file_paths)
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-file") as threads:
+                futures = {
+                    threads.submit(
+                        self.process_file_with_storage_check,
+                        file_path,
+                        force_reprocess=force_reprocess,
+                        save_outputs=save_outputs,
+                        auto_cleanup=auto_cleanup,
+                        extract=extract,
+                        file_hash=file_hashes[i],
+                        streaming=streaming
+                    ): i
+                    for i, file_path in enumerate(file_paths)
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    i = futures[future]
+                    results[i] = future.result()
+                    if results[i].get('status') == 'skipped':
+                        outcome = "⏭️"
+                    else:
+                        outcome = "✅" if results[i].get('success') else "❌"
+                    print(f"[{done}/{len(file_paths)}] {outcome} {file_paths[i]}")
+        finally:
+            upload_batcher, self.upload_batcher = self.upload_batcher, None
+            upload_batcher.close()
+            batching = {
+                'embedding': embedding_service.batcher.get_statistics(),
+                'search_upload': upload_batcher.get_statistics()
+            }
+            if started_batching:
+                embedding_service.stop_batching()
+            process_pool.shutdown()
+        
+        return results, batching
+    
+    def _build_batch_report(self, results: List[Dict[str, Any]], workers: int, elapsed: float,
+                            embedding_tokens: int, embedding_requests: int,
+                            batching: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Aggregate a batch run into a throughput report"""
+        ingested = [r for r in results if r.get('success') and r.get('status') != 'skipped']
+        chunks = sum(r.get('chunks_uploaded', 0) for r in ingested)
+        elapsed = max(elapsed, 1e-9)
+        return {
+            'files': len(results),
+            'documents_ingested': len(ingested),
+            'documents_skipped': sum(1 for r in results if r.get('status') == 'skipped'),
+            'documents_failed': sum(1 for r in results if not r.get('success')),
+            'chunks_uploaded': chunks,
+            'embedding_tokens': embedding_tokens,
+            'embedding_requests': embedding_requests,
+            'workers': workers,
+            'elapsed_seconds': round(elapsed, 3),
+            'documents_per_second': round(len(ingested) / elapsed, 3),
+            'chunks_per_second': round(chunks / elapsed, 3),
+            'tokens_per_second': round(embedding_tokens / elapsed, 1),
+            'peak_rss_mb': max((r.get('memory', {}).get('peak_rss_mb', 0) for r in ingested), default=0),
+            'batching': batching
+        }
+    
     def print_batch_summary(self):
         """Print batch processing summary"""
         print(f"\n📊 Batch Processing Summary")
@@ -477,15 +1116,33 @@ class CompleteIngestionPipeline:
             total_chunks = sum(r.get('chunks_created', 0) for r in self.processed_files)
             total_vectors = sum(r.get('chunks_uploaded', 0) for r in self.processed_files)
             total_images = sum(r.get('statistics', {}).get('total_images', 0) for r in self.processed_files)
+            images_skipped = sum(r.get('statistics', {}).get('images_skipped', 0) for r in self.processed_files)
+            bytes_saved = sum(r.get('statistics', {}).get('image_bytes_saved', 0) for r in self.processed_files)
             vector_success = sum(1 for r in self.processed_files if r.get('vector_storage_success', False))
             blob_success = sum(1 for r in self.processed_files if r.get('blob_storage_uploaded', False))
             
             print(f"   - Total chunks created: {total_chunks}")
             print(f"   - Total chunks uploaded to vectors: {total_vectors}")
             print(f"   - Total images analyzed: {total_images}")
+            print(f"   - Total images skipped: {images_skipped} "
+                  f"(vision upload saved: {bytes_saved / (1024 * 1024):.1f} MB)")
             print(f"   - Vector storage success: {vector_success}/{len(self.processed_files)}")
             print(f"   - Blob storage success: {blob_success}/{len(self.processed_files)}")
         
+        report = self.last_batch_report
+        if report:
+            print(f"\n⚡ Throughput ({report['workers']} worker{'s' if report['workers'] != 1 else ''}, "
+                  f"{report['elapsed_seconds']:.1f}s)")
+            print(f"   - Documents/s: {report['documents_per_second']:.2f}")
+            print(f"   - Chunks/s: {report['chunks_per_second']:.2f}")
+            print(f"   - Embedding tokens/s: {report['tokens_per_second']:.0f} "
+                  f"({report['embedding_tokens']} tokens in {report['embedding_requests']} requests)")
+            print(f"   - Peak RSS: {report['peak_rss_mb']:.0f} MB")
+            for name, stats in (report['batching'] or {}).items():
+                print(f"   - {name} batches: {stats['batches']} "
+                      f"(avg {stats['average_batch_size']:.1f} items from {stats['requests']} requests, "
+                      f"{stats['item_fill']:.0%} full)")
+        
         if self.failed_files:
             print(f"\n❌ Failed Files:")
             for failed in self.failed_files:
@@ -510,16 +1167,37 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="Complete Ingestion Pipeline")
-    parser.add_argument("files", nargs="+", help="Files to process")
+    parser.add_argument("files", nargs="*", help="Files or directories to process")
     parser.add_argument("--force", action="store_true", help="Force reprocessing")
     parser.add_argument("--save-outputs", action="store_true", help="Save intermediate outputs")
     parser.add_argument("--no-cleanup", action="store_true", help="Skip cleanup")
+    parser.add_argument("--workers", type=int, default=IngestionHyperparameters.BATCH_WORKERS,
+                        help="Files processed at once (1 processes them one by one)")
+    parser.add_argument("--streaming", action="store_true", default=None,
+                        help="Process every PDF page by page (default: only PDFs of STREAMING_MIN_PAGES or more)")
+    parser.add_argument("--prescan", action="store_true",
+                        help="Only hash the files and report what would be skipped, updated or added")
+    parser.add_argument("--migrate-index", action="store_true",
+                        help="Add the vector field to an existing keyword-only index and backfill vectors")
     
     args = parser.parse_args()
+    if not args.files and not args.migrate_index:
+        parser.error("at least one file is required unless --migrate-index is given")
+    requested = args.files
+    args.files = expand_file_paths(args.files)
+    if requested and not args.files:
+        print(f"❌ No supported files found in: {', '.join(requested)}")
+        sys.exit(1)
     
     print("🚀 Complete Ingestion Pipeline with Vector Storage")
     print("=" * 60)
     
+    if args.prescan:
+        # Local only: no Azure configuration needed
+        manifest = FileManifest(Config.FILE_MANIFEST_PATH) if Config.FILE_MANIFEST_PATH else None
+        print_prescan_report(prescan(args.files, manifest))
+        return
+    
     # Validate configuration
     required_env_vars = [
         'AZURE_OPENAI_ENDPOINT', 'AZURE_OPENAI_API_KEY',
@@ -535,11 +1213,23 @@ def main():
     
     # Initialize and run pipeline
     pipeline = CompleteIngestionPipeline()
+    
+    if args.migrate_index:
+        print(f"🔄 Migrating index {pipeline.search_service.index_name} to vector search...")
+        migration = pipeline.search_service.migrate_to_vector_index(pipeline.pipeline.embedding_service)
+        print(f"   - Documents seen: {migration['documents_seen']}")
+        print(f"   - Vectors backfilled: {migration['documents_updated']}")
+        print(f"   - Failed: {migration['documents_failed']}")
+        if not args.files:
+            return
+    
     results = pipeline.process_batch_with_storage_check(
         args.files,
         force_reprocess=args.force,
         save_outputs=args.save_outputs,
-        auto_cleanup=not args.no_cleanup
+        auto_cleanup=not args.no_cleanup,
+        workers=min(args.workers, len(args.files)),
+        streaming=args.streaming
     )
     
     # Print final statistics
@@ -27,10 +27,37 @@ class IngestionHyperparameters:
     # ============================================================================
     # EMBEDDING PARAMETERS
     # ============================================================================
-    EMBEDDING_BATCH_SIZE = 16            # Batch size for embedding generation
-    EMBEDDING_MAX_RETRIES = 3            # Maximum retry attempts for embeddings
-    EMBEDDING_RETRY_DELAY = 1.0          # Delay between retries (seconds)
-    EMBEDDING_DIMENSION = 1536           # Vector dimension for embeddings
+    EMBEDDING_BATCH_SIZE = 64            # Texts per embedding request (text-embedding-3 accepts up to 2048)
+    EMBEDDING_BATCH_MAX_TOKENS = 16000   # Tokens per embedding request (counted with tiktoken)
+    EMBEDDING_MICRO_BATCHING = True      # Pack texts from concurrent documents into shared requests
+    EMBEDDING_MAX_INPUT_TOKENS = 8191    # Tokens per text accepted by the model; longer texts are split
+    EMBEDDING_ADAPTIVE_BATCHING = True   # Shrink batches on 429s and slow responses, grow them back when fast
+    EMBEDDING_MIN_BATCH_SIZE = 4         # Smallest batch the adaptive batch size shrinks to
+    EMBEDDING_TARGET_LATENCY = 5.0       # Embedding responses slower than this (seconds) shrink the batches
+    EMBEDDING_REQUESTS_PER_MINUTE = 1800 # Requests-per-minute budget of the embedding deployment
+    EMBEDDING_TOKENS_PER_MINUTE = 300000 # Tokens-per-minute budget of the embedding deployment
+    EMBEDDING_BATCH_MAX_WAIT = 0.05      # Seconds a text waits for a shared embedding request to fill
+    EMBEDDING_MAX_IN_FLIGHT = 4          # Shared embedding requests sent at once
+    EMBEDDING_DIMENSION = 1536           # Vector dimension for embeddings (fallback for unknown models)
+    EMBEDDING_MODEL_DIMENSIONS = {       # Native vector dimension per embedding model
+        'text-embedding-3-large': 3072,
+        'text-embedding-3-small': 1536,
+        'text-embedding-ada-002': 1536
+    }
+    
+    # ============================================================================
+    # VECTOR INDEX PARAMETERS
+    # ============================================================================
+    VECTOR_FIELD_NAME = "content_vector"  # Search index field holding chunk embeddings
+    VECTOR_PROFILE_NAME = "content-vector-profile"  # Vector search profile name
+    VECTOR_ALGORITHM_NAME = "content-vector-hnsw"   # HNSW algorithm configuration name
+    VECTOR_METRIC = "cosine"             # Similarity metric for vector search
+    HNSW_M = 4                           # Bi-directional links per node
+    HNSW_EF_CONSTRUCTION = 400           # Candidate list size while building the graph
+    HNSW_EF_SEARCH = 500                 # Candidate list size at query time
+    VECTOR_MIGRATION_BATCH_SIZE = 100    # Documents backfilled per batch when migrating an index
+    SEARCH_UPLOAD_BATCH_SIZE = 500       # Index documents per shared upload request in batch mode (service limit 1000)
+    SEARCH_UPLOAD_MAX_WAIT = 0.5         # Seconds a document waits for a shared upload request to fill
     
     # ============================================================================
     # IMAGE PROCESSING PARAMETERS
@@ -38,6 +65,11 @@ class IngestionHyperparameters:
     MAX_IMAGE_SIZE = 20971520            # Maximum image size (20MB)
     IMAGE_QUALITY = 85                   # JPEG quality for image compression
     MIN_IMAGE_SIZE = 1024                # Minimum image size to process
+    IMAGE_PREPARATION_ENABLED = True     # Filter and downscale images before vision analysis
+    IMAGE_MIN_DIMENSION = 32             # Images narrower or shorter than this (pixels) are decorative
+    IMAGE_BLANK_STDDEV = 4.0             # Images whose colour channels vary less than this (0-255) are blank
+    IMAGE_PREPARATION_WORKERS = 4        # Threads decoding and downscaling a document's images
+    VISUAL_ELEMENT_SPILL_BYTES = 8 * 1024 * 1024  # Extracted images above this go to temp files, smaller ones stay in memory
     IMAGE_FORMATS = [                    # Supported image formats
         '.jpg', '.jpeg', '.png', '.gif', 
         '.bmp', '.tiff', '.webp'
@@ -50,6 +82,40 @@ class IngestionHyperparameters:
     PDF_IMAGE_THRESHOLD = 0.1            # Minimum image size ratio in PDF
     PDF_DRAWING_PROXIMITY = 50           # Proximity threshold for grouping drawings
     PDF_MIN_DRAWING_SIZE = 100           # Minimum drawing size to extract
+    PDF_SHARD_PROCESSES = 0              # Processes sharing the pages of a large PDF (0 = one per core, 1 = off)
+    PDF_SHARD_MIN_PAGES = 64             # PDFs with fewer pages are extracted in one process
+    PDF_SHARDS_PER_PROCESS = 4           # Page ranges per process, so uneven pages still balance
+    
+    # ============================================================================
+    # VISION CAPTIONING PARAMETERS
+    # ============================================================================
+    VISION_MAX_CONCURRENCY = 8           # Parallel GPT-4.1 Vision requests per document
+    VISION_REQUESTS_PER_MINUTE = 60      # Requests-per-minute budget per vision deployment
+    VISION_TOKENS_PER_MINUTE = 80000     # Tokens-per-minute budget per vision deployment
+    VISION_ESTIMATED_TOKENS_PER_IMAGE = 1200  # Tokens reserved per call before usage is known
+    VISION_MAX_TOKENS = 300              # Maximum completion tokens per image caption
+    VISION_MAX_LONG_SIDE = 2048          # Images are downscaled to fit the model's effective resolution:
+    VISION_MAX_SHORT_SIDE = 768          # GPT-4.1 high detail scales to 2048 px, then the short side to 768 px
+    
+    # ============================================================================
+    # AZURE OPENAI CLIENT PARAMETERS
+    # ============================================================================
+    OPENAI_MAX_RETRIES = 5               # Retries of throttled (429) or transient (5xx, timeout) requests
+    OPENAI_RETRY_BASE_DELAY = 1.0        # Backoff before the first retry (seconds), jittered
+    OPENAI_BACKOFF_MULTIPLIER = 2.0      # Exponential backoff multiplier
+    OPENAI_RETRY_MAX_DELAY = 30.0        # Longest backoff (seconds); a longer Retry-After is still honored
+    OPENAI_CIRCUIT_FAILURE_THRESHOLD = 5 # Consecutive transient failures that stop calls to a deployment
+    OPENAI_CIRCUIT_RESET_SECONDS = 30.0  # Seconds before a stopped deployment gets a trial call
+    
+    # ============================================================================
+    # CACHING PARAMETERS
+    # ============================================================================
+    CAPTION_CACHE_ENABLED = True         # Reuse captions for identical images
+    CAPTION_CACHE_PATH = "cache/caption_cache.sqlite"  # SQLite file for cached captions
+    CAPTION_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Caption cache size limit (256MB)
+    EMBEDDING_CACHE_ENABLED = True       # Reuse embeddings of unchanged chunk text
+    EMBEDDING_CACHE_PATH = "cache/embedding_cache.sqlite"  # SQLite file for cached embeddings
+    EMBEDDING_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # Embedding cache size limit (1GB, ~85k 3072-d vectors)
     
     # ============================================================================
     # PROCESSING PARAMETERS
@@ -58,6 +124,11 @@ class IngestionHyperparameters:
     TEMP_FILE_CLEANUP = True             # Auto-cleanup temporary files
     SAVE_INTERMEDIATE_OUTPUTS = False    # Save intermediate processing outputs
     PROCESSING_TIMEOUT = 300             # Processing timeout (seconds)
+    INCREMENTAL_INGESTION = True         # Re-ingesting a changed file only uploads/deletes the chunks that changed
+    STREAMING_MIN_PAGES = 200            # PDFs with at least this many pages are ingested page by page (0 = never)
+    STREAMING_PAGE_WINDOW = 8            # Pages extracted and captioned together when streaming
+    STREAMING_CHUNK_WINDOW = 64          # Chunks embedded and uploaded together when streaming
+    MEMORY_SAMPLE_INTERVAL = 0.05        # Seconds between RSS samples for the per-document peak memory report
     
     # ============================================================================
     # STORAGE PARAMETERS
@@ -74,9 +145,22 @@ class IngestionHyperparameters:
     # ============================================================================
     # PERFORMANCE PARAMETERS
     # ============================================================================
-    MAX_CONCURRENT_UPLOADS = 5           # Maximum concurrent file uploads
+    MAX_CONCURRENT_UPLOADS = 5           # Maximum concurrent file uploads (also the API's waiting-job queue size)
     MEMORY_LIMIT = 2 * 1024 * 1024 * 1024  # Memory limit (2GB)
     CPU_THREADS = 4                      # Number of CPU threads to use
+    EXTRACTION_PROCESSES = 2             # Worker processes for CPU-bound content extraction in the API
+    UPLOAD_RETRY_AFTER = 30              # Retry-After seconds sent when the upload queue is full
+    BATCH_WORKERS = 4                    # Files processed at once by the batch CLI (--workers)
+    PRESCAN_WORKERS = 8                  # Threads hashing files before a batch (--prescan)
+    
+    # ============================================================================
+    # JOB QUEUE PARAMETERS
+    # ============================================================================
+    JOB_LEASE_SECONDS = 30               # A job is retried if its worker misses heartbeats for this long
+    JOB_HEARTBEAT_SECONDS = 5            # How often workers renew leases and pick up cancellations
+    JOB_MAX_ATTEMPTS = 3                 # Leases a job may lose before it is marked failed
+    JOB_POLL_SECONDS = 1.0               # How often idle workers check the store for queued jobs
+    JOB_LIST_MAX_LIMIT = 200             # Maximum page size of GET /jobs
     
     # ============================================================================
     # VALIDATION PARAMETERS
@@ -107,11 +191,40 @@ class IngestionHyperparameters:
         """Get embedding configuration"""
         return {
             'batch_size': cls.EMBEDDING_BATCH_SIZE,
-            'max_retries': cls.EMBEDDING_MAX_RETRIES,
-            'retry_delay': cls.EMBEDDING_RETRY_DELAY,
+            'batch_max_tokens': cls.EMBEDDING_BATCH_MAX_TOKENS,
+            'micro_batching': cls.EMBEDDING_MICRO_BATCHING,
+            'max_input_tokens': cls.EMBEDDING_MAX_INPUT_TOKENS,
+            'adaptive_batching': cls.EMBEDDING_ADAPTIVE_BATCHING,
+            'min_batch_size': cls.EMBEDDING_MIN_BATCH_SIZE,
+            'target_latency': cls.EMBEDDING_TARGET_LATENCY,
+            'requests_per_minute': cls.EMBEDDING_REQUESTS_PER_MINUTE,
+            'tokens_per_minute': cls.EMBEDDING_TOKENS_PER_MINUTE,
+            'batch_max_wait': cls.EMBEDDING_BATCH_MAX_WAIT,
+            'max_in_flight': cls.EMBEDDING_MAX_IN_FLIGHT,
             'dimension': cls.EMBEDDING_DIMENSION
         }
     
+    @classmethod
+    def get_embedding_dimension(cls, model: str) -> int:
+        """Get the vector dimension produced by an embedding model"""
+        return cls.EMBEDDING_MODEL_DIMENSIONS.get(model, cls.EMBEDDING_DIMENSION)
+    
+    @classmethod
+    def get_vector_index_config(cls):
+        """Get vector index configuration"""
+        return {
+            'field_name': cls.VECTOR_FIELD_NAME,
+            'profile_name': cls.VECTOR_PROFILE_NAME,
+            'algorithm_name': cls.VECTOR_ALGORITHM_NAME,
+            'metric': cls.VECTOR_METRIC,
+            'hnsw_m': cls.HNSW_M,
+            'hnsw_ef_construction': cls.HNSW_EF_CONSTRUCTION,
+            'hnsw_ef_search': cls.HNSW_EF_SEARCH,
+            'migration_batch_size': cls.VECTOR_MIGRATION_BATCH_SIZE,
+            'upload_batch_size': cls.SEARCH_UPLOAD_BATCH_SIZE,
+            'upload_max_wait': cls.SEARCH_UPLOAD_MAX_WAIT
+        }
+    
     @classmethod
     def get_image_config(cls):
         """Get image processing configuration"""
@@ -119,6 +232,11 @@ class IngestionHyperparameters:
             'max_size': cls.MAX_IMAGE_SIZE,
             'quality': cls.IMAGE_QUALITY,
             'min_size': cls.MIN_IMAGE_SIZE,
+            'preparation_enabled': cls.IMAGE_PREPARATION_ENABLED,
+            'min_dimension': cls.IMAGE_MIN_DIMENSION,
+            'blank_stddev': cls.IMAGE_BLANK_STDDEV,
+            'preparation_workers': cls.IMAGE_PREPARATION_WORKERS,
+            'spill_bytes': cls.VISUAL_ELEMENT_SPILL_BYTES,
             'formats': cls.IMAGE_FORMATS
         }
     
@@ -129,7 +247,47 @@ class IngestionHyperparameters:
             'dpi': cls.PDF_DPI,
             'image_threshold': cls.PDF_IMAGE_THRESHOLD,
             'drawing_proximity': cls.PDF_DRAWING_PROXIMITY,
-            'min_drawing_size': cls.PDF_MIN_DRAWING_SIZE
+            'min_drawing_size': cls.PDF_MIN_DRAWING_SIZE,
+            'shard_processes': cls.PDF_SHARD_PROCESSES,
+            'shard_min_pages': cls.PDF_SHARD_MIN_PAGES,
+            'shards_per_process': cls.PDF_SHARDS_PER_PROCESS
+        }
+    
+    @classmethod
+    def get_vision_config(cls):
+        """Get vision captioning configuration"""
+        return {
+            'max_concurrency': cls.VISION_MAX_CONCURRENCY,
+            'requests_per_minute': cls.VISION_REQUESTS_PER_MINUTE,
+            'tokens_per_minute': cls.VISION_TOKENS_PER_MINUTE,
+            'estimated_tokens_per_image': cls.VISION_ESTIMATED_TOKENS_PER_IMAGE,
+            'max_tokens': cls.VISION_MAX_TOKENS,
+            'max_long_side': cls.VISION_MAX_LONG_SIDE,
+            'max_short_side': cls.VISION_MAX_SHORT_SIDE
+        }
+    
+    @classmethod
+    def get_openai_client_config(cls):
+        """Get Azure OpenAI client configuration"""
+        return {
+            'max_retries': cls.OPENAI_MAX_RETRIES,
+            'retry_base_delay': cls.OPENAI_RETRY_BASE_DELAY,
+            'backoff_multiplier': cls.OPENAI_BACKOFF_MULTIPLIER,
+            'retry_max_delay': cls.OPENAI_RETRY_MAX_DELAY,
+            'circuit_failure_threshold': cls.OPENAI_CIRCUIT_FAILURE_THRESHOLD,
+            'circuit_reset_seconds': cls.OPENAI_CIRCUIT_RESET_SECONDS
+        }
+    
+    @classmethod
+    def get_cache_config(cls):
+        """Get caching configuration"""
+        return {
+            'caption_cache_enabled': cls.CAPTION_CACHE_ENABLED,
+            'caption_cache_path': cls.CAPTION_CACHE_PATH,
+            'caption_cache_max_bytes': cls.CAPTION_CACHE_MAX_BYTES,
+            'embedding_cache_enabled': cls.EMBEDDING_CACHE_ENABLED,
+            'embedding_cache_path': cls.EMBEDDING_CACHE_PATH,
+            'embedding_cache_max_bytes': cls.EMBEDDING_CACHE_MAX_BYTES
         }
     
     @classmethod
@@ -139,18 +297,38 @@ class IngestionHyperparameters:
             'max_concurrent': cls.MAX_CONCURRENT_UPLOADS,
             'memory_limit': cls.MEMORY_LIMIT,
             'cpu_threads': cls.CPU_THREADS,
+            'extraction_processes': cls.EXTRACTION_PROCESSES,
+            'upload_retry_after': cls.UPLOAD_RETRY_AFTER,
+            'batch_workers': cls.BATCH_WORKERS,
+            'prescan_workers': cls.PRESCAN_WORKERS,
             'timeout': cls.PROCESSING_TIMEOUT
         }
     
+    @classmethod
+    def get_job_queue_config(cls):
+        """Get job queue configuration"""
+        return {
+            'lease_seconds': cls.JOB_LEASE_SECONDS,
+            'heartbeat_seconds': cls.JOB_HEARTBEAT_SECONDS,
+            'max_attempts': cls.JOB_MAX_ATTEMPTS,
+            'poll_seconds': cls.JOB_POLL_SECONDS,
+            'list_max_limit': cls.JOB_LIST_MAX_LIMIT
+        }
+    
     @classmethod
     def get_all_config(cls):
         """Get all hyperparameters as a dictionary"""
         return {
             'chunking': cls.get_chunking_config(),
             'embedding': cls.get_embedding_config(),
+            'vector_index': cls.get_vector_index_config(),
             'image': cls.get_image_config(),
             'pdf': cls.get_pdf_config(),
+            'vision': cls.get_vision_config(),
+            'openai_client': cls.get_openai_client_config(),
+            'cache': cls.get_cache_config(),
             'performance': cls.get_performance_config(),
+            'job_queue': cls.get_job_queue_config(),
             'validation': {
                 'min_chunk_size': cls.MIN_CHUNK_SIZE,
                 'max_chunk_size': cls.MAX_CHUNK_SIZE,
@@ -160,6 +338,11 @@ class IngestionHyperparameters:
             'processing': {
                 'temp_cleanup': cls.TEMP_FILE_CLEANUP,
                 'save_outputs': cls.SAVE_INTERMEDIATE_OUTPUTS,
-                'max_file_size': cls.MAX_FILE_SIZE
+                'max_file_size': cls.MAX_FILE_SIZE,
+                'incremental_ingestion': cls.INCREMENTAL_INGESTION,
+                'streaming_min_pages': cls.STREAMING_MIN_PAGES,
+                'streaming_page_window': cls.STREAMING_PAGE_WINDOW,
+                'streaming_chunk_window': cls.STREAMING_CHUNK_WINDOW,
+                'memory_sample_interval': cls.MEMORY_SAMPLE_INTERVAL
             }
         } 
\ No newline at end of file
@@ -1,6 +1,6 @@
 # Multimodal Ingestion Pipeline Package
 
-from .multimodal_pipeline import MultimodalPipeline
+from .multimodal_pipeline import MultimodalPipeline, ProcessingCancelled
 from .dispatcher import ContentDispatcher
  
-__all__ = ['MultimodalPipeline', 'ContentDispatcher'] 
\ No newline at end of file
+__all__ = ['MultimodalPipeline', 'ProcessingCancelled', 'ContentDispatcher'] 
\ No newline at end of file
@@ -1,5 +1,6 @@
 # Agents package for multimodal ingestion pipeline
 
 from .image_captioning_agent import ImageCaptioningAgent
+from .captioning_engine import ConcurrentCaptioningEngine
  
-__all__ = ['ImageCaptioningAgent'] 
\ No newline at end of file
+__all__ = ['ImageCaptioningAgent', 'ConcurrentCaptioningEngine'] 
\ No newline at end of file
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Concurrent Captioning Engine
+Fans GPT-4.1 Vision requests out over a bounded thread pool while preserving input order
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from .image_captioning_agent import ImageCaptioningAgent
+from hyperparameters import IngestionHyperparameters
+
+logger = logging.getLogger(__name__)
+
+class _CaptioningObserver:
+    """Collects the rate-limit waits and throttles of one caption_all call from the gateway"""
+
+    def __init__(self):
+        self.wait_time = 0.0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_time += seconds
+
+    def record_throttle(self):
+        with self._lock:
+            self.throttled += 1
+
+    def record_success(self, latency: float):
+        pass
+
+class ConcurrentCaptioningEngine:
+    """Bounded-concurrency wrapper around ImageCaptioningAgent.analyze_image"""
+
+    def __init__(self, agent: ImageCaptioningAgent, max_concurrency: Optional[int] = None):
+        """
+        Initialize the captioning engine
+
+        Args:
+            agent: Image captioning agent used for each request
+            max_concurrency: Maximum in-flight vision requests (defaults to hyperparameters)
+        """
+        self.agent = agent
+        self.max_concurrency = max(1, max_concurrency or IngestionHyperparameters.VISION_MAX_CONCURRENCY)
+
+        logger.info(f"Captioning engine initialized with concurrency={self.max_concurrency}")
+
+    @staticmethod
+    def new_stats() -> Dict[str, Any]:
+        """Empty captioning statistics, accumulated over the caption_all calls of one document"""
+        return {'images': 0, 'concurrency': 0, 'wall_time': 0.0, 'rate_limit_wait_time': 0.0,
+                'throttled': 0, 'images_per_second': 0.0}
+
+    def caption_all(self, requests: List[Dict[str, Any]],
+                    stats: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Caption a batch of images concurrently
+
+        Args:
+            requests: List of keyword-argument dictionaries for analyze_image
+            stats: Accumulates this batch's counts and times (see new_stats); only this batch's
+                own rate-limit waits are counted, not those of other documents sharing the deployment
+
+        Returns:
+            List of analysis results in the same order as requests
+        """
+        if not requests:
+            return []
+
+        start_time = time.time()
+        observer = _CaptioningObserver()
+        workers = min(self.max_concurrency, len(requests))
+
+        if workers == 1:
+            results = [self._caption_one(request, observer) for request in requests]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vision") as executor:
+                # executor.map yields results in submission order
+                results = list(executor.map(lambda request: self._caption_one(request, observer), requests))
+
+        wall_time = time.time() - start_time
+        if stats is not None:
+            stats['images'] += len(requests)
+            stats['concurrency'] = max(stats['concurrency'], workers)
+            stats['wall_time'] += wall_time
+            stats['rate_limit_wait_time'] += observer.wait_time
+            stats['throttled'] += observer.throttled
+            stats['images_per_second'] = stats['images'] / stats['wall_time'] if stats['wall_time'] > 0 else 0.0
+
+        logger.info(f"Captioned {len(requests)} images in {wall_time:.2f}s with concurrency {workers}")
+        return results
+
+    def _caption_one(self, request: Dict[str, Any], observer: Any = None) -> Dict[str, Any]:
+        """Caption a single image, converting unexpected errors into failed results"""
+        try:
+            return self.agent.analyze_image(**request, observer=observer)
+        except Exception as e:
+            logger.error(f"Error captioning image {request.get('image_id', '')}: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'image_id': request.get('image_id', ''),
+                'image_path': request.get('image_path')
+            }
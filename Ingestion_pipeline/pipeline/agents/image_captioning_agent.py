@@ -6,25 +6,57 @@ Analyzes visual elements and provides context-aware summaries
 
 import logging
 import base64
+import hashlib
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from openai import AzureOpenAI
 from ..utils.config import Config
+from ..utils.caption_cache import CaptionCache
+from ..utils.openai_gateway import get_gateway
+from hyperparameters import IngestionHyperparameters
 
 logger = logging.getLogger(__name__)
 
 class ImageCaptioningAgent:
     """GPT-4.1 Vision agent for image analysis and captioning"""
     
-    def __init__(self):
-        """Initialize the image captioning agent"""
-        self.client = AzureOpenAI(
+    def __init__(self, client: Optional[AzureOpenAI] = None):
+        """
+        Initialize the image captioning agent
+        
+        Args:
+            client: Pre-built OpenAI client (defaults to an AzureOpenAI client from Config; retries are
+                left to the shared gateway, so a pre-built client should use max_retries=0)
+        """
+        self.client = client or AzureOpenAI(
             api_key=Config.AZURE_OPENAI_API_KEY,
             api_version=Config.AZURE_OPENAI_API_VERSION,
-            azure_endpoint=Config.AZURE_OPENAI_ENDPOINT
+            azure_endpoint=Config.AZURE_OPENAI_ENDPOINT,
+            max_retries=0
         )
         self.model = Config.GPT41_MODEL
         self.deployment = Config.GPT41_DEPLOYMENT_NAME
+        self.max_tokens = IngestionHyperparameters.VISION_MAX_TOKENS
+        
+        # Shared per-deployment RPM/TPM budget, retries and circuit breaker
+        self.estimated_tokens_per_image = IngestionHyperparameters.VISION_ESTIMATED_TOKENS_PER_IMAGE
+        self.gateway = get_gateway(
+            self.deployment,
+            IngestionHyperparameters.VISION_REQUESTS_PER_MINUTE,
+            IngestionHyperparameters.VISION_TOKENS_PER_MINUTE
+        )
+        self.rate_limiter = self.gateway.limiter
+        
+        # Content-addressed caption cache shared across documents and re-ingests
+        self.caption_cache = None
+        if IngestionHyperparameters.CAPTION_CACHE_ENABLED:
+            self.caption_cache = CaptionCache(
+                IngestionHyperparameters.CAPTION_CACHE_PATH,
+                IngestionHyperparameters.CAPTION_CACHE_MAX_BYTES
+            )
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
         
         # Analysis prompts for different contexts
         self.analysis_prompts = {
@@ -53,27 +85,93 @@ class ImageCaptioningAgent:
 4. Brief purpose or function"""
         }
     
-    def analyze_image(self, image_path: str, context_text: str = "", 
-                     image_id: str = "", analysis_type: str = "default") -> Dict[str, Any]:
+    def analyze_image(self, image_path: Optional[str] = None, context_text: str = "", 
+                     image_id: str = "", analysis_type: str = "default",
+                     image_hash: Optional[str] = None,
+                     image_data: Optional[bytes] = None,
+                     image_mime: str = "image/png",
+                     observer: Any = None) -> Dict[str, Any]:
         """
         Analyze image using GPT-4.1 Vision
         
         Args:
-            image_path: Path to the image file
+            image_path: Path to the image file (read only when image_data is not given)
             context_text: Surrounding text context
             image_id: Unique identifier for the image
             analysis_type: Type of analysis ('default', 'scientific', 'document', 'technical')
+            image_hash: MD5 hash of the image bytes (computed if not provided)
+            image_data: Encoded image bytes held in memory
+            image_mime: MIME type of the image bytes
+            observer: Told about rate-limit waits and throttling of the vision call (see OpenAIGateway.call)
             
         Returns:
             Dictionary with analysis results
         """
+        try:
+            # Read image unless it is already in memory
+            if image_data is None:
+                with open(image_path, "rb") as image_file:
+                    image_data = image_file.read()
+            
+            image_hash = image_hash or hashlib.md5(image_data).hexdigest()
+            
+            if self.caption_cache is None:
+                return self._analyze_uncached(image_data, image_path, context_text, image_id, analysis_type,
+                                              image_hash, image_mime, observer)
+            
+            # Identical images requested concurrently wait for the first caption instead of re-captioning
+            cache_key = CaptionCache.make_key(image_hash, analysis_type, self.deployment)
+            is_owner, done = self._claim_inflight(cache_key)
+            if not is_owner:
+                done.wait()
+            
+            try:
+                cached = self.caption_cache.get_caption(image_hash, analysis_type, self.deployment)
+                if cached:
+                    logger.info(f"Caption cache hit for image {image_id}")
+                    return {
+                        'success': True,
+                        'analysis': cached['analysis'],
+                        'image_id': image_id,
+                        'context_used': bool(context_text),
+                        'analysis_type': analysis_type,
+                        'tokens_used': 0,
+                        'model_used': cached.get('model_used', self.model),
+                        'image_path': image_path,
+                        'image_hash': image_hash,
+                        'cached': True
+                    }
+                
+                result = self._analyze_uncached(image_data, image_path, context_text, image_id, analysis_type,
+                                                image_hash, image_mime, observer)
+                if result.get('success'):
+                    self.caption_cache.put_caption(image_hash, analysis_type, self.deployment, {
+                        'analysis': result['analysis'],
+                        'model_used': result['model_used'],
+                        'tokens_used': result['tokens_used']
+                    })
+                return result
+            finally:
+                if is_owner:
+                    self._release_inflight(cache_key)
+            
+        except Exception as e:
+            logger.error(f"Error analyzing image {image_path or image_id}: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'image_id': image_id,
+                'image_path': image_path
+            }
+    
+    def _analyze_uncached(self, image_data: bytes, image_path: str, context_text: str,
+                          image_id: str, analysis_type: str, image_hash: str,
+                          image_mime: str = "image/png", observer: Any = None) -> Dict[str, Any]:
+        """Caption image bytes with a GPT-4.1 Vision request"""
         try:
             logger.info(f"Analyzing image {image_id} with GPT-4.1 Vision")
             
-            # Read and encode image
-            with open(image_path, "rb") as image_file:
-                image_data = image_file.read()
-                base64_image = base64.b64encode(image_data).decode('utf-8')
+            base64_image = base64.b64encode(image_data).decode('utf-8')
             
             # Prepare analysis prompt
             base_prompt = self.analysis_prompts.get(analysis_type, self.analysis_prompts['default'])
@@ -106,21 +204,27 @@ Please analyze the image in relation to this context and provide insights about
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/png;base64,{base64_image}"
+                                "url": f"data:{image_mime};base64,{base64_image}"
                             }
                         }
                     ]
                 }
             ]
             
-            # Call GPT-4.1
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=messages,
-                max_tokens=300,
-                temperature=0.3
+            # Call GPT-4.1 within the deployment's rate budget
+            response = self.gateway.call(
+                lambda: self.client.chat.completions.create(
+                    model=self.deployment,
+                    messages=messages,
+                    max_tokens=self.max_tokens,
+                    temperature=0.3
+                ),
+                tokens=self.estimated_tokens_per_image,
+                observer=observer
             )
             
+            tokens_used = response.usage.total_tokens if getattr(response, 'usage', None) else None
+            
             analysis = response.choices[0].message.content
             
             return {
@@ -129,13 +233,15 @@ Please analyze the image in relation to this context and provide insights about
                 'image_id': image_id,
                 'context_used': bool(context_text),
                 'analysis_type': analysis_type,
-                'tokens_used': response.usage.total_tokens if hasattr(response, 'usage') else None,
+                'tokens_used': tokens_used,
                 'model_used': self.model,
-                'image_path': image_path
+                'image_path': image_path,
+                'image_hash': image_hash,
+                'cached': False
             }
             
         except Exception as e:
-            logger.error(f"Error analyzing image {image_path}: {e}")
+            logger.error(f"Error analyzing image {image_path or image_id}: {e}")
             return {
                 'success': False,
                 'error': str(e),
@@ -143,13 +249,30 @@ Please analyze the image in relation to this context and provide insights about
                 'image_path': image_path
             }
     
+    def _claim_inflight(self, key: str) -> Tuple[bool, threading.Event]:
+        """Register a caption in progress; returns (is_owner, completion event)"""
+        with self._inflight_lock:
+            event = self._inflight.get(key)
+            if event is None:
+                event = threading.Event()
+                self._inflight[key] = event
+                return True, event
+            return False, event
+    
+    def _release_inflight(self, key: str):
+        """Mark a caption as finished and wake up waiting requests"""
+        with self._inflight_lock:
+            event = self._inflight.pop(key, None)
+        if event:
+            event.set()
+    
     def analyze_multiple_images(self, images: List[Dict[str, Any]], 
                               context_text: str = "", analysis_type: str = "default") -> List[Dict[str, Any]]:
         """
         Analyze multiple images with shared context
         
         Args:
-            images: List of image dictionaries with 'path' and 'id' keys
+            images: List of image dictionaries with 'id' and 'data' (bytes) or 'path' keys
             context_text: Shared context text for all images
             analysis_type: Type of analysis to perform
             
@@ -160,9 +283,10 @@ Please analyze the image in relation to this context and provide insights about
         
         for image_info in images:
             image_path = image_info.get('path')
+            image_data = image_info.get('data')
             image_id = image_info.get('id', '')
             
-            if not image_path or not Path(image_path).exists():
+            if image_data is None and (not image_path or not Path(image_path).exists()):
                 logger.warning(f"Image path not found: {image_path}")
                 continue
             
@@ -170,7 +294,8 @@ Please analyze the image in relation to this context and provide insights about
                 image_path=image_path,
                 context_text=context_text,
                 image_id=image_id,
-                analysis_type=analysis_type
+                analysis_type=analysis_type,
+                image_data=image_data
             )
             
             results.append(result)
@@ -247,8 +372,10 @@ Please analyze the image in relation to this context and provide insights about
         """
         successful_analyses = [a for a in image_analyses if a.get('success')]
         failed_analyses = [a for a in image_analyses if not a.get('success')]
+        cache_hits = sum(1 for a in successful_analyses if a.get('cached'))
+        cache_misses = len(image_analyses) - cache_hits
         
-        total_tokens = sum(a.get('tokens_used', 0) for a in successful_analyses)
+        total_tokens = sum(a.get('tokens_used') or 0 for a in successful_analyses)
         avg_analysis_length = sum(len(a.get('analysis', '')) for a in successful_analyses) / max(len(successful_analyses), 1)
         
         return {
@@ -258,5 +385,9 @@ Please analyze the image in relation to this context and provide insights about
             'success_rate': len(successful_analyses) / max(len(image_analyses), 1) * 100,
             'total_tokens_used': total_tokens,
             'average_analysis_length': avg_analysis_length,
-            'model_used': self.model
+            'model_used': self.model,
+            'cache_hits': cache_hits,
+            'cache_misses': cache_misses,
+            'cache_hit_rate': cache_hits / max(len(image_analyses), 1) * 100,
+            'cache': self.caption_cache.get_statistics() if self.caption_cache else None
         } 
\ No newline at end of file
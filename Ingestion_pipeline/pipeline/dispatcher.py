@@ -6,7 +6,7 @@ Routes different file types to appropriate content extractors
 
 import logging
 from pathlib import Path
-from typing import Dict, Any, Union
+from typing import Dict, Any, Optional, Union
 from .extractors.pdf_extractor import PDFExtractor
 from .extractors.docx_extractor import DOCXExtractor
 from .extractors.pptx_extractor import PPTXExtractor
@@ -18,10 +18,15 @@ logger = logging.getLogger(__name__)
 class ContentDispatcher:
     """Dispatcher for routing file types to appropriate extractors"""
     
-    def __init__(self):
-        """Initialize the content dispatcher with supported extractors"""
+    def __init__(self, pdf_shard_processes: Optional[int] = None):
+        """
+        Initialize the content dispatcher with supported extractors
+        
+        Args:
+            pdf_shard_processes: Processes sharing the pages of a large PDF (defaults to PDF_SHARD_PROCESSES)
+        """
         self.extractors = {
-            '.pdf': PDFExtractor(),
+            '.pdf': PDFExtractor(shard_processes=pdf_shard_processes),
             '.docx': DOCXExtractor(),
             '.doc': DOCXExtractor(),
             '.pptx': PPTXExtractor(),
@@ -83,4 +88,24 @@ class ContentDispatcher:
     def is_supported(self, file_path: Union[str, Path]) -> bool:
         """Check if file type is supported"""
         file_extension = Path(file_path).suffix.lower()
-        return file_extension in self.extractors 
\ No newline at end of file
+        return file_extension in self.extractors
+
+# One dispatcher per worker process, created on first use
+_worker_dispatcher = None
+
+def extract_content_in_worker(file_path: str, pdf_shard_processes: int = 1) -> Dict[str, Any]:
+    """
+    Extract content in a worker process (entry point for a process pool)
+    
+    Args:
+        file_path: Path to the file to process
+        pdf_shard_processes: Processes sharing the pages of a large PDF; the pool already spreads
+            files across cores, so by default each worker extracts on its own
+        
+    Returns:
+        Dictionary containing extracted text and images
+    """
+    global _worker_dispatcher
+    if _worker_dispatcher is None:
+        _worker_dispatcher = ContentDispatcher(pdf_shard_processes=pdf_shard_processes)
+    return _worker_dispatcher.extract_content(file_path)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Extraction Process Pool
+Runs content extraction in spawned worker processes and replaces the pool when a worker crashes
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+
+from .dispatcher import extract_content_in_worker
+from .multimodal_pipeline import ProcessingCancelled
+
+logger = logging.getLogger(__name__)
+
+# How often an extraction waited on with a cancel event checks whether it was cancelled
+CANCEL_POLL_SECONDS = 0.5
+
+class ExtractionPool:
+    """Process pool for extract_content_in_worker, shared by the threads processing documents"""
+
+    def __init__(self, processes: int, pdf_shard_processes: int = 1):
+        """
+        Start the pool
+
+        Args:
+            processes: Extraction worker processes
+            pdf_shard_processes: Processes each worker shards the pages of a large PDF over
+        """
+        self.processes = processes
+        self.pdf_shard_processes = pdf_shard_processes
+        self._lock = threading.Lock()
+        self._pool = self._create_pool()
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        # Spawned rather than forked: forking a process that runs threads can deadlock the child
+        return ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"))
+
+    def extract(self, file_path: Union[str, Path], cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Extract a file's content in a worker process
+
+        Args:
+            file_path: Path to the file
+            cancel_event: Polled while waiting; once set, the extraction is dropped and ProcessingCancelled raised
+
+        Returns:
+            The extraction result
+
+        Raises:
+            BrokenProcessPool: A worker crashed (e.g. on a malformed PDF); the pool has been replaced
+        """
+        pool = self._pool
+        try:
+            future = pool.submit(extract_content_in_worker, str(file_path), self.pdf_shard_processes)
+            if cancel_event is None:
+                return future.result()
+            while True:
+                try:
+                    return future.result(timeout=CANCEL_POLL_SECONDS)
+                except FutureTimeoutError:
+                    if cancel_event.is_set():
+                        # Drops the extraction if it has not started; a running one finishes and is discarded
+                        future.cancel()
+                        raise ProcessingCancelled()
+        except BrokenProcessPool:
+            self._replace(pool)
+            raise
+
+    def _replace(self, broken: ProcessPoolExecutor):
+        """Replace a broken pool once, however many of its extractions report the break"""
+        with self._lock:
+            if self._pool is not broken:
+                return
+            logger.error("Extraction process pool broke, restarting it")
+            self._pool = self._create_pool()
+        broken.shutdown(wait=False)
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """Stop the worker processes"""
+        with self._lock:
+            pool = self._pool
+        pool.shutdown(wait=wait, cancel_futures=cancel_futures)
@@ -6,28 +6,40 @@ Extracts text and individual visual elements from PDF documents
 
 import logging
 import hashlib
+import math
+import multiprocessing
+import os
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import fitz  # PyMuPDF
-from PIL import Image
 import io
 
+from hyperparameters import IngestionHyperparameters
+
 logger = logging.getLogger(__name__)
 
 class PDFExtractor:
     """Enhanced PDF extractor with individual visual element extraction"""
     
-    def __init__(self, temp_dir: str = "temp_images"):
+    def __init__(self, temp_dir: str = "temp_images", shard_processes: Optional[int] = None):
         """
         Initialize PDF extractor
         
         Args:
             temp_dir: Directory for temporary image files
+            shard_processes: Processes sharing the pages of a large PDF (defaults to PDF_SHARD_PROCESSES,
+                0 uses every core, 1 extracts in the calling process)
         """
         self.temp_dir = Path(temp_dir)
         self.temp_dir.mkdir(exist_ok=True)
         self.temp_files = set()
+        if shard_processes is None:
+            shard_processes = IngestionHyperparameters.PDF_SHARD_PROCESSES
+        self.shard_processes = shard_processes or os.cpu_count() or 1
+        self._shard_pool = None
         
     def extract_content(self, file_path: Path) -> Dict[str, Any]:
         """
@@ -44,12 +56,17 @@ class PDFExtractor:
             
             # Open PDF
             pdf_document = fitz.open(str(file_path))
+            page_count = len(pdf_document)
             
-            # Extract text content
-            text_content = self._extract_text(pdf_document)
-            
-            # Extract visual elements
-            visual_elements = self._extract_visual_elements(pdf_document, file_path.stem)
+            if self._should_shard(page_count):
+                # Pages are split across processes, each opening its own document
+                text_content, visual_elements = self._extract_sharded(file_path, page_count)
+            else:
+                # Extract text content
+                text_content = self._extract_text(pdf_document)
+                
+                # Extract visual elements
+                visual_elements = self._extract_visual_elements(pdf_document, file_path.stem)
             
             # Extract metadata
             metadata = self._extract_metadata(pdf_document, file_path)
@@ -74,22 +91,113 @@ class PDFExtractor:
                 'filename': file_path.name
             }
     
-    def _extract_text(self, pdf_document: fitz.Document) -> str:
+    def iter_pages(self, file_path: Path) -> Iterator[Dict[str, Any]]:
+        """
+        Extract a PDF page by page, for streaming ingestion
+        
+        Only the current page is held in memory; the document is closed once the iterator is exhausted
+        or closed.
+        
+        Args:
+            file_path: Path to PDF file
+            
+        Yields:
+            {'page_number', 'text' (without page marker), 'visual_elements'} for each page in order
+        """
+        logger.info(f"Streaming pages from PDF: {file_path}")
+        with fitz.open(str(file_path)) as pdf_document:
+            for page_num in range(len(pdf_document)):
+                page = pdf_document[page_num]
+                yield {
+                    'page_number': page_num + 1,
+                    'text': page.get_text(),
+                    'visual_elements': (self._extract_embedded_images(pdf_document, page, page_num, file_path.stem) +
+                                        self._extract_drawing_elements(page, page_num, file_path.stem))
+                }
+    
+    def get_page_count(self, file_path: Path) -> int:
+        """Number of pages in a PDF (only the page tree is read)"""
+        with fitz.open(str(file_path)) as pdf_document:
+            return len(pdf_document)
+    
+    def get_metadata(self, file_path: Path) -> Dict[str, Any]:
+        """Extract metadata from a PDF without extracting its content"""
+        with fitz.open(str(file_path)) as pdf_document:
+            return self._extract_metadata(pdf_document, file_path)
+    
+    def _should_shard(self, page_count: int) -> bool:
+        """Whether a document is large enough to be worth splitting across processes"""
+        return self.shard_processes > 1 and page_count >= IngestionHyperparameters.PDF_SHARD_MIN_PAGES
+    
+    def _extract_sharded(self, file_path: Path, page_count: int) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Extract text and visual elements with the page range split across a process pool
+        
+        Args:
+            file_path: Path to PDF file
+            page_count: Number of pages in the document
+            
+        Returns:
+            (text content, visual elements), both in page order as in serial extraction
+        """
+        # More shards than processes so a run of image-heavy pages does not leave one process behind
+        shard_count = min(page_count, self.shard_processes * IngestionHyperparameters.PDF_SHARDS_PER_PROCESS)
+        bounds = [page_count * i // shard_count for i in range(shard_count + 1)]
+        logger.info(f"Extracting {page_count} pages in {shard_count} shards on {self.shard_processes} processes")
+        
+        pool = self._get_shard_pool()
+        try:
+            futures = [
+                pool.submit(extract_pages_in_worker, str(file_path), start, stop,
+                            str(self.temp_dir.resolve()), file_path.stem)
+                for start, stop in zip(bounds, bounds[1:])
+            ]
+            page_texts, visual_elements = [], []
+            for future in futures:
+                texts, elements, temp_files = future.result()
+                page_texts.extend(texts)
+                visual_elements.extend(elements)
+                self.temp_files.update(temp_files)
+        except BrokenProcessPool:
+            # A crashed worker (e.g. on a malformed page) breaks the pool; the next document gets a new one
+            self._shard_pool = None
+            pool.shutdown(wait=False)
+            raise
+        
+        logger.info(f"Extracted {len(visual_elements)} visual elements from PDF")
+        return "\n\n".join(page_texts), visual_elements
+    
+    def _get_shard_pool(self) -> ProcessPoolExecutor:
+        """Process pool for sharded extraction, created on first use and kept for later documents"""
+        if self._shard_pool is None:
+            # Spawned rather than forked: forking a process that runs threads can deadlock the child
+            self._shard_pool = ProcessPoolExecutor(
+                max_workers=self.shard_processes,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._shard_pool
+    
+    def _extract_text(self, pdf_document: fitz.Document, pages: Optional[range] = None) -> str:
         """Extract text content from PDF"""
+        return "\n\n".join(self._extract_page_texts(pdf_document, pages))
+    
+    def _extract_page_texts(self, pdf_document: fitz.Document, pages: Optional[range] = None) -> List[str]:
+        """Extract the text of each page, headed by its page number"""
         text_content = []
         
-        for page_num in range(len(pdf_document)):
+        for page_num in pages if pages is not None else range(len(pdf_document)):
             page = pdf_document[page_num]
             page_text = page.get_text()
             text_content.append(f"--- Page {page_num + 1} ---\n{page_text}")
         
-        return "\n\n".join(text_content)
+        return text_content
     
-    def _extract_visual_elements(self, pdf_document: fitz.Document, filename: str) -> List[Dict[str, Any]]:
+    def _extract_visual_elements(self, pdf_document: fitz.Document, filename: str,
+                                 pages: Optional[range] = None) -> List[Dict[str, Any]]:
         """Extract individual visual elements from PDF"""
         visual_elements = []
         
-        for page_num in range(len(pdf_document)):
+        for page_num in pages if pages is not None else range(len(pdf_document)):
             page = pdf_document[page_num]
             
             # Extract embedded images
@@ -116,38 +224,24 @@ class PDFExtractor:
                 pix = fitz.Pixmap(pdf_document, xref)
                 
                 # Convert to RGB if necessary
-                if pix.n - pix.alpha < 4:  # GRAY or RGB
-                    img_data = pix.tobytes("png")
-                else:  # CMYK: convert to RGB
-                    pix1 = fitz.Pixmap(fitz.csRGB, pix)
-                    img_data = pix1.tobytes("png")
-                    pix1 = None
+                if pix.n - pix.alpha >= 4:  # CMYK: convert to RGB
+                    pix = fitz.Pixmap(fitz.csRGB, pix)
+                img_data = pix.tobytes("png")
                 
                 # Create unique image ID
                 image_hash = hashlib.md5(img_data).hexdigest()
                 image_id = f"{filename}_page{page_num+1}_img{img_index+1}_{image_hash[:8]}"
                 
-                # Save image to temp directory
-                image_path = self.temp_dir / f"{image_id}.png"
-                with open(image_path, 'wb') as f:
-                    f.write(img_data)
-                
-                self.temp_files.add(str(image_path))
-                
-                # Get image dimensions
-                with Image.open(image_path) as img_pil:
-                    width, height = img_pil.size
-                
                 image_info = {
                     'id': image_id,
                     'type': 'embedded_image',
                     'page_number': page_num + 1,
                     'image_index': img_index + 1,
-                    'path': str(image_path),
+                    **self._hold_image(image_id, img_data),
                     'format': 'png',
                     'size': len(img_data),
-                    'width': width,
-                    'height': height,
+                    'width': pix.width,
+                    'height': pix.height,
                     'hash': image_hash,
                     'extraction_method': 'PyMuPDF_Embedded'
                 }
@@ -163,6 +257,21 @@ class PDFExtractor:
         
         return images
     
+    def _hold_image(self, image_id: str, img_data: bytes) -> Dict[str, Any]:
+        """
+        Keep encoded image bytes in memory, spilling them to a temporary file above VISUAL_ELEMENT_SPILL_BYTES
+        
+        Returns:
+            {'data': bytes} or {'path': temporary file}, to merge into the visual element
+        """
+        if len(img_data) <= IngestionHyperparameters.VISUAL_ELEMENT_SPILL_BYTES:
+            return {'data': img_data}
+        image_path = self.temp_dir / f"{image_id}.png"
+        with open(image_path, 'wb') as f:
+            f.write(img_data)
+        self.temp_files.add(str(image_path))
+        return {'path': str(image_path)}
+    
     def _extract_drawing_elements(self, page: fitz.Page, page_num: int, filename: str) -> List[Dict[str, Any]]:
         """Extract visual elements from drawings"""
         elements = []
@@ -187,20 +296,8 @@ class PDFExtractor:
                 mat = fitz.Matrix(2, 2)  # 2x zoom for quality
                 pix = page.get_pixmap(matrix=mat, clip=bbox)
                 
-                # Save the visual element
                 elem_id = f"{filename}_page{page_num+1}_visual_elem{elem_index+1}"
-                elem_path = self.temp_dir / f"{elem_id}.png"
-                
-                pix.save(str(elem_path))
-                self.temp_files.add(str(elem_path))
-                
-                # Get dimensions
-                with Image.open(elem_path) as img_pil:
-                    width, height = img_pil.size
-                
-                # Read the saved image data
-                with open(elem_path, 'rb') as f:
-                    img_data = f.read()
+                img_data = pix.tobytes("png")
                 
                 # Skip if image is too small (likely noise)
                 if len(img_data) < 100:
@@ -213,11 +310,11 @@ class PDFExtractor:
                     'type': 'visual_element',
                     'page_number': page_num + 1,
                     'image_index': elem_index + 1,
-                    'path': str(elem_path),
+                    **self._hold_image(elem_id, img_data),
                     'format': 'png',
                     'size': len(img_data),
-                    'width': width,
-                    'height': height,
+                    'width': pix.width,
+                    'height': pix.height,
                     'hash': image_hash,
                     'extraction_method': 'PyMuPDF_VisualElements',
                     'bbox': [bbox.x0, bbox.y0, bbox.x1, bbox.y1],
@@ -235,52 +332,70 @@ class PDFExtractor:
         
         return elements
     
-    def _group_drawings_by_proximity(self, drawings, proximity_threshold=50):
-        """Group drawings that are close to each other"""
+    def _group_drawings_by_proximity(self, drawings, proximity_threshold=None):
+        """
+        Group drawings whose centers are closer than the threshold, directly or through a chain of drawings
+        
+        Centers are bucketed into a grid of cells small enough that drawings sharing a cell are always
+        close, and linked drawings are merged with union-find. A drawing is only compared with drawings
+        in nearby cells, and not at all with a cell already in its group, so dense pages stay near-linear.
+        Groups come out in order of their first drawing.
+        """
         if not drawings:
             return []
+        threshold = proximity_threshold or IngestionHyperparameters.PDF_DRAWING_PROXIMITY
+        cell_size = threshold / 2 ** 0.5  # Cell diagonal equals the threshold
+        limit = threshold * threshold
+        # Neighbouring cells whose nearest points are closer than the threshold
+        reach = math.ceil(threshold / cell_size)
+        offsets = [(dx, dy) for dx in range(-reach, reach + 1) for dy in range(-reach, reach + 1)
+                   if (max(abs(dx) - 1, 0) ** 2 + max(abs(dy) - 1, 0) ** 2) * cell_size * cell_size < limit]
         
-        groups = []
-        used = set()
+        parent = list(range(len(drawings)))
         
-        for i, drawing in enumerate(drawings):
-            if i in used:
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        centers = []
+        for drawing in drawings:
+            rect = drawing.get('rect')
+            centers.append(((rect[0] + rect[2]) / 2, (rect[1] + rect[3]) / 2) if rect else None)
+        
+        # cell -> drawings whose centers fall in it (always one group)
+        grid = {}
+        for i, center in enumerate(centers):
+            if center is None:
                 continue
-                
-            group = [drawing]
-            used.add(i)
+            cx, cy = center
+            col, row = int(cx // cell_size), int(cy // cell_size)
             
-            # Find drawings close to this one
-            bbox1 = drawing.get('rect', [0, 0, 0, 0])
+            members = grid.setdefault((col, row), [])
+            root = i
+            if members:
+                root = parent[i] = find(members[0])
             
-            for j, other_drawing in enumerate(drawings):
-                if j in used:
+            for dx, dy in offsets:
+                neighbours = grid.get((col + dx, row + dy))
+                if not neighbours:
                     continue
-                    
-                bbox2 = other_drawing.get('rect', [0, 0, 0, 0])
-                
-                # Check if drawings are close
-                if self._are_bboxes_close(bbox1, bbox2, proximity_threshold):
-                    group.append(other_drawing)
-                    used.add(j)
-            
-            groups.append(group)
-        
-        return groups
-    
-    def _are_bboxes_close(self, bbox1, bbox2, threshold):
-        """Check if two bounding boxes are close to each other"""
-        if not bbox1 or not bbox2:
-            return False
-        
-        # Calculate center points
-        center1 = ((bbox1[0] + bbox1[2]) / 2, (bbox1[1] + bbox1[3]) / 2)
-        center2 = ((bbox2[0] + bbox2[2]) / 2, (bbox2[1] + bbox2[3]) / 2)
-        
-        # Calculate distance
-        distance = ((center1[0] - center2[0]) ** 2 + (center1[1] - center2[1]) ** 2) ** 0.5
+                other_root = find(neighbours[0])
+                if other_root == root:
+                    continue
+                for j in neighbours:
+                    ox, oy = centers[j]
+                    if (cx - ox) * (cx - ox) + (cy - oy) * (cy - oy) < limit:
+                        # One link joins the whole cell
+                        parent[other_root] = root
+                        break
+            members.append(i)
         
-        return distance < threshold
+        groups = {}
+        for i, drawing in enumerate(drawings):
+            groups.setdefault(find(i), []).append(drawing)
+        return list(groups.values())
     
     def _get_drawings_bbox(self, drawings):
         """Get bounding box that encompasses all drawings in a group"""
@@ -345,4 +460,26 @@ class PDFExtractor:
         
         self.temp_files.clear()
         logger.info(f"PDF extractor cleanup: {cleaned_count} files cleaned, {failed_count} failed")
-        return cleaned_count, failed_count 
\ No newline at end of file
+        return cleaned_count, failed_count
+
+def extract_pages_in_worker(file_path: str, start: int, stop: int, temp_dir: str,
+                            filename: str) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+    """
+    Extract a page range in a worker process (entry point for sharded extraction)
+    
+    Args:
+        file_path: Path to PDF file
+        start: First page (0-based)
+        stop: Page after the last one
+        temp_dir: Directory for temporary image files
+        filename: Document name used in visual element ids
+        
+    Returns:
+        (page texts, visual elements, temporary files created)
+    """
+    extractor = PDFExtractor(temp_dir, shard_processes=1)
+    pages = range(start, stop)
+    with fitz.open(file_path) as pdf_document:
+        page_texts = extractor._extract_page_texts(pdf_document, pages)
+        visual_elements = extractor._extract_visual_elements(pdf_document, filename, pages)
+    return page_texts, visual_elements, sorted(extractor.temp_files)
@@ -5,19 +5,28 @@ End-to-end pipeline for processing documents with text and visual content
 """
 
 import logging
+import os
+import threading
 import time
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Callable, Iterator, List, Optional
 from datetime import datetime
 
 from .dispatcher import ContentDispatcher
 from .agents.image_captioning_agent import ImageCaptioningAgent
+from .agents.captioning_engine import ConcurrentCaptioningEngine
 from .utils.chunker import ContentChunker
+from .utils.image_preparer import ImagePreparer
 from .services.embedding_service import EmbeddingService
 from .utils.config import Config
+from hyperparameters import IngestionHyperparameters
+from .utils.stage_timer import StageTimer
 
 logger = logging.getLogger(__name__)
 
+class ProcessingCancelled(Exception):
+    """Raised between pipeline stages when a job has been cancelled"""
+
 class MultimodalPipeline:
     """End-to-end multimodal ingestion pipeline"""
     
@@ -33,6 +42,11 @@ class MultimodalPipeline:
         # Initialize components
         self.dispatcher = ContentDispatcher()
         self.image_agent = ImageCaptioningAgent()
+        self.captioning_engine = ConcurrentCaptioningEngine(
+            self.image_agent,
+            max_concurrency=self.config.get('vision_max_concurrency')
+        )
+        self.image_preparer = ImagePreparer() if IngestionHyperparameters.IMAGE_PREPARATION_ENABLED else None
         self.chunker = ContentChunker(
             chunk_size=self.config.get('chunk_size', 1000),
             chunk_overlap=self.config.get('chunk_overlap', 200)
@@ -51,7 +65,10 @@ class MultimodalPipeline:
         logger.info("Multimodal pipeline initialized")
     
     def process_document(self, file_path: str, save_outputs: bool = False, 
-                        auto_cleanup: bool = True) -> Dict[str, Any]:
+                        auto_cleanup: bool = True,
+                        extract: Optional[Callable[[Path], Dict[str, Any]]] = None,
+                        cancel_event: Optional[threading.Event] = None,
+                        progress: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
         """
         Process a single document through the complete pipeline
         
@@ -59,55 +76,81 @@ class MultimodalPipeline:
             file_path: Path to the document file
             save_outputs: Whether to save intermediate outputs
             auto_cleanup: Whether to automatically cleanup temporary files
+            extract: Runs content extraction elsewhere (e.g. in a worker process); defaults to the dispatcher
+            cancel_event: Checked between stages; once set, processing stops with a cancelled result
+            progress: Called with (stage, message) as each stage starts
             
         Returns:
             Complete processing results
         """
         start_time = time.time()
         file_path = Path(file_path)
+        timer = StageTimer()
+        extraction_result = None
         
         try:
             logger.info(f"Starting pipeline processing for: {file_path}")
             
             # Step 1: Content Extraction
             logger.info("Step 1: Extracting content from document")
-            extraction_result = self.dispatcher.extract_content(file_path)
+            self._report_progress(progress, 'extraction', "Extracting content...")
+            with timer.stage('extraction'):
+                extraction_result = extract(file_path) if extract else self.dispatcher.extract_content(file_path)
             
             if not extraction_result.get('success'):
                 raise Exception(f"Content extraction failed: {extraction_result.get('error')}")
+            self._check_cancelled(cancel_event)
             
             # Step 2: Image Analysis
             logger.info("Step 2: Analyzing visual elements")
-            image_analyses = self._analyze_visual_elements(
-                extraction_result.get('visual_elements', []),
-                extraction_result.get('text_content', '')
-            )
+            self._report_progress(progress, 'image_analysis',
+                                  f"Analyzing {len(extraction_result.get('visual_elements', []))} images...")
+            preparation = ImagePreparer.new_report()
+            captioning = ConcurrentCaptioningEngine.new_stats()
+            with timer.stage('image_analysis'):
+                image_analyses = self._analyze_visual_elements(
+                    extraction_result.get('visual_elements', []),
+                    extraction_result.get('text_content', ''),
+                    preparation=preparation,
+                    captioning=captioning
+                )
+            self._check_cancelled(cancel_event)
             
             # Step 3: Content Chunking
             logger.info("Step 3: Chunking content with image context")
-            chunks = self.chunker.chunk_with_image_context(
-                extraction_result.get('text_content', ''),
-                image_analyses,
-                extraction_result.get('metadata', {})
-            )
+            self._report_progress(progress, 'chunking', "Chunking content...")
+            with timer.stage('chunking'):
+                chunks = self.chunker.chunk_with_image_context(
+                    extraction_result.get('text_content', ''),
+                    image_analyses,
+                    extraction_result.get('metadata', {})
+                )
             
             # Step 4: Generate Embeddings
             logger.info("Step 4: Generating embeddings")
-            chunks_with_embeddings = self.embedding_service.generate_embeddings(chunks)
+            self._report_progress(progress, 'embedding', f"Embedding {len(chunks)} chunks...")
+            with timer.stage('embedding'):
+                chunks_with_embeddings = self.embedding_service.generate_embeddings(chunks)
+            self._check_cancelled(cancel_event)
             
             # Step 5: Prepare Final Output
             logger.info("Step 5: Preparing final output")
             final_result = self._prepare_final_output(
-                file_path, extraction_result, image_analyses, chunks_with_embeddings
+                file_path, extraction_result, image_analyses, chunks_with_embeddings, preparation, captioning
             )
+            final_result['stage_timings'] = timer.report()
             
             # Step 6: Save outputs if requested
             if save_outputs:
                 self._save_processing_outputs(file_path, final_result)
             
-            # Step 7: Cleanup temporary files
+            # Step 7: Cleanup temporary files (only this document's when extraction ran elsewhere,
+            # since other documents may be in flight)
             if auto_cleanup:
-                self._cleanup_temp_files(extraction_result)
+                if extract:
+                    self._cleanup_extracted_files(extraction_result)
+                else:
+                    self._cleanup_temp_files(extraction_result)
             
             # Update statistics
             processing_time = time.time() - start_time
@@ -116,6 +159,18 @@ class MultimodalPipeline:
             logger.info(f"Pipeline processing completed in {processing_time:.2f} seconds")
             return final_result
             
+        except ProcessingCancelled:
+            logger.info(f"Pipeline processing cancelled for: {file_path}")
+            if extraction_result and auto_cleanup:
+                self._cleanup_extracted_files(extraction_result)
+            return {
+                'success': False,
+                'cancelled': True,
+                'error': 'Processing cancelled',
+                'filename': file_path.name,
+                'processing_time': time.time() - start_time
+            }
+            
         except Exception as e:
             logger.error(f"Pipeline processing failed: {e}")
             return {
@@ -125,48 +180,160 @@ class MultimodalPipeline:
                 'processing_time': time.time() - start_time
             }
     
+    def can_stream(self, file_path: Path) -> bool:
+        """Whether a document can be processed page by page (its extractor yields pages)"""
+        try:
+            return hasattr(self.dispatcher.dispatch_extractor(file_path), 'iter_pages')
+        except ValueError:
+            return False
+    
+    def stream_document(self, file_path: str, timer: StageTimer, stats: Dict[str, Any],
+                        auto_cleanup: bool = True,
+                        cancel_event: Optional[threading.Event] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Process a document page by page, yielding windows of embedded chunks as they are ready
+        
+        Pages are extracted and captioned STREAMING_PAGE_WINDOW at a time, chunked with a sliding
+        window, and embedded STREAMING_CHUNK_WINDOW chunks at a time, so memory holds a few pages
+        and one window of chunks instead of the whole document.
+        
+        Args:
+            file_path: Path to the document file (its extractor must support iter_pages)
+            timer: Receives the time spent in each stage
+            stats: Filled with document statistics (pages, images, chunks, image preparation) as processing goes
+            auto_cleanup: Whether to delete each page window's temporary image files once captioned
+            cancel_event: Checked between windows; once set, ProcessingCancelled is raised
+            
+        Yields:
+            Lists of chunks in storage format (see _to_storage_chunk), in document order
+        """
+        file_path = Path(file_path)
+        extractor = self.dispatcher.dispatch_extractor(file_path)
+        stats.update({'total_pages': 0, 'total_images': 0, 'successful_image_analyses': 0,
+                      'total_chunks': 0, 'chunks_with_images': 0,
+                      'image_preparation': ImagePreparer.new_report(),
+                      'captioning': ConcurrentCaptioningEngine.new_stats()})
+        metadata = extractor.get_metadata(file_path)
+        stats['metadata'] = metadata
+        logger.info(f"Streaming pipeline processing for: {file_path}")
+        
+        def captioned_pages():
+            pages = extractor.iter_pages(file_path)
+            try:
+                while True:
+                    with timer.stage('extraction'):
+                        window = [page for _, page in zip(range(IngestionHyperparameters.STREAMING_PAGE_WINDOW), pages)]
+                    if not window:
+                        return
+                    self._check_cancelled(cancel_event)
+                    elements = [element for page in window for element in page['visual_elements']]
+                    with timer.stage('image_analysis'):
+                        # The page's own text is the whole context get_image_context looks at
+                        contexts = [self.image_agent.get_image_context(page['text'], 1)
+                                    for page in window for _ in page['visual_elements']]
+                        analyses = self._analyze_visual_elements(elements, contexts=contexts,
+                                                                 preparation=stats['image_preparation'],
+                                                                 captioning=stats['captioning'])
+                    if auto_cleanup:
+                        self._cleanup_extracted_files({'visual_elements': elements})
+                    stats['total_pages'] += len(window)
+                    stats['total_images'] += len(analyses)
+                    stats['successful_image_analyses'] += sum(1 for a in analyses if a.get('success'))
+                    for page in window:
+                        page['image_analyses'] = [a for a in analyses if a['page_number'] == page['page_number']]
+                        yield page
+            finally:
+                pages.close()
+        
+        chunks = self.chunker.iter_chunks(captioned_pages(), metadata)
+        while True:
+            # Pulling chunks drives extraction and captioning, which time themselves
+            nested_before = timer.seconds('extraction', 'image_analysis')
+            start = time.perf_counter()
+            window = [chunk for _, chunk in zip(range(IngestionHyperparameters.STREAMING_CHUNK_WINDOW), chunks)]
+            timer.record('chunking', time.perf_counter() - start
+                         - (timer.seconds('extraction', 'image_analysis') - nested_before))
+            if not window:
+                break
+            with timer.stage('embedding'):
+                window = self.embedding_service.generate_embeddings(window)
+            self._check_cancelled(cancel_event)
+            stats['total_chunks'] += len(window)
+            stats['chunks_with_images'] += sum(1 for chunk in window if chunk.get('has_images'))
+            yield [self._to_storage_chunk(file_path, chunk) for chunk in window]
+    
+    @staticmethod
+    def _report_progress(progress: Optional[Callable[[str, str], None]], stage: str, message: str):
+        """Tell the caller which stage is starting"""
+        if progress is not None:
+            progress(stage, message)
+    
+    @staticmethod
+    def _check_cancelled(cancel_event: Optional[threading.Event]):
+        """Stop between stages once the job has been cancelled"""
+        if cancel_event is not None and cancel_event.is_set():
+            raise ProcessingCancelled()
+    
     def _analyze_visual_elements(self, visual_elements: List[Dict[str, Any]], 
-                                text_content: str) -> List[Dict[str, Any]]:
-        """Analyze visual elements using GPT-4.1 Vision"""
+                                text_content: str = '',
+                                contexts: Optional[List[str]] = None,
+                                preparation: Optional[Dict[str, Any]] = None,
+                                captioning: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Analyze visual elements using GPT-4.1 Vision (contexts, if given, replace lookups in text_content)
+        
+        Images are filtered and downscaled first (see ImagePreparer); skipped elements get a
+        'vision_skipped' reason and no analysis, and the counts are added to preparation.
+        Captioning counts and times are added to captioning (see ConcurrentCaptioningEngine.new_stats).
+        """
         if not visual_elements:
             logger.info("No visual elements found for analysis")
             return []
         
-        logger.info(f"Analyzing {len(visual_elements)} visual elements")
+        prepared = None
+        if self.image_preparer:
+            prepared = self.image_preparer.prepare_all(visual_elements, preparation)
         
-        # Prepare image data for analysis
-        images_for_analysis = []
-        for element in visual_elements:
-            images_for_analysis.append({
-                'path': element.get('path'),
-                'id': element.get('id'),
-                'page_number': element.get('page_number', 1)
+        # Build one vision request per element kept, with its page context
+        requests, analyzed = [], []
+        for i, element in enumerate(visual_elements):
+            image = prepared[i] if prepared else {'data': element.get('data')}
+            if 'skip' in image:
+                element['vision_skipped'] = image['skip']
+                continue
+            context = contexts[i] if contexts is not None else self.image_agent.get_image_context(
+                text_content, 
+                element.get('page_number', 1)
+            )
+            requests.append({
+                'image_path': element.get('path'),
+                'image_data': image['data'],
+                'image_mime': image.get('mime', 'image/png'),
+                'context_text': context,
+                'image_id': element.get('id'),
+                'analysis_type': 'document',
+                'image_hash': element.get('hash')
             })
+            analyzed.append(element)
+        
+        logger.info(f"Analyzing {len(requests)} of {len(visual_elements)} visual elements")
+        
+        # Analyze images concurrently; results come back in input order
+        analyses = self.captioning_engine.caption_all(requests, captioning)
+        
+        # Image bytes are only needed for the vision call; results keep the metadata
+        for element in visual_elements:
+            element.pop('data', None)
         
-        # Analyze images with context
         image_analyses = []
-        for image_info in images_for_analysis:
-            # Get context for this image
-            context = self.image_agent.get_image_context(
-                text_content, 
-                image_info.get('page_number', 1)
-            )
-            
-            # Analyze the image
-            analysis = self.image_agent.analyze_image(
-                image_path=image_info['path'],
-                context_text=context,
-                image_id=image_info['id'],
-                analysis_type='document'
-            )
-            
+        for element, analysis in zip(analyzed, analyses):
             # Add metadata from original element
             analysis.update({
-                'page_number': image_info.get('page_number', 1),
-                'type': next((e.get('type') for e in visual_elements if e.get('id') == image_info['id']), 'unknown'),
-                'size': next((e.get('size') for e in visual_elements if e.get('id') == image_info['id']), 0),
-                'width': next((e.get('width') for e in visual_elements if e.get('id') == image_info['id']), 0),
-                'height': next((e.get('height') for e in visual_elements if e.get('id') == image_info['id']), 0)
+                'page_number': element.get('page_number', 1),
+                'type': element.get('type', 'unknown'),
+                'size': element.get('size', 0),
+                'width': element.get('width', 0),
+                'height': element.get('height', 0)
             })
             
             image_analyses.append(analysis)
@@ -175,7 +342,9 @@ class MultimodalPipeline:
     
     def _prepare_final_output(self, file_path: Path, extraction_result: Dict[str, Any],
                              image_analyses: List[Dict[str, Any]], 
-                             chunks_with_embeddings: List[Dict[str, Any]]) -> Dict[str, Any]:
+                             chunks_with_embeddings: List[Dict[str, Any]],
+                             preparation: Optional[Dict[str, Any]] = None,
+                             captioning: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Prepare the final output structure"""
         
         # Generate summaries
@@ -184,23 +353,7 @@ class MultimodalPipeline:
         image_summary = self.image_agent.get_analysis_summary(image_analyses)
         
         # Prepare chunks for storage
-        storage_chunks = []
-        for chunk in chunks_with_embeddings:
-            storage_chunk = {
-                'id': f"{file_path.stem}_{chunk['id']}",
-                'content': chunk['content'],
-                'embedding': chunk.get('embedding', []),
-                'metadata': {
-                    'filename': file_path.name,
-                    'chunk_index': chunk.get('chunk_index', 0),
-                    'chunk_size': chunk.get('chunk_size', 0),
-                    'has_images': chunk.get('has_images', False),
-                    'image_context': chunk.get('image_context', []),
-                    'embedding_model': chunk.get('embedding_model', ''),
-                    'embedding_timestamp': chunk.get('embedding_timestamp', 0)
-                }
-            }
-            storage_chunks.append(storage_chunk)
+        storage_chunks = [self._to_storage_chunk(file_path, chunk) for chunk in chunks_with_embeddings]
         
         return {
             'success': True,
@@ -222,7 +375,9 @@ class MultimodalPipeline:
             'summaries': {
                 'chunking': chunking_summary,
                 'embedding': embedding_summary,
-                'image_analysis': image_summary
+                'image_analysis': image_summary,
+                'captioning': captioning,
+                'image_preparation': preparation
             },
             
             # Statistics
@@ -230,11 +385,33 @@ class MultimodalPipeline:
                 'total_chunks': len(storage_chunks),
                 'total_images': len(image_analyses),
                 'successful_image_analyses': len([a for a in image_analyses if a.get('success')]),
+                'images_skipped': (preparation or {}).get('images_skipped', 0),
+                'image_bytes_saved': (preparation or {}).get('bytes_saved', 0),
                 'chunks_with_images': sum(1 for c in storage_chunks if c['metadata']['has_images']),
                 'embedding_success_rate': embedding_summary.get('embedding_success_rate', 0)
             }
         }
     
+    @staticmethod
+    def _to_storage_chunk(file_path: Path, chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert an embedded chunk to the format stored and uploaded by ingestion"""
+        return {
+            'id': f"{file_path.stem}_{chunk['id']}",
+            'content': chunk['content'],
+            'embedding': chunk.get('embedding', []),
+            'metadata': {
+                'filename': file_path.name,
+                'chunk_index': chunk.get('chunk_index', 0),
+                'page_number': chunk.get('page_number', 0),
+                'chunk_type': chunk.get('chunk_type', 'text'),
+                'chunk_size': chunk.get('chunk_size', 0),
+                'has_images': chunk.get('has_images', False),
+                'image_context': chunk.get('image_context', []),
+                'embedding_model': chunk.get('embedding_model', ''),
+                'embedding_timestamp': chunk.get('embedding_timestamp', 0)
+            }
+        }
+    
     def _save_processing_outputs(self, file_path: Path, result: Dict[str, Any]):
         """Save processing outputs for debugging/analysis"""
         try:
@@ -318,6 +495,19 @@ class MultimodalPipeline:
             except Exception as fallback_e:
                 logger.error(f"Fallback cleanup completely failed: {fallback_e}")
     
+    def _cleanup_extracted_files(self, extraction_result: Dict[str, Any]):
+        """Delete the temporary image files of one extraction result"""
+        cleaned_count = 0
+        for element in extraction_result.get('visual_elements', []):
+            path = element.get('path')
+            if path and os.path.exists(path):
+                try:
+                    os.unlink(path)
+                    cleaned_count += 1
+                except OSError as e:
+                    logger.warning(f"Failed to delete {path}: {e}")
+        logger.info(f"Cleaned up {cleaned_count} extracted files")
+    
     def _update_statistics(self, result: Dict[str, Any], processing_time: float):
         """Update pipeline statistics"""
         self.stats['files_processed'] += 1
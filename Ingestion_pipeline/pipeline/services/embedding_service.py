@@ -5,30 +5,140 @@ Generates vector embeddings using Azure OpenAI
 """
 
 import logging
+import math
+import threading
 import time
-from typing import List, Dict, Any, Optional
-from openai import AzureOpenAI
+from typing import List, Dict, Any, Callable, Optional, Tuple
+from openai import AzureOpenAI, BadRequestError
 from ..utils.config import Config
+from ..utils.embedding_cache import EmbeddingCache
+from ..utils.micro_batcher import MicroBatcher
+from ..utils.openai_gateway import get_gateway
+from ..utils.token_counter import TokenCounter
+from hyperparameters import IngestionHyperparameters
 
 logger = logging.getLogger(__name__)
 
+class AdaptiveBatchSize:
+    """Shrinks embedding batches on throttling or slow responses and grows them back while requests are fast"""
+    
+    def __init__(self, max_items: int, max_tokens: int, min_items: int, target_latency: float,
+                 on_change: Optional[Callable[[int, int], None]] = None):
+        """
+        Initialize the limits at their maximum
+        
+        Args:
+            max_items: Largest number of texts per request
+            max_tokens: Largest number of tokens per request
+            min_items: Smallest number of texts per request
+            target_latency: Responses slower than this (seconds) shrink the batches
+            on_change: Called with the new (texts, tokens) limits after each adjustment
+        """
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self.target_latency = target_latency
+        self.on_change = on_change
+        self.min_scale = min(1.0, min_items / max_items)
+        self.scale = 1.0
+        self._lock = threading.Lock()
+        
+        # Metrics
+        self.throttled = 0
+        self.slow = 0
+    
+    def limits(self) -> Tuple[int, int]:
+        """Current (texts, tokens) per request"""
+        scale = self.scale
+        return max(1, round(self.max_items * scale)), max(1, round(self.max_tokens * scale))
+    
+    def record_wait(self, seconds: float):
+        """Waiting for the rate limiter is budget, not latency, so it does not change the batches"""
+    
+    def record_throttle(self):
+        """Halve the batches after a 429"""
+        with self._lock:
+            self.throttled += 1
+            self.scale = max(self.min_scale, self.scale * 0.5)
+        self._changed()
+    
+    def record_success(self, latency: float):
+        """Shrink the batches a little after a slow response, otherwise grow them back step by step"""
+        with self._lock:
+            if latency > self.target_latency:
+                self.slow += 1
+                self.scale = max(self.min_scale, self.scale * 0.8)
+            else:
+                self.scale = min(1.0, self.scale + 0.1)
+        self._changed()
+    
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change(*self.limits())
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get the current limits and adjustment counts"""
+        items, tokens = self.limits()
+        return {
+            'scale': round(self.scale, 3),
+            'batch_size': items,
+            'batch_tokens': tokens,
+            'throttled': self.throttled,
+            'slow_responses': self.slow
+        }
+
 class EmbeddingService:
     """Azure OpenAI embedding service for text chunks"""
     
     def __init__(self):
         """Initialize the embedding service"""
+        # Retries are left to the shared gateway, which honors Retry-After for every caller of the deployment
         self.client = AzureOpenAI(
             api_key=Config.AZURE_OPENAI_API_KEY,
             api_version=Config.AZURE_OPENAI_API_VERSION,
-            azure_endpoint=Config.AZURE_OPENAI_ENDPOINT
+            azure_endpoint=Config.AZURE_OPENAI_ENDPOINT,
+            max_retries=0
         )
         self.model = Config.EMBEDDING_MODEL
         self.deployment = Config.EMBEDDING_DEPLOYMENT_NAME
+        self.dimension = IngestionHyperparameters.get_embedding_dimension(self.model)
+        self.token_counter = TokenCounter(self.model)
+        self.gateway = get_gateway(
+            self.deployment,
+            IngestionHyperparameters.EMBEDDING_REQUESTS_PER_MINUTE,
+            IngestionHyperparameters.EMBEDDING_TOKENS_PER_MINUTE
+        )
+        
+        # Batch limits
+        self.batch_size = IngestionHyperparameters.EMBEDDING_BATCH_SIZE  # Texts per request
+        self.max_batch_tokens = IngestionHyperparameters.EMBEDDING_BATCH_MAX_TOKENS  # Tokens per request
+        self.max_input_tokens = IngestionHyperparameters.EMBEDDING_MAX_INPUT_TOKENS  # Tokens per text
+        self.adaptive = AdaptiveBatchSize(
+            self.batch_size,
+            self.max_batch_tokens,
+            min_items=IngestionHyperparameters.EMBEDDING_MIN_BATCH_SIZE,
+            target_latency=IngestionHyperparameters.EMBEDDING_TARGET_LATENCY,
+            on_change=self._apply_batch_limits
+        ) if IngestionHyperparameters.EMBEDDING_ADAPTIVE_BATCHING else None
         
-        # Rate limiting and retry settings
-        self.max_retries = 3
-        self.retry_delay = 1.0
-        self.batch_size = 16  # Azure OpenAI batch size limit
+        # Content-addressed embedding cache shared across documents and re-ingests
+        self.cache = None
+        if IngestionHyperparameters.EMBEDDING_CACHE_ENABLED:
+            self.cache = EmbeddingCache(
+                IngestionHyperparameters.EMBEDDING_CACHE_PATH,
+                IngestionHyperparameters.EMBEDDING_CACHE_MAX_BYTES
+            )
+        
+        # Shared batcher packing texts from concurrent documents into one request (see start_batching)
+        self.batcher = None
+        
+        # Usage
+        self.requests = 0
+        self.tokens = 0
+        self.split_texts = 0
+        self._usage_lock = threading.Lock()
+        
+        if IngestionHyperparameters.EMBEDDING_MICRO_BATCHING:
+            self.start_batching()
         
         logger.info(f"Embedding service initialized with model: {self.model}")
     
@@ -38,9 +148,12 @@ class EmbeddingService:
         
         Args:
             chunks: List of chunk dictionaries with 'content' key
-            
+        
         Returns:
             List of chunks with embeddings added
+            
+        Raises:
+            Exception: The embedding requests failed (no chunk is left with a placeholder vector)
         """
         try:
             logger.info(f"Generating embeddings for {len(chunks)} chunks")
@@ -48,8 +161,14 @@ class EmbeddingService:
             # Prepare text inputs
             texts = [chunk.get('content', '') for chunk in chunks]
             
-            # Generate embeddings in batches
-            embeddings = self._generate_embeddings_batch(texts)
+            # Generate embeddings in batches, only for text that is not cached
+            embeddings = self._cached_embeddings(texts)
+            missing = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+            if missing:
+                generated = dict(zip(missing, self._generate_embeddings_batch(missing)))
+                self._cache_embeddings(missing, [generated[text] for text in missing])
+                embeddings = [embedding if embedding is not None else generated[text]
+                              for text, embedding in zip(texts, embeddings)]
             
             # Add embeddings to chunks
             for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
@@ -57,57 +176,190 @@ class EmbeddingService:
                 chunk['embedding_model'] = self.model
                 chunk['embedding_timestamp'] = time.time()
             
-            logger.info(f"Successfully generated embeddings for {len(chunks)} chunks")
+            logger.info(f"Successfully generated embeddings for {len(chunks)} chunks "
+                        f"({len(chunks) - len(missing)} from cache)")
             return chunks
-            
+        
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
-            return chunks
+            raise
+    
+    def _cached_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Cached embedding per text, None where it must be generated"""
+        if self.cache is None or not texts:
+            return [None] * len(texts)
+        try:
+            return self.cache.get_embeddings(texts, self.deployment, self.dimension)
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed, embedding all {len(texts)} texts: {e}")
+            return [None] * len(texts)
+    
+    def _cache_embeddings(self, texts: List[str], embeddings: List[List[float]]):
+        """Store generated embeddings; a cache failure only costs a future re-embed"""
+        if self.cache is None:
+            return
+        try:
+            self.cache.put_embeddings(texts, embeddings, self.deployment, self.dimension)
+        except Exception as e:
+            logger.warning(f"Could not cache {len(texts)} embeddings: {e}")
+    
+    def start_batching(self, max_wait: float = None):
+        """
+        Share embedding requests between documents processed concurrently
+        
+        Texts from all callers are packed into requests of up to batch_size texts and
+        max_batch_tokens tokens, so many small documents no longer each send their own short
+        request. A request is sent once it is full or its oldest text has waited max_wait.
+        
+        Args:
+            max_wait: Seconds a text may wait for a request to fill (defaults to EMBEDDING_BATCH_MAX_WAIT)
+        """
+        if self.batcher is None:
+            max_items, max_tokens = self._batch_limits()
+            self.batcher = MicroBatcher(
+                self._embed_batch,
+                max_items=max_items,
+                max_wait=max_wait if max_wait is not None else IngestionHyperparameters.EMBEDDING_BATCH_MAX_WAIT,
+                max_in_flight=IngestionHyperparameters.EMBEDDING_MAX_IN_FLIGHT,
+                name="embedding-batcher",
+                max_cost=max_tokens,
+                cost=self.token_counter.count
+            )
+    
+    def stop_batching(self):
+        """Flush the shared batcher and go back to per-document requests"""
+        if self.batcher is not None:
+            batcher, self.batcher = self.batcher, None
+            batcher.close()
+    
+    def _batch_limits(self) -> Tuple[int, int]:
+        """Current (texts, tokens) per request"""
+        if self.adaptive is not None:
+            return self.adaptive.limits()
+        return self.batch_size, self.max_batch_tokens
+    
+    def _apply_batch_limits(self, max_items: int, max_tokens: int):
+        """Pass adapted limits on to the shared batcher"""
+        batcher = self.batcher
+        if batcher is not None:
+            batcher.max_items, batcher.max_cost = max_items, max_tokens
     
     def _generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings in batches to handle rate limits
         
+        Texts longer than the model's input limit are split, embedded piece by piece and
+        combined into one token-weighted, normalized vector.
+        
         Args:
             texts: List of text strings to embed
-            
+        
         Returns:
             List of embedding vectors
         """
-        all_embeddings = []
+        pieces = []
+        spans = []  # (first piece, piece count) per text
+        for text in texts:
+            # The API rejects empty input
+            parts = self.token_counter.split(text, self.max_input_tokens) if text.strip() else [" "]
+            if len(parts) > 1:
+                with self._usage_lock:
+                    self.split_texts += 1
+            spans.append((len(pieces), len(parts)))
+            pieces.extend(parts)
         
-        # Process in batches
-        for i in range(0, len(texts), self.batch_size):
-            batch_texts = texts[i:i + self.batch_size]
-            
-            for attempt in range(self.max_retries):
-                try:
-                    logger.debug(f"Generating embeddings for batch {i//self.batch_size + 1}")
-                    
-                    response = self.client.embeddings.create(
-                        model=self.deployment,
-                        input=batch_texts
-                    )
-                    
-                    # Extract embeddings
-                    batch_embeddings = [data.embedding for data in response.data]
-                    all_embeddings.extend(batch_embeddings)
-                    
-                    logger.debug(f"Successfully generated {len(batch_embeddings)} embeddings")
-                    break
-                    
-                except Exception as e:
-                    logger.warning(f"Attempt {attempt + 1} failed for batch {i//self.batch_size + 1}: {e}")
-                    
-                    if attempt < self.max_retries - 1:
-                        time.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
-                    else:
-                        logger.error(f"Failed to generate embeddings for batch after {self.max_retries} attempts")
-                        # Return zero vectors for failed batch
-                        all_embeddings.extend([[0.0] * 1536] * len(batch_texts))  # Default embedding dimension
+        batcher = self.batcher
+        if batcher is not None:
+            vectors = batcher.submit(pieces)
+        else:
+            vectors = self._embed_unbatched(pieces)
         
+        return [
+            vectors[start] if count == 1 else self._combine(pieces[start:start + count], vectors[start:start + count])
+            for start, count in spans
+        ]
+    
+    def _embed_unbatched(self, texts: List[str]) -> List[List[float]]:
+        """Embed one caller's texts in batches bounded by text count and tokens"""
+        all_embeddings = []
+        batch_texts = []
+        batch_tokens = 0
+        for text in texts:
+            tokens = self.token_counter.count(text)
+            max_items, max_tokens = self._batch_limits()
+            if batch_texts and (len(batch_texts) >= max_items or batch_tokens + tokens > max_tokens):
+                all_embeddings.extend(self._embed_batch(batch_texts))
+                batch_texts, batch_tokens = [], 0
+            batch_texts.append(text)
+            batch_tokens += tokens
+        if batch_texts:
+            all_embeddings.extend(self._embed_batch(batch_texts))
         return all_embeddings
     
+    def _combine(self, pieces: List[str], vectors: List[List[float]]) -> List[float]:
+        """Combine the embeddings of a split text, weighting each piece by its token count"""
+        weights = [self.token_counter.count(piece) for piece in pieces]
+        combined = [sum(w * v[i] for w, v in zip(weights, vectors)) for i in range(len(vectors[0]))]
+        norm = math.sqrt(sum(x * x for x in combined)) or 1.0
+        return [x / norm for x in combined]
+    
+    def _embed_batch(self, batch_texts: List[str]) -> List[List[float]]:
+        """
+        Embed one request's worth of texts through the deployment's gateway
+        
+        Args:
+            batch_texts: Texts within the current batch limits
+            
+        Returns:
+            One embedding vector per text
+            
+        Raises:
+            Exception: The request failed after the gateway's retries, or a single text was rejected
+        """
+        logger.debug(f"Generating embeddings for batch of {len(batch_texts)} texts")
+        try:
+            response = self.gateway.call(
+                lambda: self.client.embeddings.create(model=self.deployment, input=batch_texts),
+                tokens=sum(self.token_counter.count(text) for text in batch_texts),
+                observer=self.adaptive
+            )
+        except BadRequestError as e:
+            # Retrying an invalid request cannot help; its halves may still succeed (e.g. one bad input)
+            if len(batch_texts) == 1:
+                raise
+            logger.warning(f"Batch of {len(batch_texts)} texts rejected, splitting it: {e}")
+            middle = len(batch_texts) // 2
+            return self._embed_batch(batch_texts[:middle]) + self._embed_batch(batch_texts[middle:])
+        
+        # Extract embeddings
+        batch_embeddings = [data.embedding for data in response.data]
+        
+        usage = getattr(response, 'usage', None)
+        with self._usage_lock:
+            self.requests += 1
+            self.tokens += getattr(usage, 'total_tokens', 0) or 0
+        
+        logger.debug(f"Successfully generated {len(batch_embeddings)} embeddings")
+        return batch_embeddings
+    
+    def get_usage(self) -> Dict[str, Any]:
+        """Get embedding request and token counts, plus packing statistics when batching is on"""
+        usage = {
+            'requests': self.requests,
+            'tokens': self.tokens,
+            'split_texts': self.split_texts,
+            'tokenizer': 'tiktoken' if self.token_counter.exact else 'estimate'
+        }
+        if self.adaptive is not None:
+            usage['adaptive'] = self.adaptive.get_statistics()
+        usage['gateway'] = self.gateway.get_statistics()
+        if self.cache is not None:
+            usage['cache'] = self.cache.get_statistics()
+        batcher = self.batcher
+        if batcher is not None:
+            usage['batching'] = batcher.get_statistics()
+        return usage
+    
     def generate_single_embedding(self, text: str) -> Optional[List[float]]:
         """
         Generate embedding for a single text
@@ -119,12 +371,7 @@ class EmbeddingService:
             Embedding vector or None if failed
         """
         try:
-            response = self.client.embeddings.create(
-                model=self.deployment,
-                input=text
-            )
-            
-            return response.data[0].embedding
+            return self._embed_batch([text])[0]
             
         except Exception as e:
             logger.error(f"Error generating single embedding: {e}")
@@ -191,7 +438,7 @@ class EmbeddingService:
             'invalid_embeddings': 0,
             'zero_embeddings': 0,
             'dimension_mismatches': 0,
-            'expected_dimension': 1536  # Default for text-embedding-ada-002
+            'expected_dimension': self.dimension
         }
         
         for chunk in chunks:
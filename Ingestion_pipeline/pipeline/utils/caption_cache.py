@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Caption Cache
+Content-addressed store of image captions keyed by image hash, prompt type and deployment
+"""
+
+import json
+import logging
+from typing import Dict, Any, Optional
+
+from .kv_cache import PersistentLRUCache
+
+logger = logging.getLogger(__name__)
+
+class CaptionCache(PersistentLRUCache):
+    """Persistent cache of GPT-4.1 Vision captions"""
+
+    def __init__(self, db_path: str, max_bytes: int):
+        """
+        Initialize the caption cache
+
+        Args:
+            db_path: Path to the SQLite database file
+            max_bytes: Maximum total size of cached captions
+        """
+        super().__init__(db_path, max_bytes, table="captions")
+
+    @staticmethod
+    def make_key(image_hash: str, analysis_type: str, deployment: str) -> str:
+        """Build the cache key for an image"""
+        return f"{image_hash}:{analysis_type}:{deployment}"
+
+    def get_caption(self, image_hash: str, analysis_type: str, deployment: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached caption
+
+        Args:
+            image_hash: Hash of the image bytes
+            analysis_type: Prompt type used for the caption
+            deployment: Vision model deployment name
+
+        Returns:
+            Cached caption record, or None on a miss
+        """
+        value = self.get(self.make_key(image_hash, analysis_type, deployment))
+        if value is None:
+            return None
+
+        try:
+            return json.loads(value.decode('utf-8'))
+        except ValueError as e:
+            logger.warning(f"Discarding unreadable cached caption for {image_hash}: {e}")
+            return None
+
+    def put_caption(self, image_hash: str, analysis_type: str, deployment: str, record: Dict[str, Any]):
+        """
+        Store a caption
+
+        Args:
+            image_hash: Hash of the image bytes
+            analysis_type: Prompt type used for the caption
+            deployment: Vision model deployment name
+            record: Caption fields to cache (analysis text, model, token usage)
+        """
+        self.put(self.make_key(image_hash, analysis_type, deployment), json.dumps(record).encode('utf-8'))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Chunk Record Writer
+Appends uploaded index documents and their embeddings, and tombstones for deleted ones, to a JSONL file
+"""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within one process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class ChunkRecordWriter:
+    """Writes one JSON record per uploaded chunk for the local retrieval backend"""
+
+    def __init__(self, records_path: str):
+        """
+        Initialize the writer
+
+        Args:
+            records_path: JSONL file to append records to
+        """
+        self.records_path = Path(records_path)
+        self.records_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.records_written = 0
+
+    def append(self, docs: List[Dict[str, Any]], chunks: List[Dict[str, Any]]):
+        """
+        Append records for one file
+
+        Args:
+            docs: Index documents as uploaded to Azure AI Search
+            chunks: The pipeline chunks the documents were built from (same order)
+        """
+        lines = []
+        for doc, chunk in zip(docs, chunks):
+            record = {key: value for key, value in doc.items() if not isinstance(value, list) or key == 'tags'}
+            record['embedding'] = chunk.get('embedding') or []
+            lines.append(json.dumps(record))
+        self._write(lines)
+
+    def append_deletions(self, ids: List[str]):
+        """
+        Append tombstones for documents deleted from the index
+
+        Args:
+            ids: IDs of the deleted documents
+        """
+        self._write([json.dumps({'id': doc_id, 'deleted': True}) for doc_id in ids])
+
+    def _write(self, lines: List[str]):
+        if not lines:
+            return
+        try:
+            with self._lock, open(self.records_path, 'a', encoding='utf-8') as f:
+                # API worker processes append to the same file, and a record with its
+                # embedding is too large to land in one write() call
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    f.write("\n".join(lines) + "\n")
+                    f.flush()
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            self.records_written += len(lines)
+            logger.info(f"Appended {len(lines)} chunk records to {self.records_path}")
+        except OSError as e:
+            logger.error(f"Error writing chunk records to {self.records_path}: {e}")
@@ -4,9 +4,10 @@ Content Chunker for Multimodal Ingestion Pipeline
 Creates semantic-aware chunks with overlap for optimal embedding generation
 """
 
+import bisect
 import logging
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 
@@ -15,6 +16,8 @@ logger = logging.getLogger(__name__)
 class ContentChunker:
     """Semantic-aware content chunker with overlap"""
     
+    PAGE_MARKER_PATTERN = re.compile(r'--- Page (\d+) ---')
+    
     def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200, 
                  separators: Optional[List[str]] = None):
         """
@@ -71,17 +74,23 @@ class ContentChunker:
             # Split into chunks
             chunks = self.text_splitter.split_documents([doc])
             
+            # Page marker offsets for resolving each chunk's page number
+            page_offsets = [m.start() for m in self.PAGE_MARKER_PATTERN.finditer(text_content)]
+            
             # Convert to dictionary format
             chunk_dicts = []
             for i, chunk in enumerate(chunks):
+                start_char = text_content.find(chunk.page_content)
                 chunk_dict = {
                     'id': f"chunk_{i+1}",
                     'content': chunk.page_content,
                     'metadata': chunk.metadata.copy(),
                     'chunk_index': i + 1,
+                    'chunk_type': 'text',
+                    'page_number': bisect.bisect_right(page_offsets, max(start_char, 0)) if page_offsets else 0,
                     'chunk_size': len(chunk.page_content),
-                    'start_char': text_content.find(chunk.page_content),
-                    'end_char': text_content.find(chunk.page_content) + len(chunk.page_content)
+                    'start_char': start_char,
+                    'end_char': start_char + len(chunk.page_content)
                 }
                 chunk_dicts.append(chunk_dict)
             
@@ -125,6 +134,99 @@ class ContentChunker:
             logger.error(f"Error chunking with image context: {e}")
             return self.chunk_text(text_content, metadata)
     
+    def iter_chunks(self, pages: Iterable[Dict[str, Any]],
+                    metadata: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Chunk a document page by page, keeping only a sliding window in memory
+        
+        Pages are laid out as in whole-document chunking (page marker, image analyses after it, pages
+        separated by blank lines). The last piece of each split is held back and split again with the
+        next page, so chunks still run across page breaks.
+        
+        Args:
+            pages: {'page_number', 'text', 'image_analyses'} for each page in order
+            metadata: Additional metadata for chunks
+            
+        Yields:
+            Chunk dictionaries with image context, numbered across the whole document
+        """
+        buffer = ""
+        buffer_offset = 0    # Offset of the buffer in the whole document
+        buffer_page = 0      # Page the buffer starts on
+        analyses = {}        # page_number -> image analyses of the pages still in the buffer
+        chunk_index = 0
+        
+        def split(text: str):
+            """Split the buffer into (piece, offset in buffer, page number) triples"""
+            markers = [(m.start(), int(m.group(1))) for m in self.PAGE_MARKER_PATTERN.finditer(text)]
+            position = 0
+            for piece in self.text_splitter.split_text(text):
+                found = text.find(piece, position)
+                start = found if found >= 0 else position
+                position = start + 1
+                page_number = buffer_page
+                for marker_offset, marker_page in markers:
+                    if marker_offset > start:
+                        break
+                    page_number = marker_page
+                yield piece, start, page_number
+        
+        def build(piece: str, start: int, page_number: int) -> Dict[str, Any]:
+            nonlocal chunk_index
+            chunk_index += 1
+            start_char = buffer_offset + start
+            chunk = {
+                'id': f"chunk_{chunk_index}",
+                'content': piece,
+                'metadata': dict(metadata or {}),
+                'chunk_index': chunk_index,
+                'chunk_type': 'text',
+                'page_number': page_number,
+                'chunk_size': len(piece),
+                'start_char': start_char,
+                'end_char': start_char + len(piece)
+            }
+            window_analyses = [analysis for page_analyses in analyses.values() for analysis in page_analyses]
+            chunk['image_context'] = self._get_chunk_image_context(chunk, window_analyses)
+            chunk['has_images'] = bool(chunk['image_context'])
+            return chunk
+        
+        for page in pages:
+            page_number = page['page_number']
+            analyses[page_number] = [a for a in page.get('image_analyses', []) if a.get('success')]
+            section = self._page_section(page)
+            if buffer:
+                buffer = f"{buffer}\n\n{section}"
+            else:
+                buffer, buffer_page = section, page_number
+            
+            pieces = list(split(buffer))
+            if len(pieces) < 2:
+                continue
+            for piece, start, piece_page in pieces[:-1]:
+                yield build(piece, start, piece_page)
+            
+            # The last piece may continue on the next page: it becomes the start of the new buffer
+            _, carry_start, carry_page = pieces[-1]
+            buffer = buffer[carry_start:]
+            buffer_offset += carry_start
+            buffer_page = carry_page
+            analyses = {number: page_analyses for number, page_analyses in analyses.items() if number >= carry_page}
+        
+        for piece, start, piece_page in split(buffer):
+            yield build(piece, start, piece_page)
+        
+        logger.info(f"Streamed {chunk_index} chunks")
+    
+    def _page_section(self, page: Dict[str, Any]) -> str:
+        """Lay out one page as whole-document chunking does, with its image analyses after the marker"""
+        summaries = "".join(
+            f"\n\n[Image Analysis - {analysis.get('image_id', '')}]\n{analysis['analysis']}\n"
+            for analysis in page.get('image_analyses', [])
+            if analysis.get('success') and analysis.get('analysis')
+        )
+        return f"--- Page {page['page_number']} ---{summaries}\n{page['text']}"
+    
     def _integrate_image_analyses(self, text_content: str, image_analyses: List[Dict[str, Any]]) -> str:
         """Integrate image analyses into text content"""
         enhanced_content = text_content
@@ -38,6 +38,21 @@ class Config:
     MAX_IMAGE_SIZE = int(os.getenv('MAX_IMAGE_SIZE', '20971520'))  # 20MB
     TEMP_IMAGE_DIR = os.getenv('TEMP_IMAGE_DIR', 'temp_images')
     
+    # Local export of uploaded chunk records (JSONL) for the RAG local retrieval backend
+    CHUNK_RECORDS_PATH = os.getenv('CHUNK_RECORDS_PATH')
+    
+    # Index generation counter shared by ingestion and RAG (invalidates cached answers)
+    INDEX_GENERATION_PATH = os.getenv('INDEX_GENERATION_PATH', 'cache/index_generation.json')
+    
+    # Local manifest of ingested file hashes, checked before extraction (empty disables it)
+    FILE_MANIFEST_PATH = os.getenv('FILE_MANIFEST_PATH', 'cache/file_manifest.sqlite')
+    
+    # Durable ingestion job store shared by the API and worker processes
+    JOB_STORE = os.getenv('JOB_STORE', 'sqlite')
+    JOB_STORE_PATH = os.getenv('JOB_STORE_PATH', 'jobs/ingestion_jobs.sqlite')
+    # Run ingestion workers inside the API process (disable when running api/worker.py separately)
+    API_EMBEDDED_WORKERS = os.getenv('API_EMBEDDED_WORKERS', 'true').lower() == 'true'
+    
     # Supported file formats
     SUPPORTED_IMAGE_FORMATS = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp']
     
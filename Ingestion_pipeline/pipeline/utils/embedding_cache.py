@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Embedding Cache
+Content-addressed store of chunk embeddings keyed by normalized text, deployment and dimension
+"""
+
+import hashlib
+import logging
+import re
+from array import array
+from typing import Dict, List, Optional
+
+from .kv_cache import PersistentLRUCache
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+class EmbeddingCache(PersistentLRUCache):
+    """Persistent cache of chunk embeddings stored as float32 blobs"""
+
+    def __init__(self, db_path: str, max_bytes: int):
+        """
+        Initialize the embedding cache
+
+        Args:
+            db_path: Path to the SQLite database file
+            max_bytes: Maximum total size of cached vectors
+        """
+        super().__init__(db_path, max_bytes, table="embeddings")
+
+    @staticmethod
+    def make_key(text: str, deployment: str, dimension: int) -> str:
+        """Build the cache key for a text (whitespace-only differences share a key; case does not)"""
+        normalized = WHITESPACE_PATTERN.sub(" ", text).strip()
+        digest = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        return f"{digest}:{deployment}:{dimension}"
+
+    def get_embeddings(self, texts: List[str], deployment: str, dimension: int) -> List[Optional[List[float]]]:
+        """
+        Look up cached embeddings
+
+        Args:
+            texts: Texts to look up
+            deployment: Embedding deployment name
+            dimension: Vector dimension
+
+        Returns:
+            One embedding per text, None where it is not cached
+        """
+        keys = [self.make_key(text, deployment, dimension) for text in texts]
+        found = self.get_many(keys)
+
+        embeddings = []
+        for key in keys:
+            value = found.get(key)
+            if value is None or len(value) != dimension * 4:
+                embeddings.append(None)
+                continue
+            vector = array('f')
+            vector.frombytes(value)
+            embeddings.append(vector.tolist())
+        return embeddings
+
+    def put_embeddings(self, texts: List[str], embeddings: List[List[float]], deployment: str, dimension: int):
+        """
+        Store embeddings
+
+        Args:
+            texts: Embedded texts
+            embeddings: One vector per text
+            deployment: Embedding deployment name
+            dimension: Vector dimension
+        """
+        items: Dict[str, bytes] = {}
+        for text, embedding in zip(texts, embeddings):
+            if len(embedding) == dimension:
+                items[self.make_key(text, deployment, dimension)] = array('f', embedding).tobytes()
+        self.put_many(items.items())
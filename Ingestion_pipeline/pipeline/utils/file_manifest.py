@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+File Manifest
+SQLite record of ingested files by name and content hash, consulted before any extraction
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from hyperparameters import IngestionHyperparameters
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of comparing a file against the manifest
+ACTION_SKIP = "skip"              # Same name, same content: already indexed
+ACTION_DUPLICATE = "duplicate"    # New name, content already indexed under another name
+ACTION_UPDATE = "update"          # Same name, new content
+ACTION_ADD = "add"                # Not ingested yet
+ACTION_UNREADABLE = "unreadable"  # Could not be hashed
+
+class FileManifest:
+    """Local index of ingested files: source name -> content hash and index state"""
+
+    def __init__(self, db_path: str):
+        """
+        Open or create the manifest
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "name TEXT PRIMARY KEY, file_hash TEXT NOT NULL, size INTEGER NOT NULL, "
+            "chunks INTEGER NOT NULL, ingested_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_files_hash ON files(file_hash)")
+        self._conn.commit()
+
+        count = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        logger.info(f"File manifest opened at {self.db_path}: {count} files")
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the manifest entry of a file
+
+        Args:
+            name: Name the file is indexed under
+
+        Returns:
+            Entry fields, or None if the file has not been ingested
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM files WHERE name = ?", (name,)).fetchone()
+        return dict(row) if row else None
+
+    def find_by_hash(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Get an entry holding the given content, under any name"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM files WHERE file_hash = ? LIMIT 1", (file_hash,)).fetchone()
+        return dict(row) if row else None
+
+    def classify(self, name: str, file_hash: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Decide what ingesting a file would do
+
+        Args:
+            name: Name the file would be indexed under
+            file_hash: SHA-256 of the file content
+
+        Returns:
+            (ACTION_* constant, the manifest entry it was decided on or None)
+        """
+        entry = self.get(name)
+        if entry is not None:
+            return (ACTION_SKIP if entry['file_hash'] == file_hash else ACTION_UPDATE), entry
+        # Only a new name can be a copy; a known name with new content still has old chunks to replace
+        duplicate = self.find_by_hash(file_hash)
+        if duplicate is not None:
+            return ACTION_DUPLICATE, duplicate
+        return ACTION_ADD, None
+
+    def record(self, name: str, file_hash: str, size: int, chunks: int):
+        """
+        Record a file as ingested, replacing its previous entry
+
+        Args:
+            name: Name the file is indexed under
+            file_hash: SHA-256 of the file content
+            size: File size in bytes
+            chunks: Chunks the file has in the index
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (name, file_hash, size, chunks, ingested_at) VALUES (?, ?, ?, ?, ?)",
+                (name, file_hash, size, chunks, time.time())
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def file_sha256(file_path: str) -> str:
+    """SHA-256 of a file's content"""
+    hash_sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        # Large reads keep the loop cheap and let hashlib release the GIL, so threads hash in parallel
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hash_sha256.update(chunk)
+    return hash_sha256.hexdigest()
+
+def prescan(file_paths: List[str], manifest: Optional[FileManifest], workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Hash files in parallel and classify them against the manifest, without processing anything
+
+    Only the local manifest is consulted, so files ingested elsewhere and not yet
+    recorded show up as added.
+
+    Args:
+        file_paths: Files to scan
+        manifest: Manifest to compare against (None classifies every file as added)
+        workers: Hashing threads (defaults to PRESCAN_WORKERS)
+
+    Returns:
+        Report with one entry per file, in order ('file', 'file_hash', 'action', 'duplicate_of'),
+        counts by action, bytes hashed and elapsed seconds
+    """
+    start_time = time.time()
+
+    def hash_file(file_path: str) -> Optional[str]:
+        try:
+            return file_sha256(file_path)
+        except OSError as e:
+            logger.warning(f"Could not hash {file_path}: {e}")
+            return None
+
+    workers = min(workers or IngestionHyperparameters.PRESCAN_WORKERS, len(file_paths))
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="prescan") as threads:
+        hashes = list(threads.map(hash_file, file_paths))
+
+    files = []
+    counts = {action: 0 for action in (ACTION_SKIP, ACTION_DUPLICATE, ACTION_UPDATE, ACTION_ADD, ACTION_UNREADABLE)}
+    bytes_hashed = 0
+    first_seen = {}
+    for file_path, file_hash in zip(file_paths, hashes):
+        name = Path(file_path).name
+        duplicate_of = None
+        if file_hash is None:
+            action = ACTION_UNREADABLE
+        else:
+            bytes_hashed += os.path.getsize(file_path)
+            action, entry = manifest.classify(name, file_hash) if manifest else (ACTION_ADD, None)
+            if action == ACTION_DUPLICATE:
+                duplicate_of = entry['name']
+            elif action == ACTION_ADD and file_hash in first_seen:
+                # A copy of another file in this scan: only the first one is ingested
+                action, duplicate_of = ACTION_DUPLICATE, first_seen[file_hash]
+            first_seen.setdefault(file_hash, name)
+        counts[action] += 1
+        files.append({'file': file_path, 'file_hash': file_hash, 'action': action, 'duplicate_of': duplicate_of})
+
+    return {
+        'files': files,
+        'counts': counts,
+        'bytes_hashed': bytes_hashed,
+        'seconds': time.time() - start_time
+    }
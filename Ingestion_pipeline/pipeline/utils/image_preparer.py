@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Image Preparer
+Filters and downscales extracted images before they are sent to GPT-4.1 Vision
+"""
+
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from PIL import Image, ImageStat
+
+from hyperparameters import IngestionHyperparameters
+
+logger = logging.getLogger(__name__)
+
+SKIP_TINY = 'tiny'
+SKIP_BLANK = 'blank'
+SKIP_TOO_LARGE = 'too_large'
+SKIP_UNREADABLE = 'unreadable'
+
+class ImagePreparer:
+    """
+    Drops images not worth a vision call and re-encodes the rest at the model's effective resolution
+
+    Skipped: images under MIN_IMAGE_SIZE bytes or IMAGE_MIN_DIMENSION pixels (rules, bullets, icons),
+    near-blank or single-colour images, and images still above MAX_IMAGE_SIZE once prepared.
+    Kept images are downscaled to fit VISION_MAX_LONG_SIDE x VISION_MAX_SHORT_SIDE and re-encoded
+    as JPEG at IMAGE_QUALITY. Flat graphics that compress better losslessly (diagrams, line art)
+    keep a lossless encoding instead (the original or a downscaled PNG, whichever is smaller).
+    """
+
+    def __init__(self):
+        """Initialize the preparer from hyperparameters"""
+        self.min_bytes = IngestionHyperparameters.MIN_IMAGE_SIZE
+        self.max_bytes = IngestionHyperparameters.MAX_IMAGE_SIZE
+        self.min_dimension = IngestionHyperparameters.IMAGE_MIN_DIMENSION
+        self.blank_stddev = IngestionHyperparameters.IMAGE_BLANK_STDDEV
+        self.max_long_side = IngestionHyperparameters.VISION_MAX_LONG_SIDE
+        self.max_short_side = IngestionHyperparameters.VISION_MAX_SHORT_SIDE
+        self.quality = IngestionHyperparameters.IMAGE_QUALITY
+        self.workers = max(1, IngestionHyperparameters.IMAGE_PREPARATION_WORKERS)
+
+    def prepare(self, image_data: bytes) -> Dict[str, Any]:
+        """
+        Prepare one encoded image for a vision request
+
+        Args:
+            image_data: Encoded image bytes as extracted
+
+        Returns:
+            {'skip': reason} for images to leave out, otherwise {'data': bytes, 'mime': MIME type}
+        """
+        if len(image_data) < self.min_bytes:
+            return {'skip': SKIP_TINY}
+
+        try:
+            image = Image.open(io.BytesIO(image_data))
+            original_mime = Image.MIME.get(image.format, 'image/png')
+            if min(image.size) < self.min_dimension:
+                return {'skip': SKIP_TINY}
+
+            image = self._flatten(image)
+            if self._is_blank(image):
+                return {'skip': SKIP_BLANK}
+
+            size = self._target_size(*image.size)
+            resized = size != image.size
+            if resized:
+                image = image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+            prepared, mime = self._encode(image, 'JPEG', quality=self.quality), 'image/jpeg'
+            if len(prepared) >= len(image_data):
+                # Flat graphics: JPEG is larger than the lossless original and blurs thin lines.
+                # The model scales an oversized original itself, so the smaller upload wins.
+                prepared, mime = image_data, original_mime
+                if resized:
+                    lossless = self._encode(image, 'PNG')
+                    if len(lossless) < len(prepared):
+                        prepared, mime = lossless, 'image/png'
+        except Exception as e:
+            # Leave undecodable images as they are; the vision call reports its own error
+            logger.warning(f"Could not prepare image for vision analysis, sending it unchanged: {e}")
+            prepared, mime = image_data, 'image/png'
+
+        if len(prepared) > self.max_bytes:
+            return {'skip': SKIP_TOO_LARGE}
+        return {'data': prepared, 'mime': mime}
+
+    def prepare_all(self, visual_elements: List[Dict[str, Any]],
+                    report: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Prepare the images of a list of visual elements
+
+        Args:
+            visual_elements: Elements holding 'data' bytes or a 'path' to the image
+            report: Accumulates counts across calls (see new_report)
+
+        Returns:
+            One prepare() result per element, in order
+        """
+        report = report if report is not None else self.new_report()
+        workers = min(self.workers, len(visual_elements))
+        if workers <= 1:
+            prepared = [self._prepare_element(element) for element in visual_elements]
+        else:
+            # Pillow releases the GIL while decoding, resizing and encoding
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-prep") as executor:
+                prepared = list(executor.map(self._prepare_element, visual_elements))
+
+        for result in prepared:
+            report['images'] += 1
+            report['bytes_in'] += result.pop('original_size')
+            if 'skip' in result:
+                report['images_skipped'] += 1
+                report['skip_reasons'][result['skip']] = report['skip_reasons'].get(result['skip'], 0) + 1
+            else:
+                report['bytes_out'] += len(result['data'])
+        report['bytes_saved'] = report['bytes_in'] - report['bytes_out']
+        return prepared
+
+    def _prepare_element(self, element: Dict[str, Any]) -> Dict[str, Any]:
+        """prepare() the image of one element, noting its original size"""
+        image_data = element.get('data')
+        if image_data is None:
+            try:
+                with open(element['path'], 'rb') as f:
+                    image_data = f.read()
+            except (OSError, KeyError) as e:
+                logger.warning(f"Image of {element.get('id')} not found: {e}")
+                return {'skip': SKIP_UNREADABLE, 'original_size': 0}
+        return {**self.prepare(image_data), 'original_size': len(image_data)}
+
+    @staticmethod
+    def new_report() -> Dict[str, Any]:
+        """Empty preparation report: images seen and skipped, and bytes before and after preparation"""
+        return {'images': 0, 'images_skipped': 0, 'skip_reasons': {},
+                'bytes_in': 0, 'bytes_out': 0, 'bytes_saved': 0}
+
+    @staticmethod
+    def _flatten(image: Image.Image) -> Image.Image:
+        """Convert to RGB, compositing transparency onto white as it would appear on the page"""
+        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            return background
+        return image.convert('RGB')
+
+    def _is_blank(self, image: Image.Image) -> bool:
+        """Whether every colour channel is nearly constant (blank page areas, solid fills)"""
+        # Statistics come from the full-resolution histogram: a thumbnail would average away thin lines
+        return max(ImageStat.Stat(image).stddev) < self.blank_stddev
+
+    @staticmethod
+    def _encode(image: Image.Image, format: str, **options) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, format=format, **options)
+        return buffer.getvalue()
+
+    def _target_size(self, width: int, height: int) -> tuple:
+        """Largest size within the model's effective resolution, never upscaling"""
+        scale = min(1.0,
+                    self.max_long_side / max(width, height),
+                    self.max_short_side / min(width, height))
+        return (max(1, round(width * scale)), max(1, round(height * scale)))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Index Generation
+Counter bumped after every ingestion so that RAG answer caches can drop stale entries
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterable
+
+try:
+    import fcntl
+except ImportError:  # Windows: bumps are only serialized within one process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class IndexGeneration:
+    """JSON file holding the global index generation and the generation each file was last ingested at"""
+
+    def __init__(self, path: str):
+        """
+        Initialize the counter
+
+        Args:
+            path: JSON file shared with the RAG service (INDEX_GENERATION_PATH)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Sidecar locked around each read-modify-write, shared by every ingestion process
+        self.lock_path = self.path.with_suffix(self.path.suffix + ".lock")
+
+    def read(self) -> Dict[str, Any]:
+        """Read the current state ({'generation': int, 'files': {filename: int}})"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'generation': 0, 'files': {}}
+
+    def bump(self, filenames: Iterable[str]) -> int:
+        """
+        Advance the generation after files were (re-)ingested
+
+        Args:
+            filenames: Files whose chunks changed in the index
+
+        Returns:
+            The new generation
+        """
+        with self._lock, self._file_lock():
+            state = self.read()
+            generation = state.get('generation', 0) + 1
+            files = state.get('files', {})
+            for filename in filenames:
+                files[filename] = generation
+
+            # Write-then-rename so readers never see a partial file
+            tmp_path = self.path.with_suffix(self.path.suffix + f".{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'generation': generation, 'files': files, 'updated_at': time.time()}, f)
+            os.replace(tmp_path, self.path)
+
+        logger.info(f"Index generation advanced to {generation}")
+        return generation
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock across processes (API workers, parallel batch workers)"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
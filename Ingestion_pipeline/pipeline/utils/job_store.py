@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Ingestion Job Store
+Durable job records and a leased work queue shared by the API and any number of worker processes
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Jobs in these states have not finished yet
+ACTIVE_STATUSES = ("queued", "processing", "cancelling")
+
+class JobStore:
+    """Interface for durable ingestion job stores"""
+
+    name = "base"
+
+    def enqueue(self, job_id: str, filename: str, file_path: str, force_reprocess: bool,
+                max_queued: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Create a queued job
+
+        Args:
+            job_id: Job identifier
+            filename: Original filename
+            file_path: Local path of the uploaded file
+            force_reprocess: Process even if the file already exists in storage
+            max_queued: Reject the job if this many jobs are already waiting
+
+        Returns:
+            The new job, or None if the queue is full
+        """
+        raise NotImplementedError
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get one job, or None if it does not exist"""
+        raise NotImplementedError
+
+    def list_jobs(self, offset: int = 0, limit: int = 50, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List jobs, newest first
+
+        Args:
+            offset: Number of jobs to skip
+            limit: Maximum number of jobs to return
+            status: Only jobs with this status
+
+        Returns:
+            Jobs without their results
+        """
+        raise NotImplementedError
+
+    def count_jobs(self, status: Optional[str] = None) -> int:
+        """Count jobs, optionally with one status"""
+        raise NotImplementedError
+
+    def delete_job(self, job_id: str) -> bool:
+        """Delete a job; returns False if it does not exist"""
+        raise NotImplementedError
+
+    def request_cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job: a queued job is cancelled at once, a running one is flagged for its worker
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            The updated job, or None if it does not exist
+        """
+        raise NotImplementedError
+
+    def lease_next(self, worker_id: str, lease_seconds: float, max_attempts: int) -> Optional[Dict[str, Any]]:
+        """
+        Lease the oldest queued job, first requeueing jobs whose worker stopped heartbeating
+
+        Args:
+            worker_id: Identifier of the leasing worker
+            lease_seconds: Seconds the lease lasts without a heartbeat
+            max_attempts: Jobs whose lease expired this many times are failed instead of requeued
+
+        Returns:
+            The leased job, or None if nothing is queued
+        """
+        raise NotImplementedError
+
+    def heartbeat(self, job_ids: Iterable[str], worker_id: str, lease_seconds: float) -> Dict[str, bool]:
+        """
+        Extend the leases a worker holds
+
+        Args:
+            job_ids: Jobs the worker is running
+            worker_id: Identifier of the worker
+            lease_seconds: New lease duration
+
+        Returns:
+            For each job still leased by the worker, whether cancellation was requested
+            (jobs missing from the result were lost to another worker)
+        """
+        raise NotImplementedError
+
+    def update_progress(self, job_id: str, worker_id: str, step: str, message: str):
+        """Record progress of a leased job"""
+        raise NotImplementedError
+
+    def finish(self, job_id: str, worker_id: str, status: str, message: str,
+               result: Optional[Dict[str, Any]]) -> bool:
+        """
+        Record the outcome of a leased job
+
+        Returns:
+            False if the worker no longer held the lease
+        """
+        raise NotImplementedError
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """
+        Give a leased job back to the queue (worker shutting down); jobs with a pending cancellation are cancelled
+
+        Returns:
+            False if the worker no longer held the lease
+        """
+        raise NotImplementedError
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get job counts per status"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the store"""
+
+class SQLiteJobStore(JobStore):
+    """Job store in a SQLite database in WAL mode, safe to share between processes on one host"""
+
+    name = "sqlite"
+
+    COLUMNS = ("job_id, status, filename, file_path, force_reprocess, progress_step, progress_message, "
+               "attempts, lease_owner, lease_expires_at, cancel_requested, created_at, updated_at")
+
+    def __init__(self, db_path: str, busy_timeout: float = 30.0):
+        """
+        Initialize the store
+
+        Args:
+            db_path: Path to the SQLite database file
+            busy_timeout: Seconds to wait for another process holding the write lock
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Autocommit mode; write transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(str(self.db_path), timeout=busy_timeout,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, filename TEXT NOT NULL, file_path TEXT NOT NULL, "
+            "force_reprocess INTEGER NOT NULL, progress_step TEXT, progress_message TEXT, result TEXT, "
+            "attempts INTEGER NOT NULL DEFAULT 0, lease_owner TEXT, lease_expires_at REAL, "
+            "cancel_requested INTEGER NOT NULL DEFAULT 0, created_ts REAL NOT NULL, "
+            "created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_ts)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_ts)")
+
+        logger.info(f"Job store opened at {self.db_path}: {self.count_jobs()} jobs")
+
+    def _write(self, statements):
+        """Run (sql, params) statements in one write transaction, returning the last cursor"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = None
+                for sql, params in statements:
+                    cursor = self._conn.execute(sql, params)
+                self._conn.execute("COMMIT")
+                return cursor
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _now_iso() -> str:
+        return datetime.now().isoformat()
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row, with_result: bool = True) -> Dict[str, Any]:
+        job = {
+            'job_id': row['job_id'],
+            'status': row['status'],
+            'filename': row['filename'],
+            'file_path': row['file_path'],
+            'force_reprocess': bool(row['force_reprocess']),
+            'progress': {'step': row['progress_step'], 'message': row['progress_message']},
+            'attempts': row['attempts'],
+            'lease_owner': row['lease_owner'],
+            'cancel_requested': bool(row['cancel_requested']),
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at']
+        }
+        if with_result:
+            job['result'] = json.loads(row['result']) if row['result'] else None
+        return job
+
+    def enqueue(self, job_id: str, filename: str, file_path: str, force_reprocess: bool,
+                max_queued: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        now = self._now_iso()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if max_queued is not None:
+                    queued = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+                    if queued >= max_queued:
+                        self._conn.execute("ROLLBACK")
+                        return None
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, status, filename, file_path, force_reprocess, progress_step, "
+                    "progress_message, created_ts, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, filename, file_path, int(force_reprocess), 'queued',
+                     "File uploaded, waiting for a worker", time.time(), now, now)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get_job(job_id)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {self.COLUMNS}, result FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def list_jobs(self, offset: int = 0, limit: int = 50, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        where, params = ("WHERE status = ?", (status,)) if status else ("", ())
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM jobs {where} ORDER BY created_ts DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset)
+            ).fetchall()
+        return [self._to_job(row, with_result=False) for row in rows]
+
+    def count_jobs(self, status: Optional[str] = None) -> int:
+        where, params = ("WHERE status = ?", (status,)) if status else ("", ())
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM jobs {where}", params).fetchone()[0]
+
+    def delete_job(self, job_id: str) -> bool:
+        cursor = self._write([("DELETE FROM jobs WHERE job_id = ?", (job_id,))])
+        return cursor.rowcount > 0
+
+    def request_cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        now = self._now_iso()
+        self._write([
+            ("UPDATE jobs SET status = 'cancelled', progress_step = 'cancelled', "
+             "progress_message = 'Cancelled before processing started', updated_at = ? "
+             "WHERE job_id = ? AND status = 'queued'", (now, job_id)),
+            ("UPDATE jobs SET status = 'cancelling', cancel_requested = 1, progress_step = 'cancelling', "
+             "progress_message = 'Cancellation requested', updated_at = ? "
+             "WHERE job_id = ? AND status = 'processing'", (now, job_id))
+        ])
+        return self.get_job(job_id)
+
+    def lease_next(self, worker_id: str, lease_seconds: float, max_attempts: int) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        now_iso = self._now_iso()
+        expired = "status IN ('processing', 'cancelling') AND lease_expires_at < ?"
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs whose worker died: cancel, fail after max_attempts, otherwise retry
+                self._conn.execute(
+                    f"UPDATE jobs SET status = 'cancelled', lease_owner = NULL, progress_step = 'cancelled', "
+                    f"progress_message = 'Processing cancelled', updated_at = ? WHERE {expired} AND cancel_requested = 1",
+                    (now_iso, now)
+                )
+                self._conn.execute(
+                    f"UPDATE jobs SET status = 'failed', lease_owner = NULL, progress_step = 'failed', "
+                    f"progress_message = 'Worker stopped responding', result = ?, updated_at = ? "
+                    f"WHERE {expired} AND attempts >= ?",
+                    (json.dumps({'success': False, 'error': f"Worker stopped responding after {max_attempts} attempts"}),
+                     now_iso, now, max_attempts)
+                )
+                requeued = self._conn.execute(
+                    f"UPDATE jobs SET status = 'queued', lease_owner = NULL, progress_step = 'queued', "
+                    f"progress_message = 'Worker stopped responding, retrying', updated_at = ? WHERE {expired}",
+                    (now_iso, now)
+                ).rowcount
+                if requeued:
+                    logger.warning(f"Requeued {requeued} jobs with expired leases")
+
+                row = self._conn.execute(
+                    "SELECT job_id FROM jobs WHERE status = 'queued' ORDER BY created_ts LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'processing', lease_owner = ?, lease_expires_at = ?, "
+                        "attempts = attempts + 1, progress_step = 'processing', "
+                        "progress_message = 'Processing document...', updated_at = ? WHERE job_id = ?",
+                        (worker_id, now + lease_seconds, now_iso, row['job_id'])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get_job(row['job_id']) if row is not None else None
+
+    def heartbeat(self, job_ids: Iterable[str], worker_id: str, lease_seconds: float) -> Dict[str, bool]:
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in job_ids)
+        self._write([(
+            f"UPDATE jobs SET lease_expires_at = ? WHERE lease_owner = ? AND job_id IN ({placeholders}) "
+            "AND status IN ('processing', 'cancelling')",
+            (time.time() + lease_seconds, worker_id, *job_ids)
+        )])
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT job_id, cancel_requested FROM jobs WHERE lease_owner = ? AND job_id IN ({placeholders}) "
+                "AND status IN ('processing', 'cancelling')",
+                (worker_id, *job_ids)
+            ).fetchall()
+        return {row['job_id']: bool(row['cancel_requested']) for row in rows}
+
+    def update_progress(self, job_id: str, worker_id: str, step: str, message: str):
+        self._write([(
+            "UPDATE jobs SET progress_step = ?, progress_message = ?, updated_at = ? "
+            "WHERE job_id = ? AND lease_owner = ? AND status = 'processing'",
+            (step, message, self._now_iso(), job_id, worker_id)
+        )])
+
+    def finish(self, job_id: str, worker_id: str, status: str, message: str,
+               result: Optional[Dict[str, Any]]) -> bool:
+        cursor = self._write([(
+            "UPDATE jobs SET status = ?, progress_step = ?, progress_message = ?, result = ?, "
+            "lease_owner = NULL, lease_expires_at = NULL, updated_at = ? WHERE job_id = ? AND lease_owner = ?",
+            (status, status, message, json.dumps(result, default=str) if result is not None else None,
+             self._now_iso(), job_id, worker_id)
+        )])
+        return cursor.rowcount > 0
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        now = self._now_iso()
+        released = "job_id = ? AND lease_owner = ? AND status IN ('processing', 'cancelling')"
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                count = self._conn.execute(
+                    f"UPDATE jobs SET status = 'cancelled', lease_owner = NULL, lease_expires_at = NULL, "
+                    f"progress_step = 'cancelled', progress_message = 'Processing cancelled', updated_at = ? "
+                    f"WHERE {released} AND cancel_requested = 1",
+                    (now, job_id, worker_id)
+                ).rowcount
+                count += self._conn.execute(
+                    f"UPDATE jobs SET status = 'queued', lease_owner = NULL, lease_expires_at = NULL, "
+                    f"attempts = MAX(attempts - 1, 0), progress_step = 'queued', "
+                    f"progress_message = 'Worker stopped, waiting for another worker', updated_at = ? WHERE {released}",
+                    (now, job_id, worker_id)
+                ).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return count > 0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+        return {
+            'store': self.name,
+            'path': str(self.db_path),
+            'jobs': {row['status']: row['count'] for row in rows}
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def create_job_store(backend: str = None, path: str = None) -> JobStore:
+    """
+    Create the configured job store
+
+    Args:
+        backend: Store name, defaults to JOB_STORE ("sqlite")
+        path: Database path, defaults to JOB_STORE_PATH
+
+    Returns:
+        The job store
+    """
+    from .config import Config
+
+    backend = backend or Config.JOB_STORE
+    if backend == "sqlite":
+        return SQLiteJobStore(path or Config.JOB_STORE_PATH)
+    raise ValueError(f"Unknown job store: {backend}")
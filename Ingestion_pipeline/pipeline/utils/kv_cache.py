@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Persistent Key-Value Cache
+SQLite-backed byte store with size-bounded LRU eviction
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class PersistentLRUCache:
+    """SQLite key-value store that evicts least recently used entries above a size limit"""
+
+    def __init__(self, db_path: str, max_bytes: int, table: str = "cache_entries"):
+        """
+        Initialize the cache
+
+        Args:
+            db_path: Path to the SQLite database file
+            max_bytes: Maximum total size of stored values before eviction
+            table: Table name, so several caches can share one database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.table = table
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_access ON {self.table}(last_access)")
+        # Running total per table, updated in each write transaction so that processes sharing
+        # the file agree on it without summing the table
+        self._conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (name TEXT PRIMARY KEY, total_bytes INTEGER NOT NULL)")
+        self._conn.commit()
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute("SELECT 1 FROM cache_meta WHERE name = ?", (self.table,)).fetchone() is None:
+                    # Database written before the total was kept: sum it once
+                    self._conn.execute(
+                        f"INSERT INTO cache_meta (name, total_bytes) "
+                        f"SELECT ?, COALESCE(SUM(length(value)), 0) FROM {self.table}",
+                        (self.table,)
+                    )
+                self._total_bytes = self._size()
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        entries = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        logger.info(f"Cache {self.table} opened at {self.db_path}: {entries} entries, {self._total_bytes} bytes")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a value and mark it as recently used
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Stored bytes, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            return bytes(row[0])
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        """
+        Get several values in one transaction and mark them as recently used
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Stored bytes by key, for the keys that were found
+        """
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(unique_keys), 500):
+                part = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM {self.table} WHERE key IN ({placeholders})", part
+                ).fetchall()
+                found.update((key, bytes(value)) for key, value in rows)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    f"UPDATE {self.table} SET last_access = ? WHERE key = ?", [(now, key) for key in found]
+                )
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(unique_keys) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]):
+        """
+        Store several values in one transaction, evicting old entries if the cache grows past max_bytes
+
+        Args:
+            items: (key, bytes) pairs
+        """
+        now = time.time()
+        rows = {key: (key, sqlite3.Binary(value), len(value), now, now) for key, value in items}
+        with self._lock:
+            # Write lock first: other processes sharing the file cannot change the total until commit
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # length() reads the blob size from the record header, not the blob itself
+                replaced = 0
+                keys = list(rows)
+                for start in range(0, len(keys), 500):
+                    part = keys[start:start + 500]
+                    placeholders = ",".join("?" * len(part))
+                    replaced += self._conn.execute(
+                        f"SELECT COALESCE(SUM(length(value)), 0) FROM {self.table} WHERE key IN ({placeholders})", part
+                    ).fetchone()[0]
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows.values()
+                )
+                self._total_bytes = self._add_size(sum(row[2] for row in rows.values()) - replaced)
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def put(self, key: str, value: bytes):
+        """
+        Store a value, evicting old entries if the cache grows past max_bytes
+
+        Args:
+            key: Cache key
+            value: Bytes to store
+        """
+        self.put_many([(key, value)])
+
+    def _size(self) -> int:
+        """Total size of the stored values, including other processes' writes (caller holds the lock)"""
+        return self._conn.execute("SELECT total_bytes FROM cache_meta WHERE name = ?", (self.table,)).fetchone()[0]
+
+    def _add_size(self, delta: int) -> int:
+        """Adjust the running total inside the current write transaction and return it"""
+        self._conn.execute("UPDATE cache_meta SET total_bytes = total_bytes + ? WHERE name = ?", (delta, self.table))
+        return self._size()
+
+    def _evict(self):
+        """Delete least recently used entries until under max_bytes (caller holds the write transaction)"""
+        # Evict down to 90% so that every put near the limit does not trigger an eviction
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        while self._total_bytes > target:
+            # Oldest entries first, a batch at a time, walking the last_access index
+            rows = self._conn.execute(
+                f"SELECT key, length(value) FROM {self.table} ORDER BY last_access ASC LIMIT 256"
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            freed = 0
+            for key, size in rows:
+                if self._total_bytes - freed <= target:
+                    break
+                victims.append((key,))
+                freed += size
+            self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
+            self._total_bytes = self._add_size(-freed)
+            evicted += len(victims)
+
+        self.evictions += evicted
+        logger.debug(f"Cache {self.table} evicted {evicted} entries")
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(f"DELETE FROM {self.table}")
+                self._conn.execute("UPDATE cache_meta SET total_bytes = 0 WHERE name = ?", (self.table,))
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            self._total_bytes = 0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            entries = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            self._total_bytes = self._size()
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'total_bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions
+        }
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Memory Monitor
+Samples the process's resident set size (RSS) while a document is processed
+"""
+
+import logging
+import os
+import resource
+import sys
+import threading
+from typing import Dict, Any, Optional
+
+from hyperparameters import IngestionHyperparameters
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def current_rss() -> int:
+    """Current resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        # No procfs (e.g. macOS): fall back to the lifetime peak, which is the best available bound
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+class MemoryMonitor:
+    """
+    Tracks peak RSS between entering and leaving the monitor
+
+    RSS is process-wide, so documents processed concurrently share the peak.
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        """
+        Initialize the monitor
+
+        Args:
+            interval: Seconds between samples (defaults to MEMORY_SAMPLE_INTERVAL)
+        """
+        self.interval = interval or IngestionHyperparameters.MEMORY_SAMPLE_INTERVAL
+        self.baseline = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> "MemoryMonitor":
+        self.baseline = self.peak = current_rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="memory-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def report(self) -> Dict[str, Any]:
+        """Get {'baseline_rss_mb', 'peak_rss_mb', 'peak_increase_mb'}"""
+        megabyte = 1024 * 1024
+        return {
+            'baseline_rss_mb': round(self.baseline / megabyte, 1),
+            'peak_rss_mb': round(self.peak / megabyte, 1),
+            'peak_increase_mb': round((self.peak - self.baseline) / megabyte, 1)
+        }
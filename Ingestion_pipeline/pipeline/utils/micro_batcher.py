@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Micro-Batcher
+Packs items submitted by concurrent callers into shared batches and routes the results back
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Why a batch was sent
+FLUSH_REASONS = ('items', 'cost', 'deadline', 'close')
+
+class _Request:
+    """Items submitted by one caller, completed as the batches holding them return"""
+
+    def __init__(self, size: int):
+        self.results = [None] * size
+        self.remaining = size
+        self.error = None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+
+    def set_result(self, index: int, result: Any):
+        with self._lock:
+            self.results[index] = result
+            self.remaining -= 1
+            if self.remaining == 0:
+                self.done.set()
+
+    def set_error(self, error: Exception):
+        with self._lock:
+            if self.error is None:
+                self.error = error
+            self.done.set()
+
+class MicroBatcher:
+    """Collects items from many threads and processes them in batches bounded by item count and total cost"""
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]], max_items: int,
+                 max_wait: float, max_in_flight: int = 1, name: str = "batcher",
+                 max_cost: Optional[int] = None, cost: Optional[Callable[[Any], int]] = None):
+        """
+        Initialize the batcher
+
+        Args:
+            process_batch: Processes a list of items and returns one result per item, in order
+            max_items: Items per batch; a full batch is sent at once (may be changed while running)
+            max_wait: Seconds the oldest waiting item may wait for the batch to fill
+            max_in_flight: Batches processed at once
+            name: Name used for threads and in logs
+            max_cost: Total cost per batch (e.g. tokens); an item costing more is sent alone (may be changed while running)
+            cost: Cost of one item (required with max_cost)
+        """
+        self.process_batch = process_batch
+        self.max_items = max_items
+        self.max_wait = max_wait
+        self.max_in_flight = max_in_flight
+        self.name = name
+        self.max_cost = max_cost
+        self.cost = cost if cost is not None else (lambda item: 0)
+
+        self._pending = deque()  # (request, index, item, arrived_at, cost)
+        self._pending_cost = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._slots = threading.Semaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix=name)
+        self._thread = threading.Thread(target=self._run, name=f"{name}-flusher", daemon=True)
+        self._thread.start()
+
+        # Metrics
+        self.requests = 0
+        self.items = 0
+        self.batches = 0
+        self.batched_items = 0
+        self.batched_cost = 0
+        self.item_capacity = 0  # Sum of the limits in force when each batch was formed
+        self.cost_capacity = 0
+        self.failed_batches = 0
+        self.wait_seconds = 0.0
+        self.flush_reasons = dict.fromkeys(FLUSH_REASONS, 0)
+
+    def submit(self, items: List[Any]) -> List[Any]:
+        """
+        Process items as part of shared batches, blocking until all of them are done
+
+        Args:
+            items: Items to process
+
+        Returns:
+            One result per item, in order
+
+        Raises:
+            Exception: Whatever process_batch raised for a batch holding one of the items
+        """
+        if not items:
+            return []
+
+        request = _Request(len(items))
+        costs = [self.cost(item) for item in items]
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} is closed")
+            now = time.monotonic()
+            self._pending.extend(
+                (request, index, item, now, item_cost)
+                for index, (item, item_cost) in enumerate(zip(items, costs))
+            )
+            self._pending_cost += sum(costs)
+            self.requests += 1
+            self.items += len(items)
+            self._cond.notify()
+
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.results
+
+    def _is_full(self) -> bool:
+        return (len(self._pending) >= self.max_items
+                or (self.max_cost is not None and self._pending_cost >= self.max_cost))
+
+    def _next_batch(self) -> Optional[List[tuple]]:
+        """Wait until a batch is full, its oldest item has waited max_wait, or the batcher closes"""
+        with self._cond:
+            while True:
+                if self._pending:
+                    waited = time.monotonic() - self._pending[0][3]
+                    if self._is_full() or waited >= self.max_wait or self._closed:
+                        break
+                    self._cond.wait(self.max_wait - waited)
+                elif self._closed:
+                    return None
+                else:
+                    self._cond.wait()
+
+            # Take items in arrival order while they fit; the first item always goes
+            batch = []
+            batch_cost = 0
+            while self._pending and len(batch) < self.max_items:
+                item_cost = self._pending[0][4]
+                if batch and self.max_cost is not None and batch_cost + item_cost > self.max_cost:
+                    break
+                batch.append(self._pending.popleft())
+                batch_cost += item_cost
+            self._pending_cost -= batch_cost
+
+            if len(batch) == self.max_items:
+                reason = 'items'
+            elif self.max_cost is not None and (self._pending or batch_cost >= self.max_cost):
+                reason = 'cost'
+            elif self._closed:
+                reason = 'close'
+            else:
+                reason = 'deadline'
+
+            now = time.monotonic()
+            self.batches += 1
+            self.batched_items += len(batch)
+            self.batched_cost += batch_cost
+            self.item_capacity += self.max_items
+            self.cost_capacity += self.max_cost or 0
+            self.wait_seconds += sum(now - entry[3] for entry in batch)
+            self.flush_reasons[reason] += 1
+            return batch
+
+    def _run(self):
+        """Flusher thread: form batches and hand them to the executor"""
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._slots.acquire()
+            self._executor.submit(self._flush, batch)
+
+    def _flush(self, batch: List[tuple]):
+        """Process one batch and deliver its results"""
+        try:
+            results = self.process_batch([entry[2] for entry in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"{self.name} returned {len(results)} results for {len(batch)} items")
+            for (request, index, _, _, _), result in zip(batch, results):
+                request.set_result(index, result)
+        except Exception as e:
+            logger.error(f"{self.name} batch of {len(batch)} items failed: {e}")
+            with self._cond:
+                self.failed_batches += 1
+            for request, _, _, _, _ in batch:
+                request.set_error(e)
+        finally:
+            self._slots.release()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get batching statistics, including how full the batches were packed"""
+        with self._cond:
+            batches = self.batches
+            stats = {
+                'requests': self.requests,
+                'items': self.items,
+                'batches': batches,
+                'failed_batches': self.failed_batches,
+                'pending_items': len(self._pending),
+                'average_batch_size': self.batched_items / batches if batches else 0.0,
+                'item_fill': self.batched_items / self.item_capacity if self.item_capacity else 0.0,
+                'average_wait_ms': 1000 * self.wait_seconds / self.batched_items if self.batched_items else 0.0,
+                'flush_reasons': dict(self.flush_reasons)
+            }
+            if self.max_cost is not None:
+                stats['average_batch_cost'] = self.batched_cost / batches if batches else 0.0
+                stats['cost_fill'] = self.batched_cost / self.cost_capacity if self.cost_capacity else 0.0
+            return stats
+
+    def close(self):
+        """Send the remaining items and stop the flusher"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter for Azure OpenAI Deployments
+Token-bucket limiter enforcing requests-per-minute and tokens-per-minute budgets, for threads and coroutines
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class RateLimiter:
+    """Thread-safe token-bucket limiter for one deployment's RPM and TPM budget"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, name: str = ""):
+        """
+        Initialize the rate limiter
+
+        Args:
+            requests_per_minute: Request budget per minute (0 disables the request bucket)
+            tokens_per_minute: Token budget per minute (0 disables the token bucket)
+            name: Name used in log messages, usually the deployment name
+        """
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+        # Buckets start full so a cold start is not throttled
+        self._request_allowance = float(requests_per_minute)
+        self._token_allowance = float(tokens_per_minute)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.total_acquisitions = 0
+        self.throttled_acquisitions = 0
+        self.total_wait_time = 0.0
+
+    def _refill(self):
+        """Refill both buckets based on elapsed time (caller holds the lock)"""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+
+        if self.requests_per_minute:
+            self._request_allowance = min(
+                float(self.requests_per_minute),
+                self._request_allowance + elapsed * self.requests_per_minute / 60.0
+            )
+        if self.tokens_per_minute:
+            self._token_allowance = min(
+                float(self.tokens_per_minute),
+                self._token_allowance + elapsed * self.tokens_per_minute / 60.0
+            )
+
+    def _try_acquire(self, tokens: int, waited: float) -> float:
+        """Take capacity if it is available; otherwise return the seconds to wait before trying again"""
+        with self._lock:
+            self._refill()
+
+            request_deficit = 1.0 - self._request_allowance if self.requests_per_minute else 0.0
+            token_deficit = tokens - self._token_allowance if self.tokens_per_minute else 0.0
+            # The service asked every caller of this deployment to back off (Retry-After)
+            paused_for = self._paused_until - time.monotonic()
+
+            if request_deficit <= 0 and token_deficit <= 0 and paused_for <= 0:
+                if self.requests_per_minute:
+                    self._request_allowance -= 1.0
+                if self.tokens_per_minute:
+                    self._token_allowance -= tokens
+
+                self.total_acquisitions += 1
+                if waited > 0:
+                    self.throttled_acquisitions += 1
+                    self.total_wait_time += waited
+                return 0.0
+
+            # Time until both buckets have refilled enough and any pause is over
+            sleep_for = max(paused_for, 0.0)
+            if request_deficit > 0:
+                sleep_for = max(sleep_for, request_deficit * 60.0 / self.requests_per_minute)
+            if token_deficit > 0:
+                sleep_for = max(sleep_for, token_deficit * 60.0 / self.tokens_per_minute)
+
+        logger.debug(f"Rate limiter {self.name} throttling for {sleep_for:.2f}s")
+        return max(sleep_for, 0.01)
+
+    def _clamp(self, tokens: int) -> int:
+        # A single request larger than the whole budget would never fit
+        return min(tokens, self.tokens_per_minute) if self.tokens_per_minute else tokens
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until one request and the given number of tokens fit in the budget
+
+        Args:
+            tokens: Estimated tokens the request will consume
+
+        Returns:
+            Seconds spent waiting for capacity
+        """
+        tokens = self._clamp(tokens)
+        waited = 0.0
+        while True:
+            sleep_for = self._try_acquire(tokens, waited)
+            if not sleep_for:
+                return waited
+            time.sleep(sleep_for)
+            waited += sleep_for
+
+    async def acquire_async(self, tokens: int = 0) -> float:
+        """
+        Wait, without blocking the event loop, until one request and the given tokens fit in the budget
+
+        Args:
+            tokens: Estimated tokens the request will consume
+
+        Returns:
+            Seconds spent waiting for capacity
+        """
+        tokens = self._clamp(tokens)
+        waited = 0.0
+        while True:
+            sleep_for = self._try_acquire(tokens, waited)
+            if not sleep_for:
+                return waited
+            await asyncio.sleep(sleep_for)
+            waited += sleep_for
+
+    def pause(self, seconds: float):
+        """
+        Hold back every caller of the deployment, e.g. for a Retry-After received on HTTP 429
+
+        Args:
+            seconds: How long no request may start
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def reconcile(self, reserved_tokens: int, actual_tokens: Optional[int]):
+        """
+        Correct the token bucket once the real usage of a request is known
+
+        Args:
+            reserved_tokens: Tokens reserved in acquire()
+            actual_tokens: Tokens reported by the API (None if unknown)
+        """
+        if not self.tokens_per_minute or actual_tokens is None:
+            return
+
+        with self._lock:
+            # Allowance may go negative: overspend is paid back by later callers
+            self._token_allowance += self._clamp(reserved_tokens) - actual_tokens
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get throttling statistics"""
+        return {
+            'name': self.name,
+            'requests_per_minute': self.requests_per_minute,
+            'tokens_per_minute': self.tokens_per_minute,
+            'total_acquisitions': self.total_acquisitions,
+            'throttled_acquisitions': self.throttled_acquisitions,
+            'total_wait_time': self.total_wait_time
+        }
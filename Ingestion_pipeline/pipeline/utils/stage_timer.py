@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Stage Timer
+Records wall-clock time and call counts for each ingestion stage
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Any
+
+class StageTimer:
+    """Collects per-stage timings for one document"""
+
+    def __init__(self):
+        """Initialize an empty timing report"""
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a block of work as one run of a stage
+
+        Args:
+            name: Stage name (e.g. 'extraction', 'embedding')
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        """Add one run of a stage to the report"""
+        entry = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0})
+        entry['calls'] += 1
+        entry['seconds'] += seconds
+
+    def seconds(self, *names: str) -> float:
+        """Total time recorded so far for the given stages"""
+        return sum(self.stages[name]['seconds'] for name in names if name in self.stages)
+
+    def merge(self, report: Dict[str, Dict[str, Any]]):
+        """Merge a report produced by another StageTimer"""
+        for name, entry in report.items():
+            merged = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            merged['calls'] += entry.get('calls', 0)
+            merged['seconds'] += entry.get('seconds', 0.0)
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Get the timing report as {stage: {'calls': int, 'seconds': float}}"""
+        return {name: dict(entry) for name, entry in self.stages.items()}
+
+    def format_report(self) -> str:
+        """Format the report as printable lines"""
+        lines = []
+        for name, entry in self.stages.items():
+            lines.append(f"   - {name}: {entry['seconds']:.2f}s ({entry['calls']} run{'s' if entry['calls'] != 1 else ''})")
+        return "\n".join(lines)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Token Counter
+Counts and splits text in model tokens with tiktoken, falling back to a character estimate
+"""
+
+import logging
+import math
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# Characters per token assumed when no tokenizer is available (conservative: English averages ~4)
+FALLBACK_CHARS_PER_TOKEN = 3
+
+class TokenCounter:
+    """Token counts for one model's encoding"""
+
+    def __init__(self, model: str, default_encoding: str = "cl100k_base"):
+        """
+        Initialize the counter
+
+        Args:
+            model: Model whose encoding to use
+            default_encoding: Encoding used when tiktoken does not know the model (e.g. a deployment name)
+        """
+        self.model = model
+        self.encoding = None
+        try:
+            import tiktoken
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding(default_encoding)
+        except Exception as e:
+            # tiktoken missing, or its encoding file could not be downloaded
+            logger.warning(f"No tokenizer for {model}, estimating tokens from characters: {e}")
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from the model's tokenizer"""
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        """Count the tokens in a text"""
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / FALLBACK_CHARS_PER_TOKEN)
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        """
+        Split a text into consecutive pieces of at most max_tokens tokens
+
+        Args:
+            text: Text to split
+            max_tokens: Token limit per piece
+
+        Returns:
+            The pieces, in order ([text] if it already fits)
+        """
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return [text]
+            return [self.encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+        max_chars = max_tokens * FALLBACK_CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return [text]
+        return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
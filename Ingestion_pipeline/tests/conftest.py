@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the pipeline the way main.py and the API do, from the Ingestion_pipeline directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
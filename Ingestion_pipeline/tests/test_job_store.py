@@ -0,0 +1,128 @@
+"""Leasing, heartbeats, requeueing and cancellation in the SQLite job store"""
+
+import pytest
+
+from pipeline.utils.job_store import SQLiteJobStore
+
+LEASE = 60.0
+# A lease that expired as soon as it was granted, standing in for a worker that stopped heartbeating
+EXPIRED = -1.0
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+def enqueue(store, job_id):
+    return store.enqueue(job_id, f"{job_id}.pdf", f"/uploads/{job_id}.pdf", False)
+
+def test_lease_takes_oldest_queued_job(store):
+    enqueue(store, "a")
+    enqueue(store, "b")
+
+    job = store.lease_next("worker-1", LEASE, max_attempts=3)
+
+    assert job['job_id'] == "a"
+    assert job['status'] == "processing"
+    assert job['lease_owner'] == "worker-1"
+    assert job['attempts'] == 1
+    assert store.lease_next("worker-2", LEASE, max_attempts=3)['job_id'] == "b"
+    assert store.lease_next("worker-3", LEASE, max_attempts=3) is None
+
+def test_queue_limit(store):
+    assert enqueue(store, "a") is not None
+    assert store.enqueue("b", "b.pdf", "/uploads/b.pdf", False, max_queued=1) is None
+    assert store.get_job("b") is None
+
+def test_heartbeat_renews_lease(store):
+    enqueue(store, "a")
+    enqueue(store, "b")
+    store.lease_next("worker-1", EXPIRED, max_attempts=3)
+
+    assert store.heartbeat(["a"], "worker-1", LEASE) == {"a": False}
+
+    # The renewed lease is no longer expired, so the next worker gets the next job
+    assert store.lease_next("worker-2", LEASE, max_attempts=3)['job_id'] == "b"
+    assert store.get_job("a")['lease_owner'] == "worker-1"
+
+def test_heartbeat_reports_only_own_leases(store):
+    enqueue(store, "a")
+    enqueue(store, "b")
+    store.lease_next("worker-1", LEASE, max_attempts=3)
+    store.lease_next("worker-2", LEASE, max_attempts=3)
+
+    assert store.heartbeat(["a", "b"], "worker-1", LEASE) == {"a": False}
+
+def test_heartbeat_reports_cancellation(store):
+    enqueue(store, "a")
+    store.lease_next("worker-1", LEASE, max_attempts=3)
+
+    assert store.request_cancel("a")['status'] == "cancelling"
+    assert store.heartbeat(["a"], "worker-1", LEASE) == {"a": True}
+
+def test_expired_lease_is_requeued_for_another_worker(store):
+    enqueue(store, "a")
+    store.lease_next("worker-1", EXPIRED, max_attempts=3)
+
+    job = store.lease_next("worker-2", LEASE, max_attempts=3)
+
+    assert job['job_id'] == "a"
+    assert job['lease_owner'] == "worker-2"
+    assert job['attempts'] == 2
+    # The stalled worker finds out it lost the job and cannot record an outcome
+    assert store.heartbeat(["a"], "worker-1", LEASE) == {}
+    assert not store.finish("a", "worker-1", "completed", "done", {'success': True})
+    assert store.finish("a", "worker-2", "completed", "done", {'success': True})
+    assert store.get_job("a")['result'] == {'success': True}
+
+def test_job_fails_after_max_attempts(store):
+    enqueue(store, "a")
+    store.lease_next("worker-1", EXPIRED, max_attempts=2)
+    store.lease_next("worker-2", EXPIRED, max_attempts=2)
+
+    assert store.lease_next("worker-3", LEASE, max_attempts=2) is None
+    job = store.get_job("a")
+    assert job['status'] == "failed"
+    assert job['attempts'] == 2
+    assert job['result']['success'] is False
+
+def test_expired_lease_with_cancellation_is_cancelled(store):
+    enqueue(store, "a")
+    store.lease_next("worker-1", EXPIRED, max_attempts=3)
+    store.request_cancel("a")
+
+    assert store.lease_next("worker-2", LEASE, max_attempts=3) is None
+    assert store.get_job("a")['status'] == "cancelled"
+
+def test_release_requeues_without_using_an_attempt(store):
+    enqueue(store, "a")
+    store.lease_next("worker-1", LEASE, max_attempts=3)
+
+    assert store.release("a", "worker-1")
+    job = store.get_job("a")
+    assert job['status'] == "queued"
+    assert job['attempts'] == 0
+    assert job['lease_owner'] is None
+
+def test_progress_only_from_lease_owner(store):
+    enqueue(store, "a")
+    store.lease_next("worker-1", LEASE, max_attempts=3)
+
+    store.update_progress("a", "worker-2", "embedding", "Embedding 10 chunks...")
+    assert store.get_job("a")['progress']['step'] == "processing"
+
+    store.update_progress("a", "worker-1", "embedding", "Embedding 10 chunks...")
+    assert store.get_job("a")['progress'] == {'step': "embedding", 'message': "Embedding 10 chunks..."}
+
+def test_stores_share_one_database(tmp_path):
+    # Two processes open the same file; each connection sees the other's leases
+    first = SQLiteJobStore(str(tmp_path / "jobs.db"))
+    second = SQLiteJobStore(str(tmp_path / "jobs.db"))
+    try:
+        enqueue(first, "a")
+        assert second.lease_next("worker-2", LEASE, max_attempts=3)['job_id'] == "a"
+        assert first.lease_next("worker-1", LEASE, max_attempts=3) is None
+    finally:
+        first.close()
+        second.close()
@@ -4,6 +4,8 @@ FastAPI server for RAG Retrieval System
 Provides REST API endpoints for search and question answering
 """
 
+import asyncio
+import json
 import logging
 import sys
 import time
@@ -16,10 +18,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 
-from core.rag_orchestrator import RAGOrchestrator
+from core.rag_orchestrator import AsyncRAGOrchestrator
 from config import config
 
 # Configure logging
@@ -168,6 +171,7 @@ class QuestionResponse(BaseModel):
     search_results_count: int
     context_length: Optional[int] = None
     search_type: str
+    cache_status: Optional[str] = None
 
 class HealthResponse(BaseModel):
     status: str
@@ -183,8 +187,8 @@ async def startup_event():
         # Validate configuration
         config.Config.validate_config()
         
-        # Initialize RAG orchestrator
-        rag_orchestrator = RAGOrchestrator()
+        # Initialize RAG orchestrator (async clients, at most MAX_CONCURRENT_REQUESTS pipelines at once)
+        rag_orchestrator = AsyncRAGOrchestrator()
         
         logger.info("RAG orchestrator initialized successfully")
         
@@ -192,12 +196,24 @@ async def startup_event():
         logger.error(f"Failed to initialize RAG orchestrator: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the async clients"""
+    if rag_orchestrator is not None:
+        await rag_orchestrator.close()
+
+async def _pipeline_statistics() -> Dict[str, Any]:
+    """Pipeline statistics (the document count is a blocking call, so it runs in a worker thread)"""
+    if rag_orchestrator is None:
+        return {}
+    return await asyncio.to_thread(rag_orchestrator.get_pipeline_statistics)
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Check system health and configuration"""
     try:
         # Get pipeline statistics
-        pipeline_stats = rag_orchestrator.get_pipeline_statistics() if rag_orchestrator else {}
+        pipeline_stats = await _pipeline_statistics()
         
         # Get configuration summary
         config_summary = config.Config.get_config_summary()
@@ -219,7 +235,7 @@ async def search_documents(request: SearchRequest):
         start_time = time.time()
         
         # Use RAG orchestrator for search-only
-        results = rag_orchestrator.search_only(
+        results = await rag_orchestrator.search_only(
             query=request.query,
             top_k=request.top_k or 5,
             search_type=request.search_type
@@ -243,7 +259,7 @@ async def ask_question(request: QuestionRequest):
     """Ask a question and get AI-generated answer (Complete RAG Pipeline)"""
     try:
         # Use RAG orchestrator for complete pipeline with sensible defaults
-        result = rag_orchestrator.ask(
+        result = await rag_orchestrator.ask(
             question=request.question,
             top_k=request.top_k,
             search_type=request.search_type,
@@ -259,18 +275,45 @@ async def ask_question(request: QuestionRequest):
             processing_time=result['processing_time'],
             search_results_count=len(result['sources']),
             context_length=result.get('context_length'),
-            search_type=result.get('search_type', 'hybrid')
+            search_type=result.get('search_type', 'hybrid'),
+            cache_status=result.get('steps', {}).get('cache', {}).get('status')
         )
         
     except Exception as e:
         logger.error(f"Question answering error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _sse_events(events):
+    """Format pipeline events as Server-Sent Events"""
+    async for event in events:
+        yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+@app.post("/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """Ask a question and stream the answer as Server-Sent Events
+    
+    Events: `sources` (after retrieval), `token` (answer fragments),
+    `done` (answer, token usage, timings incl. time_to_first_token) or `error`.
+    """
+    events = rag_orchestrator.ask_stream(
+        question=request.question,
+        top_k=request.top_k,
+        search_type=request.search_type,
+        context_length=request.context_length,
+        temperature=request.temperature,
+        max_tokens=request.max_tokens
+    )
+    return StreamingResponse(
+        _sse_events(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/statistics")
 async def get_statistics():
     """Get system statistics"""
     try:
-        pipeline_stats = rag_orchestrator.get_pipeline_statistics() if rag_orchestrator else {}
+        pipeline_stats = await _pipeline_statistics()
         
         return {
             "pipeline": pipeline_stats,
@@ -290,6 +333,7 @@ async def root():
         "description": "Ask questions and get intelligent answers based on your documents",
         "endpoints": {
             "ask_question": "/ask",
+            "ask_question_stream": "/ask/stream",
             "search_documents": "/search",
             "health_check": "/health",
             "statistics": "/statistics"
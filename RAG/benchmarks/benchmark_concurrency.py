@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Concurrency Benchmark
+Throughput of the blocking and async RAG pipelines under concurrent requests against a local fake endpoint
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_azure_openai import FakeAzureOpenAIServer
+
+def _build_local_index(index_dir: str, dimension: int):
+    """Index a handful of synthetic chunks so retrieval returns sources"""
+    import numpy as np
+    from core.backends import LocalVectorStore
+
+    rng = np.random.default_rng(0)
+    records = [{'id': f"bench_{i}", 'content': f"Benchmark chunk {i} about refunds and returns",
+                'filename': f"doc_{i % 5}.pdf", 'chunk_index': i, 'embedding': rng.standard_normal(dimension)}
+               for i in range(200)]
+    LocalVectorStore.build(index_dir, records).close()
+
+async def _run_blocking(orchestrator, requests: int, concurrency: int) -> float:
+    """Sync orchestrator called from coroutines, as the API did before: each call blocks the loop"""
+    async def worker(offset: int):
+        for i in range(offset, requests, concurrency):
+            orchestrator.ask(f"How do refunds work {i}?")
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    return time.perf_counter() - start
+
+async def _run_async(orchestrator, requests: int, concurrency: int) -> float:
+    """Async orchestrator: requests overlap while they wait on the endpoint"""
+    async def worker(offset: int):
+        for i in range(offset, requests, concurrency):
+            await orchestrator.ask(f"How do refunds work {i}?")
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RAG throughput under concurrent requests")
+    parser.add_argument("--requests", type=int, default=32, help="Questions per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Concurrent clients")
+    parser.add_argument("--latency", type=float, default=0.3, help="Simulated completion latency (seconds)")
+    args = parser.parse_args()
+
+    dimension = 64
+    with FakeAzureOpenAIServer(latency=args.latency, embedding_latency=0.05,
+                               embedding_dimension=dimension) as server, tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            'AZURE_OPENAI_API_KEY': 'fake',
+            'AZURE_OPENAI_ENDPOINT': server.endpoint,
+            'RETRIEVAL_BACKEND': 'local',
+            'LOCAL_INDEX_PATH': tmp,
+            'INDEX_GENERATION_PATH': os.path.join(tmp, 'index_generation.json')
+        })
+        _build_local_index(tmp, dimension)
+
+        from config.hyperparameters import RAGHyperparameters
+        RAGHyperparameters.CACHE_ENABLED = False  # every request goes to the endpoint
+        from core.rag_orchestrator import RAGOrchestrator, AsyncRAGOrchestrator
+
+        print(f"🚀 {args.requests} questions per level, {args.latency}s completion latency, "
+              f"MAX_CONCURRENT_REQUESTS={RAGHyperparameters.MAX_CONCURRENT_REQUESTS}")
+        print("=" * 60)
+        print(f"{'concurrency':>12} {'blocking req/s':>16} {'async req/s':>14}")
+
+        blocking = RAGOrchestrator()
+
+        async def run_levels():
+            orchestrator = AsyncRAGOrchestrator()
+            try:
+                for concurrency in args.concurrency:
+                    blocking_time = await _run_blocking(blocking, args.requests, concurrency)
+                    async_time = await _run_async(orchestrator, args.requests, concurrency)
+                    print(f"{concurrency:>12} {args.requests / blocking_time:>16.2f} {args.requests / async_time:>14.2f}")
+                print(f"\n   - Peak in-flight pipelines: {orchestrator.peak_in_flight}")
+            finally:
+                await orchestrator.close()
+
+        asyncio.run(run_levels())
+
+if __name__ == "__main__":
+    main()
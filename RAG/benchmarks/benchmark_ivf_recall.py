@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+IVF Recall Benchmark
+Measures recall@k and latency of the IVF index against exact search on clustered synthetic embeddings
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.backends import LocalVectorStore
+
+def _clustered_vectors(count: int, dimension: int, topics: int, seed: int) -> np.ndarray:
+    """Embeddings drawn around topic centres, like chunks from related documents"""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((topics, dimension), dtype=np.float32)
+    labels = rng.integers(0, topics, size=count)
+    return centres[labels] + 1.5 * rng.standard_normal((count, dimension), dtype=np.float32)
+
+def _records(vectors: np.ndarray):
+    for i, vector in enumerate(vectors):
+        yield {'id': f"bench_{i}", 'content': f"Synthetic chunk {i}", 'filename': "bench.pdf",
+               'chunk_index': i, 'embedding': vector}
+
+def _time_queries(search, queries, top_k):
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        rows, _ = search(query, top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(rows)
+    return results, latencies
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IVF recall@k against exact search")
+    parser.add_argument("--chunks", type=int, default=200000, help="Number of indexed chunks")
+    parser.add_argument("--dimension", type=int, default=256, help="Embedding dimension")
+    parser.add_argument("--topics", type=int, default=2000, help="Synthetic topic clusters")
+    parser.add_argument("--queries", type=int, default=100, help="Number of timed queries")
+    parser.add_argument("--top-k", type=int, default=10, help="k for recall@k")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64], help="nprobe values to sweep")
+    args = parser.parse_args()
+
+    vectors = _clustered_vectors(args.chunks + args.queries, args.dimension, args.topics, seed=0)
+    queries = vectors[args.chunks:]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"🔨 Building index: {args.chunks} chunks, dimension {args.dimension}")
+        start = time.perf_counter()
+        store = LocalVectorStore.build(tmp, _records(vectors[:args.chunks]), index_type="ivf")
+        print(f"   - Build + IVF training: {time.perf_counter() - start:.2f}s ({store.ivf.nlist} lists)")
+
+        exact, exact_latencies = _time_queries(store.exact_search, queries, args.top_k)
+
+        print("=" * 60)
+        print(f"   - Exact:       recall@{args.top_k} 1.000, p50 {np.percentile(exact_latencies, 50):.2f}ms, "
+              f"p99 {np.percentile(exact_latencies, 99):.2f}ms")
+        for nprobe in args.nprobe:
+            search = lambda query, top_k: store.approximate_search(query, top_k, nprobe)
+            approximate, latencies = _time_queries(search, queries, args.top_k)
+            recall = np.mean([len(np.intersect1d(a, e)) / len(e) for a, e in zip(approximate, exact)])
+            print(f"   - nprobe={nprobe:<4} recall@{args.top_k} {recall:.3f}, p50 {np.percentile(latencies, 50):.2f}ms, "
+                  f"p99 {np.percentile(latencies, 99):.2f}ms")
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Local Vector Store Benchmark
+Measures brute-force top-k latency of the local retrieval backend on synthetic embeddings
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.backends import LocalVectorStore
+
+def _records(count: int, dimension: int, seed: int):
+    """Generate synthetic chunk records"""
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        yield {
+            'id': f"bench_{i}",
+            'content': f"Synthetic chunk {i}",
+            'filename': f"doc_{i // 100}.pdf",
+            'chunk_index': i % 100,
+            'embedding': rng.standard_normal(dimension, dtype=np.float32)
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local brute-force vector search")
+    parser.add_argument("--chunks", type=int, default=100000, help="Number of indexed chunks")
+    parser.add_argument("--dimension", type=int, default=1536, help="Embedding dimension")
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32", help="Stored vector precision")
+    parser.add_argument("--queries", type=int, default=50, help="Number of timed queries")
+    parser.add_argument("--top-k", type=int, default=5, help="Results per query")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"🔨 Building index: {args.chunks} chunks, dimension {args.dimension}, {args.dtype}")
+        start = time.perf_counter()
+        store = LocalVectorStore.build(tmp, _records(args.chunks, args.dimension, seed=0), args.dtype)
+        print(f"   - Build time: {time.perf_counter() - start:.2f}s")
+
+        queries = np.random.default_rng(1).standard_normal((args.queries, args.dimension), dtype=np.float32)
+        store.vector_search(queries[0], args.top_k)  # warm the page cache
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            store.vector_search(query, args.top_k)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        print("=" * 60)
+        print(f"   - Mean latency: {np.mean(latencies):.2f}ms")
+        print(f"   - p50 latency:  {np.percentile(latencies, 50):.2f}ms")
+        print(f"   - p95 latency:  {np.percentile(latencies, 95):.2f}ms")
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Streaming Benchmark
+Compares time-to-first-token of /ask/stream with the full latency of /ask against a local fake endpoint
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_azure_openai import FakeAzureOpenAIServer
+
+def _build_local_index(index_dir: str, dimension: int):
+    """Index a handful of synthetic chunks so retrieval returns sources"""
+    import numpy as np
+    from core.backends import LocalVectorStore
+
+    rng = np.random.default_rng(0)
+    records = [{'id': f"bench_{i}", 'content': f"Benchmark chunk {i} about refunds and returns",
+                'filename': f"doc_{i % 5}.pdf", 'chunk_index': i, 'embedding': rng.standard_normal(dimension)}
+               for i in range(200)]
+    LocalVectorStore.build(index_dir, records).close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streamed vs blocking answers")
+    parser.add_argument("--questions", type=int, default=10, help="Questions per mode")
+    parser.add_argument("--first-token-latency", type=float, default=0.4, help="Simulated time to first token (seconds)")
+    parser.add_argument("--token-interval", type=float, default=0.02, help="Simulated seconds per token")
+    parser.add_argument("--answer-tokens", type=int, default=150, help="Tokens per answer")
+    args = parser.parse_args()
+
+    dimension = 64
+    with FakeAzureOpenAIServer(latency=args.first_token_latency, embedding_latency=0.02,
+                               embedding_dimension=dimension, token_interval=args.token_interval,
+                               answer_tokens=args.answer_tokens) as server, tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            'AZURE_OPENAI_API_KEY': 'fake',
+            'AZURE_OPENAI_ENDPOINT': server.endpoint,
+            'RETRIEVAL_BACKEND': 'local',
+            'LOCAL_INDEX_PATH': tmp,
+            'INDEX_GENERATION_PATH': os.path.join(tmp, 'index_generation.json')
+        })
+        _build_local_index(tmp, dimension)
+
+        import httpx
+        import socket
+        import threading
+        import uvicorn
+        from config.hyperparameters import RAGHyperparameters
+        RAGHyperparameters.CACHE_ENABLED = False  # measure generation, not cache hits
+        from api.rag_api import app
+
+        # A real server is needed: the test client buffers the whole streamed body
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        api_server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        threading.Thread(target=api_server.run, daemon=True).start()
+        while not api_server.started:
+            time.sleep(0.05)
+
+        print(f"🚀 {args.questions} questions, first token after {args.first_token_latency}s, "
+              f"{args.answer_tokens} tokens at {args.token_interval}s/token")
+        print("=" * 60)
+
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            blocking = []
+            for i in range(args.questions):
+                start = time.perf_counter()
+                client.post("/ask", json={"question": f"How do refunds work {i}?", "max_tokens": 1000})
+                blocking.append(time.perf_counter() - start)
+
+            first_tokens = []
+            streamed = []
+            for i in range(args.questions):
+                start = time.perf_counter()
+                first_token = None
+                with client.stream("POST", "/ask/stream", json={"question": f"How do refunds work {i}?", "max_tokens": 1000}) as response:
+                    for line in response.iter_lines():
+                        if first_token is None and line.startswith("event: token"):
+                            first_token = time.perf_counter() - start
+                        if line.startswith("data:") and '"type": "done"' in line:
+                            done = json.loads(line[len("data:"):])
+                streamed.append(time.perf_counter() - start)
+                first_tokens.append(first_token or 0.0)
+
+        api_server.should_exit = True
+
+        print(f"   - /ask full latency:             {sum(blocking) / len(blocking):.3f}s")
+        print(f"   - /ask/stream time to first token: {sum(first_tokens) / len(first_tokens):.3f}s")
+        print(f"   - /ask/stream full latency:       {sum(streamed) / len(streamed):.3f}s")
+        print(f"   - Server-reported TTFT (last):    {done['timings']['time_to_first_token']:.3f}s")
+        print(f"   - Usage (last): {done['usage']}")
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,15 @@ class Config:
     AZURE_SEARCH_KEY = os.getenv('AZURE_SEARCH_KEY')
     AZURE_SEARCH_INDEX_NAME = os.getenv('AZURE_SEARCH_INDEX_NAME', 'documents-index')
     
+    # Retrieval Backend Configuration ("azure" or "local")
+    RETRIEVAL_BACKEND = os.getenv('RETRIEVAL_BACKEND', 'azure')
+    LOCAL_INDEX_PATH = os.getenv('LOCAL_INDEX_PATH', 'local_index')
+    # Ingestion chunk records; new records are added to the local index when it is opened
+    CHUNK_RECORDS_PATH = os.getenv('CHUNK_RECORDS_PATH')
+    
+    # Index generation counter shared by ingestion and RAG (invalidates cached answers)
+    INDEX_GENERATION_PATH = os.getenv('INDEX_GENERATION_PATH', 'cache/index_generation.json')
+    
     # Azure Blob Storage Configuration
     AZURE_STORAGE_CONNECTION_STRING = os.getenv('AZURE_STORAGE_CONNECTION_STRING')
     AZURE_STORAGE_CONTAINER_NAME = os.getenv('AZURE_STORAGE_CONTAINER_NAME', 'knowledgebase')
@@ -64,10 +73,10 @@ class Config:
         required_vars = [
             'AZURE_OPENAI_API_KEY',
             'AZURE_OPENAI_ENDPOINT',
-            'GPT4_DEPLOYMENT_NAME',
-            'AZURE_SEARCH_ENDPOINT',
-            'AZURE_SEARCH_KEY'
+            'GPT4_DEPLOYMENT_NAME'
         ]
+        if cls.RETRIEVAL_BACKEND == 'azure':
+            required_vars += ['AZURE_SEARCH_ENDPOINT', 'AZURE_SEARCH_KEY']
         
         missing_vars = []
         for var in required_vars:
@@ -89,6 +98,7 @@ class Config:
             'embedding_model': cls.EMBEDDING_MODEL,
             'embedding_deployment': cls.EMBEDDING_DEPLOYMENT_NAME,
             'azure_search_configured': bool(cls.AZURE_SEARCH_ENDPOINT and cls.AZURE_SEARCH_KEY),
+            'retrieval_backend': cls.RETRIEVAL_BACKEND,
             'azure_storage_configured': bool(cls.AZURE_STORAGE_CONNECTION_STRING),
             'rag_chunk_size': cls.RAG_CHUNK_SIZE,
             'rag_overlap': cls.RAG_OVERLAP,
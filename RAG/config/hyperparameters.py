@@ -15,6 +15,21 @@ class RAGHyperparameters:
     MIN_SIMILARITY_SCORE = 0.7           # Minimum similarity score threshold
     SEARCH_TIMEOUT = 30                  # Search timeout in seconds
     EMBEDDING_BATCH_SIZE = 1             # Batch size for query embeddings
+    VECTOR_FIELD_NAME = "content_vector" # Index field holding chunk embeddings
+    
+    # ============================================================================
+    # LOCAL VECTOR INDEX PARAMETERS
+    # ============================================================================
+    LOCAL_INDEX_DTYPE = "float32"        # Stored vector precision ("float32" or "float16")
+    LOCAL_SEARCH_BATCH_ROWS = 8192       # Rows scored per matrix multiply during brute-force search
+    HYBRID_RRF_K = 60                    # Reciprocal rank fusion constant for local hybrid search
+    LOCAL_INDEX_TYPE = "flat"            # "flat" (exact brute force) or "ivf" (approximate)
+    IVF_NLIST = 1024                     # IVF lists (k-means centroids); roughly 4*sqrt(chunks)
+    IVF_NPROBE = 32                      # Lists scanned per query; higher = better recall, slower
+    IVF_TRAINING_SAMPLE = 50000          # Vectors sampled to train the centroids
+    IVF_TRAINING_ITERATIONS = 10         # k-means iterations
+    IVF_MIN_TRAIN_ROWS = 10000           # Below this the index stays exact
+    IVF_RETRAIN_GROWTH = 2.0             # Retrain on sync once the index outgrows its training set by this factor
     
     # ============================================================================
     # AUGMENTATION PARAMETERS
@@ -35,6 +50,7 @@ class RAGHyperparameters:
     TOP_P = 0.9                          # Top-p sampling parameter
     FREQUENCY_PENALTY = 0.0              # Frequency penalty
     PRESENCE_PENALTY = 0.0               # Presence penalty
+    STREAM_INCLUDE_USAGE = True          # Request token usage at the end of streamed completions
     
     # ============================================================================
     # CONFIDENCE CALCULATION PARAMETERS
@@ -60,6 +76,15 @@ class RAGHyperparameters:
     MAX_PROCESSING_TIME = 60             # Maximum processing time in seconds
     CACHE_ENABLED = True                 # Enable response caching
     CACHE_TTL = 3600                     # Cache TTL in seconds
+    CACHE_PERSIST = False                # Persist caches across restarts
+    CACHE_PATH = "cache/rag_cache.sqlite" # SQLite file for persisted caches
+    EMBEDDING_CACHE_MAX_ENTRIES = 10000  # Query embeddings kept in memory (LRU)
+    ANSWER_CACHE_ENABLED = True          # Cache complete answers from RAGOrchestrator.ask
+    ANSWER_CACHE_MAX_ENTRIES = 1000      # Answers kept in memory (LRU)
+    ANSWER_CACHE_MAX_TEMPERATURE = 0.2   # Only answers generated at or below this temperature are cached
+    SEMANTIC_CACHE_ENABLED = True        # Reuse answers for paraphrased questions
+    SEMANTIC_CACHE_THRESHOLD = 0.95      # Minimum question cosine similarity for a semantic hit
+    SEMANTIC_CACHE_MAX_ENTRIES = 2000    # Question vectors kept in the semantic cache matrix
     MAX_CONCURRENT_REQUESTS = 10         # Maximum concurrent requests
     
     # ============================================================================
@@ -73,9 +98,21 @@ class RAGHyperparameters:
     # ============================================================================
     # ERROR HANDLING PARAMETERS
     # ============================================================================
-    MAX_RETRIES = 3                      # Maximum retry attempts
-    RETRY_DELAY = 1.0                    # Delay between retries in seconds
+    MAX_RETRIES = 3                      # Retries of throttled (429) or transient (5xx, timeout) Azure OpenAI calls
+    RETRY_DELAY = 1.0                    # Backoff before the first retry in seconds (jittered)
     BACKOFF_MULTIPLIER = 2.0             # Exponential backoff multiplier
+    RETRY_MAX_DELAY = 20.0               # Longest backoff in seconds; a longer Retry-After is still honored
+    CIRCUIT_FAILURE_THRESHOLD = 5        # Consecutive transient failures that stop calls to a deployment
+    CIRCUIT_RESET_SECONDS = 30.0         # Seconds before a stopped deployment gets a trial call
+    
+    # ============================================================================
+    # AZURE OPENAI RATE LIMITS
+    # ============================================================================
+    EMBEDDING_REQUESTS_PER_MINUTE = 600  # This service's share of the embedding deployment's RPM
+    EMBEDDING_TOKENS_PER_MINUTE = 60000  # This service's share of the embedding deployment's TPM
+    GENERATION_REQUESTS_PER_MINUTE = 300 # This service's share of the chat deployment's RPM
+    GENERATION_TOKENS_PER_MINUTE = 150000  # This service's share of the chat deployment's TPM
+    CHARS_PER_TOKEN = 4                  # Characters per token when estimating a request's tokens
     
     # ============================================================================
     # EXPERIMENTATION PARAMETERS
@@ -103,7 +140,24 @@ class RAGHyperparameters:
             'max_top_k': cls.MAX_TOP_K,
             'min_similarity_score': cls.MIN_SIMILARITY_SCORE,
             'search_timeout': cls.SEARCH_TIMEOUT,
-            'embedding_batch_size': cls.EMBEDDING_BATCH_SIZE
+            'embedding_batch_size': cls.EMBEDDING_BATCH_SIZE,
+            'vector_field_name': cls.VECTOR_FIELD_NAME
+        }
+    
+    @classmethod
+    def get_local_index_config(cls):
+        """Get local vector index configuration"""
+        return {
+            'local_index_dtype': cls.LOCAL_INDEX_DTYPE,
+            'local_search_batch_rows': cls.LOCAL_SEARCH_BATCH_ROWS,
+            'hybrid_rrf_k': cls.HYBRID_RRF_K,
+            'local_index_type': cls.LOCAL_INDEX_TYPE,
+            'ivf_nlist': cls.IVF_NLIST,
+            'ivf_nprobe': cls.IVF_NPROBE,
+            'ivf_training_sample': cls.IVF_TRAINING_SAMPLE,
+            'ivf_training_iterations': cls.IVF_TRAINING_ITERATIONS,
+            'ivf_min_train_rows': cls.IVF_MIN_TRAIN_ROWS,
+            'ivf_retrain_growth': cls.IVF_RETRAIN_GROWTH
         }
     
     @classmethod
@@ -127,7 +181,8 @@ class RAGHyperparameters:
             'min_max_tokens': cls.MIN_MAX_TOKENS,
             'top_p': cls.TOP_P,
             'frequency_penalty': cls.FREQUENCY_PENALTY,
-            'presence_penalty': cls.PRESENCE_PENALTY
+            'presence_penalty': cls.PRESENCE_PENALTY,
+            'stream_include_usage': cls.STREAM_INCLUDE_USAGE
         }
     
     @classmethod
@@ -159,6 +214,15 @@ class RAGHyperparameters:
             'max_processing_time': cls.MAX_PROCESSING_TIME,
             'cache_enabled': cls.CACHE_ENABLED,
             'cache_ttl': cls.CACHE_TTL,
+            'cache_persist': cls.CACHE_PERSIST,
+            'cache_path': cls.CACHE_PATH,
+            'embedding_cache_max_entries': cls.EMBEDDING_CACHE_MAX_ENTRIES,
+            'answer_cache_enabled': cls.ANSWER_CACHE_ENABLED,
+            'answer_cache_max_entries': cls.ANSWER_CACHE_MAX_ENTRIES,
+            'answer_cache_max_temperature': cls.ANSWER_CACHE_MAX_TEMPERATURE,
+            'semantic_cache_enabled': cls.SEMANTIC_CACHE_ENABLED,
+            'semantic_cache_threshold': cls.SEMANTIC_CACHE_THRESHOLD,
+            'semantic_cache_max_entries': cls.SEMANTIC_CACHE_MAX_ENTRIES,
             'max_concurrent_requests': cls.MAX_CONCURRENT_REQUESTS
         }
     
@@ -178,7 +242,21 @@ class RAGHyperparameters:
         return {
             'max_retries': cls.MAX_RETRIES,
             'retry_delay': cls.RETRY_DELAY,
-            'backoff_multiplier': cls.BACKOFF_MULTIPLIER
+            'backoff_multiplier': cls.BACKOFF_MULTIPLIER,
+            'retry_max_delay': cls.RETRY_MAX_DELAY,
+            'circuit_failure_threshold': cls.CIRCUIT_FAILURE_THRESHOLD,
+            'circuit_reset_seconds': cls.CIRCUIT_RESET_SECONDS
+        }
+    
+    @classmethod
+    def get_rate_limit_config(cls):
+        """Get Azure OpenAI rate limit configuration"""
+        return {
+            'embedding_requests_per_minute': cls.EMBEDDING_REQUESTS_PER_MINUTE,
+            'embedding_tokens_per_minute': cls.EMBEDDING_TOKENS_PER_MINUTE,
+            'generation_requests_per_minute': cls.GENERATION_REQUESTS_PER_MINUTE,
+            'generation_tokens_per_minute': cls.GENERATION_TOKENS_PER_MINUTE,
+            'chars_per_token': cls.CHARS_PER_TOKEN
         }
     
     @classmethod
@@ -208,6 +286,7 @@ class RAGHyperparameters:
         """Get all hyperparameters as a dictionary"""
         return {
             'retrieval': cls.get_retrieval_config(),
+            'local_index': cls.get_local_index_config(),
             'augmentation': cls.get_augmentation_config(),
             'generation': cls.get_generation_config(),
             'confidence': cls.get_confidence_config(),
@@ -215,6 +294,7 @@ class RAGHyperparameters:
             'performance': cls.get_performance_config(),
             'validation': cls.get_validation_config(),
             'error_handling': cls.get_error_handling_config(),
+            'rate_limits': cls.get_rate_limit_config(),
             'experimental': cls.get_experimental_config(),
             'advanced': cls.get_advanced_config()
         } 
\ No newline at end of file
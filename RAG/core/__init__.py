@@ -4,14 +4,17 @@ Core RAG Components Package
 Contains the three main RAG steps: Retrieval, Augmentation, Generation
 """
 
-from .retrieval import RetrievalComponent
+from .retrieval import RetrievalComponent, AsyncRetrievalComponent
 from .augmentation import AugmentationComponent
-from .generation import GenerationComponent
-from .rag_orchestrator import RAGOrchestrator
+from .generation import GenerationComponent, AsyncGenerationComponent
+from .rag_orchestrator import RAGOrchestrator, AsyncRAGOrchestrator
 
 __all__ = [
     'RetrievalComponent',
     'AugmentationComponent', 
     'GenerationComponent',
-    'RAGOrchestrator'
+    'RAGOrchestrator',
+    'AsyncRetrievalComponent',
+    'AsyncGenerationComponent',
+    'AsyncRAGOrchestrator'
 ] 
\ No newline at end of file
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Retrieval Backends Package
+Search stores the retrieval component can run against
+"""
+
+from pathlib import Path
+
+from config import config
+
+from ..index_generation import IndexGenerationReader
+from .base import SearchBackend
+from .azure_search import AzureSearchBackend
+from .ivf_index import IVFIndex
+from .local_vector_store import LocalVectorStore, MANIFEST_FILE
+
+def create_backend(backend: str = None) -> SearchBackend:
+    """
+    Create the configured retrieval backend
+
+    Args:
+        backend: Backend name ("azure" or "local"), defaults to RETRIEVAL_BACKEND
+
+    Returns:
+        The search backend
+    """
+    backend = backend or config.Config.RETRIEVAL_BACKEND
+    if backend == "local":
+        index_path = Path(config.Config.LOCAL_INDEX_PATH)
+        if config.Config.CHUNK_RECORDS_PATH and not (index_path / MANIFEST_FILE).exists():
+            store = LocalVectorStore.create(str(index_path))
+        else:
+            store = LocalVectorStore(str(index_path))
+        if config.Config.CHUNK_RECORDS_PATH:
+            # Chunks ingested while the service runs are synced when the index generation moves
+            store.follow_records(config.Config.CHUNK_RECORDS_PATH,
+                                 IndexGenerationReader(config.Config.INDEX_GENERATION_PATH))
+        return store
+    if backend == "azure":
+        return AzureSearchBackend()
+    raise ValueError(f"Unknown retrieval backend: {backend}")
+
+__all__ = [
+    'SearchBackend',
+    'AzureSearchBackend',
+    'IVFIndex',
+    'LocalVectorStore',
+    'create_backend'
+]
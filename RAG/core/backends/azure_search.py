@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Azure AI Search Backend
+Keyword, vector and hybrid search against an Azure AI Search index
+"""
+
+import logging
+from typing import List, Dict, Any
+from azure.core.credentials import AzureKeyCredential
+from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient as AsyncSearchClient
+from azure.search.documents.models import QueryType, VectorizedQuery
+from config import config
+from config.hyperparameters import RAGHyperparameters
+
+from .base import SearchBackend, RESULT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+class AzureSearchBackend(SearchBackend):
+    """Search backend for an Azure AI Search index"""
+
+    name = "azure"
+
+    def __init__(self):
+        """Initialize the Azure Search client"""
+        self.index_name = config.Config.AZURE_SEARCH_INDEX_NAME
+        self.search_client = SearchClient(
+            endpoint=config.Config.AZURE_SEARCH_ENDPOINT,
+            index_name=self.index_name,
+            credential=AzureKeyCredential(config.Config.AZURE_SEARCH_KEY)
+        )
+        self._async_search_client = None
+
+    @property
+    def async_search_client(self) -> AsyncSearchClient:
+        """Async client, created on first use so it binds to the running event loop"""
+        if self._async_search_client is None:
+            self._async_search_client = AsyncSearchClient(
+                endpoint=config.Config.AZURE_SEARCH_ENDPOINT,
+                index_name=self.index_name,
+                credential=AzureKeyCredential(config.Config.AZURE_SEARCH_KEY)
+            )
+        return self._async_search_client
+
+    def keyword_search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Keyword-based search"""
+        search_results = self.search_client.search(
+            search_text=query,
+            select=RESULT_FIELDS,
+            top=top_k,
+            query_type=QueryType.SIMPLE
+        )
+        return self._process_search_results(search_results)
+
+    def vector_search(self, embedding: List[float], top_k: int) -> List[Dict[str, Any]]:
+        """Pure vector search"""
+        search_results = self.search_client.search(
+            search_text=None,
+            vector_queries=[self._vector_query(embedding, top_k)],
+            select=RESULT_FIELDS,
+            top=top_k
+        )
+        return self._process_search_results(search_results)
+
+    def hybrid_search(self, query: str, embedding: List[float], top_k: int) -> List[Dict[str, Any]]:
+        """Keyword and vector queries in one request; the service fuses the rankings"""
+        search_results = self.search_client.search(
+            search_text=query,
+            vector_queries=[self._vector_query(embedding, top_k)],
+            select=RESULT_FIELDS,
+            top=top_k,
+            query_type=QueryType.SIMPLE
+        )
+        return self._process_search_results(search_results)
+
+    async def keyword_search_async(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Keyword-based search without blocking the event loop"""
+        search_results = await self.async_search_client.search(
+            search_text=query,
+            select=RESULT_FIELDS,
+            top=top_k,
+            query_type=QueryType.SIMPLE
+        )
+        return await self._process_search_results_async(search_results)
+
+    async def vector_search_async(self, embedding: List[float], top_k: int) -> List[Dict[str, Any]]:
+        """Pure vector search without blocking the event loop"""
+        search_results = await self.async_search_client.search(
+            search_text=None,
+            vector_queries=[self._vector_query(embedding, top_k)],
+            select=RESULT_FIELDS,
+            top=top_k
+        )
+        return await self._process_search_results_async(search_results)
+
+    async def hybrid_search_async(self, query: str, embedding: List[float], top_k: int) -> List[Dict[str, Any]]:
+        """Hybrid search without blocking the event loop"""
+        search_results = await self.async_search_client.search(
+            search_text=query,
+            vector_queries=[self._vector_query(embedding, top_k)],
+            select=RESULT_FIELDS,
+            top=top_k,
+            query_type=QueryType.SIMPLE
+        )
+        return await self._process_search_results_async(search_results)
+
+    async def close_async(self):
+        """Close the async client"""
+        if self._async_search_client is not None:
+            await self._async_search_client.close()
+            self._async_search_client = None
+
+    def _vector_query(self, embedding: List[float], top_k: int) -> VectorizedQuery:
+        """Build a k-nearest-neighbour query against the content vector field"""
+        return VectorizedQuery(
+            vector=embedding,
+            k_nearest_neighbors=top_k,
+            fields=RAGHyperparameters.VECTOR_FIELD_NAME
+        )
+
+    def _process_search_results(self, search_results) -> List[Dict[str, Any]]:
+        """Process search results into standardized format"""
+        return [self.format_result(result, result.get('@search.score', 0.0)) for result in search_results]
+
+    async def _process_search_results_async(self, search_results) -> List[Dict[str, Any]]:
+        """Process async search results into standardized format"""
+        return [self.format_result(result, result.get('@search.score', 0.0)) async for result in search_results]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        return {
+            'total_documents': self.search_client.get_document_count(),
+            'search_service': 'Azure AI Search',
+            'index_name': self.index_name
+        }
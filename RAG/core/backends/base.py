@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Search Backend Interface
+Common interface for the stores the retrieval component can search
+"""
+
+import asyncio
+from typing import List, Dict, Any
+
+# Fields returned for every search result
+RESULT_FIELDS = ["id", "content", "filename", "chunk_index", "page_number", "chunk_type", "tags", "upload_date"]
+
+class SearchBackend:
+    """Base class for retrieval backends"""
+
+    name = "base"
+
+    def keyword_search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """
+        Full-text search
+
+        Args:
+            query: The search query
+            top_k: Number of results to return
+
+        Returns:
+            Results in the standard retrieval format, best first
+        """
+        raise NotImplementedError
+
+    def vector_search(self, embedding: List[float], top_k: int) -> List[Dict[str, Any]]:
+        """
+        Nearest-neighbour search over chunk embeddings
+
+        Args:
+            embedding: Query embedding
+            top_k: Number of results to return
+
+        Returns:
+            Results in the standard retrieval format, best first
+        """
+        raise NotImplementedError
+
+    def hybrid_search(self, query: str, embedding: List[float], top_k: int) -> List[Dict[str, Any]]:
+        """
+        Combined keyword and vector search
+
+        Args:
+            query: The search query
+            embedding: Query embedding
+            top_k: Number of results to return
+
+        Returns:
+            Results in the standard retrieval format, best first
+        """
+        raise NotImplementedError
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get backend statistics"""
+        raise NotImplementedError
+
+    def refresh(self) -> int:
+        """
+        Pick up chunks ingested since the backend was opened (called before every retrieval)
+
+        Returns:
+            Number of records added; remote backends are always current and add none
+        """
+        return 0
+
+    # Async variants; backends without a native async client run the blocking call in a worker thread
+
+    async def keyword_search_async(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Async keyword_search"""
+        return await asyncio.to_thread(self.keyword_search, query, top_k)
+
+    async def vector_search_async(self, embedding: List[float], top_k: int) -> List[Dict[str, Any]]:
+        """Async vector_search"""
+        return await asyncio.to_thread(self.vector_search, embedding, top_k)
+
+    async def hybrid_search_async(self, query: str, embedding: List[float], top_k: int) -> List[Dict[str, Any]]:
+        """Async hybrid_search"""
+        return await asyncio.to_thread(self.hybrid_search, query, embedding, top_k)
+
+    async def refresh_async(self) -> int:
+        """Async refresh"""
+        return await asyncio.to_thread(self.refresh)
+
+    async def close_async(self):
+        """Release async clients"""
+
+    @staticmethod
+    def format_result(document: Dict[str, Any], score: float) -> Dict[str, Any]:
+        """Convert a stored document into the standard retrieval format"""
+        return {
+            'content': document.get('content', ''),
+            'filename': document.get('filename', ''),
+            'chunk_index': document.get('chunk_index', 0),
+            'page_number': document.get('page_number', 0),
+            'chunk_type': document.get('chunk_type', 'text'),
+            'tags': document.get('tags', []),
+            'upload_date': document.get('upload_date', ''),
+            'score': score
+        }
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+IVF Index
+Inverted-file approximate nearest neighbour index with a spherical k-means coarse quantizer
+"""
+
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CENTROIDS_FILE = "ivf_centroids.npy"
+ASSIGNMENTS_FILE = "ivf_assignments.bin"
+
+# k-means needs enough points per centroid to place it meaningfully
+MIN_POINTS_PER_LIST = 39
+
+class IVFIndex:
+    """Partitions normalized vectors into lists around k-means centroids"""
+
+    def __init__(self, centroids: np.ndarray, assignments: np.ndarray):
+        """
+        Initialize the index
+
+        Args:
+            centroids: (nlist, dimension) normalized centroid matrix
+            assignments: List id of every indexed row
+        """
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.trained_rows = len(assignments)
+        self.lists = self._build_lists(np.asarray(assignments, dtype=np.int32))
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def size(self) -> int:
+        return sum(len(rows) for rows in self.lists)
+
+    def _build_lists(self, assignments: np.ndarray) -> List[np.ndarray]:
+        """Group row ids by list"""
+        order = np.argsort(assignments, kind='stable').astype(np.int64)
+        counts = np.bincount(assignments, minlength=self.nlist)
+        return np.split(order, np.cumsum(counts)[:-1])
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, nlist: int, sample_size: int, iterations: int,
+              batch_rows: int, seed: int = 0) -> "IVFIndex":
+        """
+        Train centroids on a sample and assign every row
+
+        Args:
+            vectors: (rows, dimension) normalized vector matrix (may be memory-mapped)
+            nlist: Requested number of lists (capped by the sample size)
+            sample_size: Rows sampled for k-means
+            iterations: k-means iterations
+            batch_rows: Rows scored per matrix multiply
+            seed: Random seed
+
+        Returns:
+            The trained index
+        """
+        rng = np.random.default_rng(seed)
+        total = len(vectors)
+        sample_rows = np.sort(rng.choice(total, size=min(sample_size, total), replace=False))
+        sample = np.asarray(vectors[sample_rows], dtype=np.float32)
+        nlist = max(1, min(nlist, len(sample) // MIN_POINTS_PER_LIST))
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = cls._nearest(sample, centroids, batch_rows)
+            counts = np.bincount(labels, minlength=nlist)
+            sums = np.zeros_like(centroids)
+            filled = np.flatnonzero(counts)
+            starts = (np.cumsum(counts) - counts)[filled]
+            sums[filled] = np.add.reduceat(sample[np.argsort(labels, kind='stable')], starts, axis=0)
+
+            # Re-seed empty lists from random sample points
+            empty = np.flatnonzero(counts == 0)
+            if len(empty):
+                sums[empty] = sample[rng.choice(len(sample), size=len(empty), replace=False)]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.maximum(norms, 1e-12)
+
+        index = cls(centroids, np.empty(0, dtype=np.int32))
+        assignments = np.concatenate([
+            index.assign(vectors[start:start + batch_rows], batch_rows)
+            for start in range(0, total, batch_rows)
+        ])
+        index.trained_rows = total
+        index.lists = index._build_lists(assignments)
+        logger.info(f"Trained IVF index: {nlist} lists over {total} rows ({len(sample)} sampled)")
+        return index
+
+    @staticmethod
+    def _nearest(vectors: np.ndarray, centroids: np.ndarray, batch_rows: int) -> np.ndarray:
+        """Index of the most similar centroid for each row"""
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), batch_rows):
+            block = np.asarray(vectors[start:start + batch_rows], dtype=np.float32)
+            labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return labels
+
+    def assign(self, vectors: np.ndarray, batch_rows: int) -> np.ndarray:
+        """
+        Find the list for each vector
+
+        Args:
+            vectors: Normalized vectors
+            batch_rows: Rows scored per matrix multiply
+
+        Returns:
+            List id per vector
+        """
+        return self._nearest(vectors, self.centroids, batch_rows)
+
+    def add(self, labels: np.ndarray, start_row: int):
+        """
+        Add newly appended rows to their lists
+
+        Args:
+            labels: List id per new row
+            start_row: Row id of the first new row
+        """
+        rows = np.arange(start_row, start_row + len(labels), dtype=np.int64)
+        for label in np.unique(labels):
+            self.lists[label] = np.concatenate([self.lists[label], rows[labels == label]])
+
+    def probe(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """
+        Candidate rows for a query
+
+        Args:
+            query: Normalized query vector
+            nprobe: Number of closest lists to scan
+
+        Returns:
+            Sorted row ids from the probed lists
+        """
+        scores = self.centroids @ query
+        nprobe = min(nprobe, self.nlist)
+        probed = np.argpartition(-scores, nprobe - 1)[:nprobe]
+        rows = np.concatenate([self.lists[i] for i in probed])
+        rows.sort()
+        return rows
+
+    def save(self, index_path: Path):
+        """Write centroids and all row assignments"""
+        np.save(index_path / CENTROIDS_FILE, self.centroids)
+        assignments = np.empty(self.size, dtype=np.int32)
+        for label, rows in enumerate(self.lists):
+            assignments[rows] = label
+        assignments.tofile(index_path / ASSIGNMENTS_FILE)
+
+    @staticmethod
+    def append_assignments(index_path: Path, labels: np.ndarray):
+        """Append assignments for newly added rows"""
+        with open(index_path / ASSIGNMENTS_FILE, 'ab') as f:
+            f.write(np.asarray(labels, dtype=np.int32).tobytes())
+
+    @classmethod
+    def load(cls, index_path: Path, trained_rows: int) -> Optional["IVFIndex"]:
+        """
+        Load a saved index
+
+        Args:
+            index_path: Index directory
+            trained_rows: Rows the centroids were trained on (from the manifest)
+
+        Returns:
+            The index, or None if none has been trained
+        """
+        if not (index_path / CENTROIDS_FILE).exists():
+            return None
+        index = cls(np.load(index_path / CENTROIDS_FILE), np.fromfile(index_path / ASSIGNMENTS_FILE, dtype=np.int32))
+        index.trained_rows = trained_rows
+        return index
@@ -0,0 +1,763 @@
+#!/usr/bin/env python3
+"""
+Local Vector Store
+In-process search over a memory-mapped NumPy embedding matrix with a JSONL metadata sidecar
+
+Rows are append-only: an updated or deleted chunk leaves a dead row behind that
+is masked out of every search until the index is rebuilt.
+"""
+
+import argparse
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.hyperparameters import RAGHyperparameters
+
+from .base import SearchBackend, RESULT_FIELDS
+from .ivf_index import IVFIndex, CENTROIDS_FILE, ASSIGNMENTS_FILE
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.bin"
+METADATA_FILE = "metadata.jsonl"
+OFFSETS_FILE = "metadata.offsets.bin"
+MANIFEST_FILE = "manifest.json"
+DELETED_FILE = "deleted.bin"
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+def _record_embedding(record: Dict[str, Any]) -> Optional[Sequence[float]]:
+    """Get the embedding from a chunk record or index document"""
+    embedding = record.get('embedding')
+    if embedding is None or len(embedding) == 0:
+        embedding = record.get(RAGHyperparameters.VECTOR_FIELD_NAME)
+    return embedding
+
+def _record_document(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a chunk record into the stored document fields"""
+    nested = record.get('metadata', {}) if isinstance(record.get('metadata'), dict) else {}
+    document = {}
+    for field in RESULT_FIELDS:
+        if field in record:
+            document[field] = record[field]
+        elif field in nested:
+            document[field] = nested[field]
+    return document
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    if k >= len(scores):
+        return np.argsort(-scores)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+class LocalVectorStore(SearchBackend):
+    """Vector search over a memory-mapped embedding matrix, exact or IVF"""
+
+    name = "local"
+
+    def __init__(self, index_path: str, batch_rows: Optional[int] = None,
+                 index_type: Optional[str] = None, nprobe: Optional[int] = None):
+        """
+        Open an index created by LocalVectorStore.create or LocalVectorStore.build
+
+        Args:
+            index_path: Index directory
+            batch_rows: Rows scored per matrix multiply (defaults to hyperparameters)
+            index_type: "flat" for exact search or "ivf" for approximate search (defaults to hyperparameters)
+            nprobe: IVF lists scanned per query (defaults to hyperparameters)
+        """
+        self.index_path = Path(index_path)
+        self.batch_rows = batch_rows or RAGHyperparameters.LOCAL_SEARCH_BATCH_ROWS
+        self.index_type = index_type or RAGHyperparameters.LOCAL_INDEX_TYPE
+        self.nprobe = nprobe or RAGHyperparameters.IVF_NPROBE
+
+        with open(self.index_path / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+
+        self.dtype = np.dtype(self.manifest['dtype'])
+        self._load_vectors()
+        self._metadata_file = open(self.index_path / METADATA_FILE, 'rb')
+        self._metadata_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+        self.ivf = IVFIndex.load(self.index_path, self.manifest.get('ivf_trained_rows', 0))
+
+        # Inverted index for keyword search, built on first use
+        self._keyword_index = None
+        self._keyword_lock = threading.Lock()
+        # Chunk ID -> live row, built on first upsert or delete
+        self._row_ids = None
+        # Ingestion records followed while serving (see follow_records)
+        self._followed_records = None
+        self._generation_reader = None
+        self._synced_generation = None
+        self._refresh_lock = threading.Lock()
+        # Background IVF retraining started by a sync (see train_ivf)
+        self._training_thread = None
+        self._training_lock = threading.Lock()
+
+        logger.info(f"Local vector store opened at {self.index_path}: "
+                    f"{self.live_count} vectors ({self.deleted_count} deleted), "
+                    f"dimension {self.dimension}, {self.dtype}, {self.index_type}")
+
+    def _load_vectors(self):
+        """Map the vector matrix and load the metadata offsets"""
+        self.dimension = self.manifest.get('dimension') or 0
+        count = self.manifest.get('count', 0)
+        if count:
+            vectors = np.memmap(self.index_path / VECTORS_FILE, dtype=self.dtype, mode='r',
+                                shape=(count, self.dimension))
+        else:
+            vectors = np.empty((0, self.dimension), dtype=self.dtype)
+        offsets = np.fromfile(self.index_path / OFFSETS_FILE, dtype=np.int64)[:count]
+
+        # Dead rows of updated or deleted chunks; None while there are none
+        deleted_path = self.index_path / DELETED_FILE
+        deleted_rows = np.fromfile(deleted_path, dtype=np.int64) if deleted_path.exists() else np.empty(0, dtype=np.int64)
+        deleted_rows = deleted_rows[deleted_rows < count]
+        if len(deleted_rows):
+            dead = np.zeros(count, dtype=bool)
+            dead[deleted_rows] = True
+        else:
+            dead = None
+
+        # Searches running during a sync read these without the write lock: offsets and the
+        # dead mask only grow, so they are replaced before the matrix they describe
+        self.offsets = offsets
+        self.dead = dead
+        self.vectors = vectors
+
+    @property
+    def deleted_count(self) -> int:
+        return int(self.dead.sum()) if self.dead is not None else 0
+
+    @property
+    def live_count(self) -> int:
+        return len(self.vectors) - self.deleted_count
+
+    def _write_manifest(self):
+        with open(self.index_path / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+
+    @classmethod
+    def create(cls, index_path: str, dtype: Optional[str] = None, **kwargs) -> "LocalVectorStore":
+        """
+        Create an empty index, replacing any existing one
+
+        Args:
+            index_path: Index directory
+            dtype: Stored vector precision ("float32" or "float16")
+
+        Returns:
+            The opened store
+        """
+        index_path = Path(index_path)
+        index_path.mkdir(parents=True, exist_ok=True)
+        for name in (CENTROIDS_FILE, ASSIGNMENTS_FILE, DELETED_FILE):
+            (index_path / name).unlink(missing_ok=True)
+        for name in (VECTORS_FILE, METADATA_FILE, OFFSETS_FILE):
+            open(index_path / name, 'wb').close()
+
+        manifest = {
+            'dimension': None,
+            'dtype': np.dtype(dtype or RAGHyperparameters.LOCAL_INDEX_DTYPE).name,
+            'count': 0,
+            'normalized': True,
+            'records_path': None,
+            'records_offset': 0,
+            'ivf_trained_rows': 0
+        }
+        with open(index_path / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return cls(str(index_path), **kwargs)
+
+    @classmethod
+    def build(cls, index_path: str, records: Iterable[Dict[str, Any]], dtype: Optional[str] = None,
+              **kwargs) -> "LocalVectorStore":
+        """
+        Build an index from chunk records
+
+        Records are the JSONL lines written by the ingestion pipeline
+        (index document fields plus 'embedding'); pipeline chunks with a
+        nested 'metadata' dict are accepted too.
+
+        Args:
+            index_path: Index directory to create or overwrite
+            records: Chunk records
+            dtype: Stored vector precision ("float32" or "float16")
+
+        Returns:
+            The opened store
+        """
+        store = cls.create(index_path, dtype, **kwargs)
+        if store.add(records) == 0:
+            raise ValueError("No records with usable embeddings to index")
+        if store.index_type == "ivf":
+            store.train_ivf()
+        return store
+
+    @classmethod
+    def from_records_file(cls, records_path: str, index_path: str, dtype: Optional[str] = None,
+                          **kwargs) -> "LocalVectorStore":
+        """
+        Build an index from a JSONL records file written by the ingestion pipeline
+
+        Args:
+            records_path: JSONL file with one chunk record per line
+            index_path: Index directory to create or overwrite
+            dtype: Stored vector precision ("float32" or "float16")
+
+        Returns:
+            The opened store
+        """
+        store = cls.create(index_path, dtype, **kwargs)
+        if store.sync_records(records_path) == 0:
+            raise ValueError("No records with usable embeddings to index")
+        return store
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def _live_row_ids(self) -> Dict[str, int]:
+        """Map of chunk ID to its live row (caller holds the write lock)"""
+        if self._row_ids is None:
+            self._row_ids = {}
+            for row in range(len(self.vectors)):
+                if self.dead is None or not self.dead[row]:
+                    doc_id = self.get_document(row).get('id')
+                    if doc_id is not None:
+                        self._row_ids[doc_id] = row
+        return self._row_ids
+
+    def add(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Append chunk records to the index
+
+        A record whose ID is already indexed replaces the old row, and a
+        tombstone record ({"id": ..., "deleted": true}) removes its chunk.
+        New rows are assigned to their nearest IVF list; the centroids are
+        not retrained (see train_ivf).
+
+        Args:
+            records: Chunk records
+
+        Returns:
+            Number of records added
+        """
+        with self._write_lock:
+            start_row = len(self.vectors)
+            dimension = self.dimension or None
+            offsets = []
+            contents = []
+            dead_rows = []
+            skipped = 0
+            # Only needed once the index has rows that a record could replace or delete
+            row_ids = self._live_row_ids() if start_row else {}
+            # Sizes to roll back to if the batch fails partway (e.g. a malformed record)
+            files = [self.index_path / name for name in (VECTORS_FILE, METADATA_FILE, OFFSETS_FILE, DELETED_FILE)]
+            sizes = [path.stat().st_size if path.exists() else 0 for path in files]
+
+            try:
+                with open(self.index_path / VECTORS_FILE, 'ab') as raw, open(self.index_path / METADATA_FILE, 'ab') as meta:
+                    position = meta.tell()
+                    for record in records:
+                        doc_id = record.get('id')
+                        if record.get('deleted'):
+                            if doc_id in row_ids:
+                                dead_rows.append(row_ids.pop(doc_id))
+                            continue
+
+                        embedding = _record_embedding(record)
+                        if embedding is None or len(embedding) == 0 or (dimension is not None and len(embedding) != dimension):
+                            skipped += 1
+                            continue
+
+                        vector = np.asarray(embedding, dtype=np.float32)
+                        norm = np.linalg.norm(vector)
+                        if norm == 0:
+                            skipped += 1
+                            continue
+                        dimension = len(vector)
+
+                        # Stored normalized so that the dot product is the cosine similarity
+                        raw.write((vector / norm).astype(self.dtype).tobytes())
+                        document = _record_document(record)
+                        line = json.dumps(document).encode('utf-8') + b"\n"
+                        meta.write(line)
+                        contents.append(document.get('content', ''))
+                        if doc_id is not None:
+                            if doc_id in row_ids:
+                                dead_rows.append(row_ids[doc_id])
+                            row_ids[doc_id] = start_row + len(offsets)
+                        offsets.append(position)
+                        position += len(line)
+
+                with open(self.index_path / OFFSETS_FILE, 'ab') as f:
+                    f.write(np.asarray(offsets, dtype=np.int64).tobytes())
+                if dead_rows:
+                    with open(self.index_path / DELETED_FILE, 'ab') as f:
+                        f.write(np.asarray(dead_rows, dtype=np.int64).tobytes())
+            except BaseException:
+                # Rows past the manifest count would shift every later row off its metadata
+                for path, size in zip(files, sizes):
+                    if path.exists():
+                        with open(path, 'r+b') as f:
+                            f.truncate(size)
+                self._row_ids = None
+                raise
+            self._row_ids = row_ids
+
+            self.manifest['dimension'] = dimension
+            self.manifest['count'] = start_row + len(offsets)
+            self._write_manifest()
+            self._load_vectors()
+            if offsets:
+                self._extend_keyword_index(contents, start_row)
+
+            if self.ivf is not None and offsets:
+                labels = self.ivf.assign(self.vectors[start_row:], self.batch_rows)
+                IVFIndex.append_assignments(self.index_path, labels)
+                self.ivf.add(labels, start_row)
+
+        if skipped:
+            logger.warning(f"Skipped {skipped} records without a usable embedding")
+        logger.info(f"Added {len(offsets)} vectors to local store at {self.index_path}, "
+                    f"retired {len(dead_rows)} ({self.live_count} live)")
+        return len(offsets)
+
+    def delete(self, ids: Iterable[str]):
+        """
+        Remove chunks from search results
+
+        Args:
+            ids: Chunk IDs to delete
+        """
+        self.add({'id': doc_id, 'deleted': True} for doc_id in ids)
+
+    def sync_records(self, records_path: str, background_training: bool = False) -> int:
+        """
+        Add records appended to an ingestion records file since the last sync
+
+        Trains the IVF index once enough rows exist, and retrains it when the
+        index has grown past IVF_RETRAIN_GROWTH times the rows it was trained on.
+
+        Args:
+            records_path: JSONL file written by the ingestion pipeline
+            background_training: Train in a background thread instead of before returning
+
+        Returns:
+            Number of records added
+        """
+        records_path = str(Path(records_path).resolve())
+        offset = self.manifest.get('records_offset', 0) if self.manifest.get('records_path') == records_path else 0
+
+        def read_new_records():
+            nonlocal offset
+            with open(records_path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    # A partially written last line is picked up by the next sync
+                    if not line.endswith(b"\n"):
+                        break
+                    offset += len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError as e:
+                        logger.warning(f"Skipping malformed chunk record at byte {offset - len(line)} "
+                                       f"of {records_path}: {e}")
+                        continue
+                    yield record
+
+        added = self.add(read_new_records())
+        with self._write_lock:
+            self.manifest['records_path'] = records_path
+            self.manifest['records_offset'] = offset
+            self._write_manifest()
+
+        if self.index_type == "ivf" and self._ivf_needs_training():
+            self.train_ivf(background=background_training)
+        return added
+
+    def follow_records(self, records_path: str, generation_reader) -> int:
+        """
+        Sync an ingestion records file now and again whenever the ingestion pipeline bumps the index generation
+
+        Args:
+            records_path: JSONL file written by the ingestion pipeline
+            generation_reader: IndexGenerationReader of INDEX_GENERATION_PATH
+
+        Returns:
+            Number of records added by the initial sync
+        """
+        self._followed_records = records_path
+        self._generation_reader = generation_reader
+        self._synced_generation = None
+        return self.refresh()
+
+    def refresh(self) -> int:
+        """
+        Sync the followed records file if the index generation moved since the last sync
+
+        An unchanged generation costs one stat of the generation file; concurrent callers
+        wait for a running sync instead of starting their own.
+        """
+        if self._generation_reader is None:
+            return 0
+        generation = self._generation_reader.generation
+        if generation == self._synced_generation:
+            return 0
+
+        with self._refresh_lock:
+            # Read before syncing: records are written before the bump, so a later bump syncs again
+            generation = self._generation_reader.generation
+            if generation == self._synced_generation:
+                return 0
+            try:
+                # k-means would stall every retrieval waiting on this lock
+                added = self.sync_records(self._followed_records, background_training=True)
+            except (OSError, ValueError) as e:
+                # No records written yet, or a record the store rejected; retried on the next generation
+                logger.warning(f"Could not sync chunk records from {self._followed_records}: {e}")
+                return 0
+            self._synced_generation = generation
+            if added:
+                logger.info(f"Synced {added} chunk records at index generation {generation}")
+            return added
+
+    def _ivf_needs_training(self) -> bool:
+        if len(self.vectors) < RAGHyperparameters.IVF_MIN_TRAIN_ROWS:
+            return False
+        if self.ivf is None:
+            return True
+        return len(self.vectors) > self.ivf.trained_rows * RAGHyperparameters.IVF_RETRAIN_GROWTH
+
+    def train_ivf(self, background: bool = False):
+        """
+        Train the IVF coarse quantizer on the current vectors and assign every row
+
+        Searches and appends carry on with the current index while k-means runs; the new
+        index replaces it once rows appended in the meantime have been assigned to it.
+
+        Args:
+            background: Train in a daemon thread and return at once (no-op while one is running)
+        """
+        if len(self.vectors) < RAGHyperparameters.IVF_MIN_TRAIN_ROWS:
+            logger.info(f"Only {len(self.vectors)} vectors, IVF training skipped (exact search is used)")
+            return
+        if not background:
+            self._train_ivf()
+            return
+
+        with self._training_lock:
+            if self._training_thread is not None and self._training_thread.is_alive():
+                return
+            self._training_thread = threading.Thread(target=self._train_ivf_in_background,
+                                                     name="ivf-training", daemon=True)
+            self._training_thread.start()
+
+    def _train_ivf_in_background(self):
+        try:
+            self._train_ivf()
+        except Exception as e:
+            # The current index keeps serving; the next sync tries again
+            logger.error(f"IVF training failed: {e}")
+
+    def _train_ivf(self):
+        # The matrix only grows, so the rows mapped now stay valid while appends continue
+        vectors = self.vectors
+        start = time.perf_counter()
+        ivf = IVFIndex.train(
+            vectors,
+            nlist=RAGHyperparameters.IVF_NLIST,
+            sample_size=RAGHyperparameters.IVF_TRAINING_SAMPLE,
+            iterations=RAGHyperparameters.IVF_TRAINING_ITERATIONS,
+            batch_rows=self.batch_rows
+        )
+
+        with self._write_lock:
+            trained_rows = ivf.trained_rows
+            if len(self.vectors) > trained_rows:
+                # Appended during training and only assigned to the old index so far
+                ivf.add(ivf.assign(self.vectors[trained_rows:], self.batch_rows), trained_rows)
+            ivf.save(self.index_path)
+            self.manifest['ivf_trained_rows'] = trained_rows
+            self._write_manifest()
+            self.ivf = ivf
+        logger.info(f"IVF index swapped in after {time.perf_counter() - start:.1f}s of training")
+
+    def get_document(self, row: int) -> Dict[str, Any]:
+        """Read the stored document fields for a matrix row"""
+        with self._metadata_lock:
+            self._metadata_file.seek(int(self.offsets[row]))
+            line = self._metadata_file.readline()
+        return json.loads(line)
+
+    def _results(self, rows: Iterable[int], scores: Iterable[float]) -> List[Dict[str, Any]]:
+        return [self.format_result(self.get_document(row), float(score)) for row, score in zip(rows, scores)]
+
+    def _normalize_query(self, embedding: List[float]) -> np.ndarray:
+        query = np.asarray(embedding, dtype=np.float32)
+        # An empty index has no dimension yet and matches any query (with no results)
+        if self.dimension and query.shape != (self.dimension,):
+            raise ValueError(f"Query embedding has dimension {query.size}, index expects {self.dimension}")
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            raise ValueError("Query embedding is all zeros")
+        return query / norm
+
+    def _vector_candidates(self, embedding: List[float], top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k rows and cosine scores for a query embedding"""
+        query = self._normalize_query(embedding)
+        if self.index_type == "ivf" and self.ivf is not None:
+            return self._ivf_candidates(query, top_k, self.nprobe)
+        return self._exact_candidates(query, top_k)
+
+    def _exact_candidates(self, query: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force top-k over the whole matrix"""
+        vectors = self.vectors
+        dead = self.dead
+        top_k = min(top_k, len(vectors))
+        if top_k <= 0:
+            # Empty store (or nothing asked for): there are no blocks to merge
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        best_rows = []
+        best_scores = []
+        for start in range(0, len(vectors), self.batch_rows):
+            block = vectors[start:start + self.batch_rows]
+            scores = block.astype(np.float32, copy=False) @ query
+            if dead is not None:
+                scores[dead[start:start + len(block)]] = -np.inf
+            rows = _top_k(scores, top_k)
+            best_rows.append(rows + start)
+            best_scores.append(scores[rows])
+
+        rows = np.concatenate(best_rows)
+        scores = np.concatenate(best_scores)
+        order = _top_k(scores, top_k)
+        if dead is not None:
+            order = order[np.isfinite(scores[order])]
+        return rows[order], scores[order]
+
+    def _ivf_candidates(self, query: np.ndarray, top_k: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k over the rows of the nprobe closest IVF lists"""
+        candidates = self.ivf.probe(query, nprobe)
+        if self.dead is not None:
+            candidates = candidates[~self.dead[candidates]]
+        if len(candidates) == 0:
+            return self._exact_candidates(query, top_k)
+
+        scores = np.empty(len(candidates), dtype=np.float32)
+        for start in range(0, len(candidates), self.batch_rows):
+            rows = candidates[start:start + self.batch_rows]
+            scores[start:start + len(rows)] = self.vectors[rows].astype(np.float32, copy=False) @ query
+
+        order = _top_k(scores, min(top_k, len(scores)))
+        return candidates[order], scores[order]
+
+    def exact_search(self, embedding: List[float], top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-k rows and scores regardless of index type (ground truth for recall)
+
+        Args:
+            embedding: Query embedding
+            top_k: Number of results
+
+        Returns:
+            (rows, scores), best first
+        """
+        return self._exact_candidates(self._normalize_query(embedding), top_k)
+
+    def approximate_search(self, embedding: List[float], top_k: int, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        IVF top-k rows and scores
+
+        Args:
+            embedding: Query embedding
+            top_k: Number of results
+            nprobe: Lists scanned (defaults to the store's nprobe)
+
+        Returns:
+            (rows, scores), best first
+        """
+        if self.ivf is None:
+            raise ValueError("IVF index has not been trained")
+        return self._ivf_candidates(self._normalize_query(embedding), top_k, nprobe or self.nprobe)
+
+    def vector_search(self, embedding: List[float], top_k: int) -> List[Dict[str, Any]]:
+        """Cosine similarity search (exact, or IVF when configured and trained)"""
+        rows, scores = self._vector_candidates(embedding, top_k)
+        return self._results(rows, scores)
+
+    @staticmethod
+    def _tokenize(contents: Iterable[str], start_row: int) -> Tuple[Dict[str, Tuple[np.ndarray, np.ndarray]], np.ndarray]:
+        """Postings (rows, term frequencies) and lengths of consecutive rows starting at start_row"""
+        postings = defaultdict(list)
+        lengths = []
+        for row, content in enumerate(contents, start_row):
+            terms = Counter(TOKEN_PATTERN.findall(content.lower()))
+            lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                postings[term].append((row, tf))
+        return ({term: (np.array([r for r, _ in entries], dtype=np.int64),
+                        np.array([tf for _, tf in entries], dtype=np.float32))
+                 for term, entries in postings.items()},
+                np.array(lengths, dtype=np.float32))
+
+    @staticmethod
+    def _keyword_index_of(postings: Dict[str, Tuple[np.ndarray, np.ndarray]], lengths: np.ndarray) -> Dict[str, Any]:
+        return {
+            'postings': postings,
+            'lengths': lengths,
+            'average_length': float(lengths.mean()) if len(lengths) else 0.0
+        }
+
+    def _build_keyword_index(self):
+        """Build a BM25 inverted index over the stored content"""
+        postings, lengths = self._tokenize(
+            (self.get_document(row).get('content', '') for row in range(len(self.vectors))), 0
+        )
+        self._keyword_index = self._keyword_index_of(postings, lengths)
+        logger.info(f"Built keyword index over {len(lengths)} chunks, {len(postings)} terms")
+
+    def _extend_keyword_index(self, contents: List[str], start_row: int):
+        """Add appended rows to a built keyword index, as IVFIndex.add does for lists"""
+        if self._keyword_index is None:
+            # Built on first use
+            return
+        new_postings, new_lengths = self._tokenize(contents, start_row)
+        with self._keyword_lock:
+            index = self._keyword_index
+            if index is None or len(index['lengths']) >= start_row + len(contents):
+                # Not built yet, or built after these rows were appended
+                return
+            if len(index['lengths']) != start_row:
+                self._keyword_index = None
+                return
+
+            # A new index rather than an update in place: searches hold on to the one they started with
+            postings = dict(index['postings'])
+            for term, (rows, tf) in new_postings.items():
+                if term in postings:
+                    old_rows, old_tf = postings[term]
+                    postings[term] = (np.concatenate([old_rows, rows]), np.concatenate([old_tf, tf]))
+                else:
+                    postings[term] = (rows, tf)
+            self._keyword_index = self._keyword_index_of(postings, np.concatenate([index['lengths'], new_lengths]))
+
+    def _keyword_scores(self, query: str) -> np.ndarray:
+        """BM25 score of every row for the query"""
+        with self._keyword_lock:
+            if self._keyword_index is None:
+                self._build_keyword_index()
+            index = self._keyword_index
+
+        k1, b = 1.2, 0.75
+        total = len(index['lengths'])
+        scores = np.zeros(total, dtype=np.float32)
+        norm = k1 * (1 - b + b * index['lengths'] / max(index['average_length'], 1.0))
+        for term in set(TOKEN_PATTERN.findall(query.lower())):
+            if term not in index['postings']:
+                continue
+            rows, tf = index['postings'][term]
+            idf = math.log(1 + (total - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] += idf * tf * (k1 + 1) / (tf + norm[rows])
+        if self.dead is not None:
+            scores[self.dead[:total]] = 0.0
+        return scores
+
+    def keyword_search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """BM25 keyword search"""
+        scores = self._keyword_scores(query)
+        rows = [row for row in _top_k(scores, min(top_k, len(scores))) if scores[row] > 0]
+        return self._results(rows, scores[rows])
+
+    def hybrid_search(self, query: str, embedding: List[float], top_k: int) -> List[Dict[str, Any]]:
+        """Weighted reciprocal rank fusion of vector and keyword rankings"""
+        candidates = max(top_k * 5, 50)
+        vector_rows, _ = self._vector_candidates(embedding, candidates)
+        keyword_scores = self._keyword_scores(query)
+        keyword_rows = [row for row in _top_k(keyword_scores, min(candidates, len(keyword_scores)))
+                        if keyword_scores[row] > 0]
+
+        k = RAGHyperparameters.HYBRID_RRF_K
+        fused = defaultdict(float)
+        for rank, row in enumerate(vector_rows):
+            fused[int(row)] += RAGHyperparameters.SEMANTIC_WEIGHT / (k + rank + 1)
+        for rank, row in enumerate(keyword_rows):
+            fused[int(row)] += RAGHyperparameters.KEYWORD_WEIGHT / (k + rank + 1)
+
+        ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return self._results([row for row, _ in ranked], [score for _, score in ranked])
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        stats = {
+            'total_documents': self.live_count,
+            'deleted_rows': self.deleted_count,
+            'search_service': 'Local vector store',
+            'index_path': str(self.index_path),
+            'index_type': self.index_type,
+            'dimension': self.dimension,
+            'dtype': self.dtype.name,
+            'index_bytes': int(self.vectors.nbytes)
+        }
+        if self.ivf is not None:
+            stats.update({
+                'ivf_nlist': self.ivf.nlist,
+                'ivf_nprobe': self.nprobe,
+                'ivf_trained_rows': self.ivf.trained_rows
+            })
+        return stats
+
+    def close(self):
+        """Close the metadata sidecar"""
+        self._metadata_file.close()
+
+def main():
+    """Build or update a local vector store from ingestion chunk records"""
+    parser = argparse.ArgumentParser(description="Build a local vector index from chunk records")
+    parser.add_argument("records", help="JSONL chunk records written by the ingestion pipeline (CHUNK_RECORDS_PATH)")
+    parser.add_argument("--output", default=None, help="Index directory (default: LOCAL_INDEX_PATH)")
+    parser.add_argument("--dtype", choices=["float32", "float16"], default=None, help="Stored vector precision")
+    parser.add_argument("--index-type", choices=["flat", "ivf"], default=None, help="Exact or IVF search")
+    parser.add_argument("--sync", action="store_true", help="Add only records appended since the last sync")
+    parser.add_argument("--train", action="store_true", help="Retrain the IVF index after loading")
+    args = parser.parse_args()
+
+    from config import config
+    output = args.output or config.Config.LOCAL_INDEX_PATH
+
+    if args.sync and (Path(output) / MANIFEST_FILE).exists():
+        print(f"🔄 Syncing local vector index {output} from {args.records}")
+        store = LocalVectorStore(output, index_type=args.index_type)
+        added = store.sync_records(args.records)
+        print(f"✅ Added {added} chunks")
+    else:
+        print(f"🔨 Building local vector index from {args.records}")
+        store = LocalVectorStore.from_records_file(args.records, output, args.dtype, index_type=args.index_type)
+
+    if args.train:
+        store.train_ivf()
+
+    stats = store.get_statistics()
+    print(f"✅ Indexed {stats['total_documents']} chunks into {output}")
+    print(f"   - Dimension: {stats['dimension']}")
+    print(f"   - Precision: {stats['dtype']}")
+    print(f"   - Matrix size: {stats['index_bytes'] / (1024 * 1024):.1f} MB")
+    if 'ivf_nlist' in stats:
+        print(f"   - IVF lists: {stats['ivf_nlist']} (nprobe {stats['ivf_nprobe']})")
+
+if __name__ == "__main__":
+    main()
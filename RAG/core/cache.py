@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+RAG Caches
+LRU + TTL cache with optional SQLite persistence, used for query embeddings and answers
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """Normalize query text so trivially different spellings share a cache entry"""
+    return WHITESPACE_PATTERN.sub(" ", text).strip().lower().rstrip("?!. ")
+
+def make_key(*parts: Any) -> str:
+    """Build a fixed-length cache key from its parts"""
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a TTL"""
+
+    def __init__(self, max_entries: int, ttl: float, persist_path: Optional[str] = None, name: str = "cache"):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of entries before the least recently used is evicted
+            ttl: Seconds an entry stays valid
+            persist_path: SQLite file to persist entries across restarts (None keeps them in memory only)
+            name: Cache name, used as the SQLite table name and in logs
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.name = name
+
+        self._entries = OrderedDict()  # key -> (value, expires_at, cost_seconds)
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+        self._conn = None
+        if persist_path:
+            self._open_store(persist_path)
+
+    def _open_store(self, persist_path: str):
+        """Open the SQLite store and load unexpired entries"""
+        path = Path(persist_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.name} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, cost REAL NOT NULL)"
+        )
+        self._conn.execute(f"DELETE FROM {self.name} WHERE expires_at <= ?", (time.time(),))
+        self._conn.commit()
+
+        rows = self._conn.execute(
+            f"SELECT key, value, expires_at, cost FROM {self.name} ORDER BY expires_at DESC LIMIT ?",
+            (self.max_entries,)
+        ).fetchall()
+        for key, value, expires_at, cost in reversed(rows):
+            self._entries[key] = (json.loads(value), expires_at, cost)
+        logger.info(f"Cache {self.name} loaded {len(rows)} entries from {path}")
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value and mark it as recently used
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry[2]
+            return entry[0]
+
+    def put(self, key: str, value: Any, cost_seconds: float = 0.0):
+        """
+        Store a value
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            cost_seconds: Time it took to produce the value, credited to saved latency on each hit
+        """
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expires_at, cost_seconds)
+            self._entries.move_to_end(key)
+
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+            self.evictions += len(evicted)
+
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        f"INSERT OR REPLACE INTO {self.name} (key, value, expires_at, cost) VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(value), expires_at, cost_seconds)
+                    )
+                    self._conn.executemany(f"DELETE FROM {self.name} WHERE key = ?", [(k,) for k in evicted])
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Cache {self.name} could not persist entry: {e}")
+
+    def delete(self, key: str):
+        """Remove one entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+            if self._conn is not None:
+                self._conn.execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+                self._conn.commit()
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute(f"DELETE FROM {self.name}")
+                self._conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'persistent': self._conn is not None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'saved_seconds': round(self.saved_seconds, 3)
+        }
+
+    def close(self):
+        """Close the SQLite store"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -6,11 +6,12 @@ Uses GPT-4 to generate answers based on augmented context
 
 import logging
 import time
-from typing import Dict, Any, Optional
-from openai import AzureOpenAI
+from typing import Dict, Any, AsyncIterator, Iterator, Optional
+from openai import AzureOpenAI, AsyncAzureOpenAI
 from config import config
 from config.hyperparameters import RAGHyperparameters
 from config.prompts import RAGPrompts
+from .openai_gateway import get_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +20,17 @@ class GenerationComponent:
     
     def __init__(self):
         """Initialize the generation component"""
-        # Initialize OpenAI client
+        # Initialize OpenAI client (retries are left to the shared gateway)
         self.openai_client = AzureOpenAI(
             api_key=config.Config.AZURE_OPENAI_API_KEY,
             api_version=config.Config.AZURE_OPENAI_API_VERSION,
-            azure_endpoint=config.Config.AZURE_OPENAI_ENDPOINT
+            azure_endpoint=config.Config.AZURE_OPENAI_ENDPOINT,
+            max_retries=0
+        )
+        self.gateway = get_gateway(
+            config.Config.GPT4_DEPLOYMENT_NAME,
+            RAGHyperparameters.GENERATION_REQUESTS_PER_MINUTE,
+            RAGHyperparameters.GENERATION_TOKENS_PER_MINUTE
         )
         
         logger.info("Generation component initialized")
@@ -42,27 +49,15 @@ class GenerationComponent:
         Returns:
             Dictionary with generated answer and metadata
         """
+        start_time = time.time()
         try:
-            # Use hyperparameters for defaults
-            temperature = temperature or RAGHyperparameters.DEFAULT_TEMPERATURE
-            max_tokens = max_tokens or RAGHyperparameters.DEFAULT_MAX_TOKENS
-            
-            # Validate parameters
-            max_tokens = min(max_tokens, RAGHyperparameters.MAX_MAX_TOKENS)
-            max_tokens = max(max_tokens, RAGHyperparameters.MIN_MAX_TOKENS)
+            temperature, max_tokens = self._resolve_parameters(temperature, max_tokens)
             
-            start_time = time.time()
             logger.info(f"Generating answer for question: '{question[:50]}...'")
             
             if not context.strip():
                 logger.warning("No context provided for generation")
-                return {
-                    'answer': "I don't have enough information to answer your question. Please try rephrasing or ask about a different topic.",
-                    'confidence': 0.0,
-                    'tokens_used': 0,
-                    'generation_time': 0.0,
-                    'error': 'No context available'
-                }
+                return self._no_context_result()
             
             # Generate answer using GPT-4
             result = self._generate_with_gpt4(question, context, temperature, max_tokens)
@@ -76,13 +71,147 @@ class GenerationComponent:
             
         except Exception as e:
             logger.error(f"Error in generation: {e}")
-            return {
-                'answer': f"Sorry, I encountered an error while generating an answer: {str(e)}",
-                'confidence': 0.0,
-                'tokens_used': 0,
-                'generation_time': time.time() - start_time,
-                'error': str(e)
-            }
+            return self._error_result(e, time.time() - start_time)
+    
+    @staticmethod
+    def _no_context_result() -> Dict[str, Any]:
+        """Result returned when there is no context to answer from"""
+        return {
+            'answer': "I don't have enough information to answer your question. Please try rephrasing or ask about a different topic.",
+            'confidence': 0.0,
+            'tokens_used': 0,
+            'generation_time': 0.0,
+            'error': 'No context available'
+        }
+    
+    @staticmethod
+    def _error_result(error: Exception, generation_time: float) -> Dict[str, Any]:
+        """Result returned when generation fails"""
+        return {
+            'answer': f"Sorry, I encountered an error while generating an answer: {str(error)}",
+            'confidence': 0.0,
+            'tokens_used': 0,
+            'generation_time': generation_time,
+            'error': str(error)
+        }
+    
+    def _resolve_parameters(self, temperature: Optional[float], max_tokens: Optional[int]):
+        """Apply hyperparameter defaults and limits (an explicit temperature of 0.0 is kept)"""
+        if temperature is None:
+            temperature = RAGHyperparameters.DEFAULT_TEMPERATURE
+        max_tokens = max_tokens or RAGHyperparameters.DEFAULT_MAX_TOKENS
+        
+        # Validate parameters
+        max_tokens = min(max_tokens, RAGHyperparameters.MAX_MAX_TOKENS)
+        max_tokens = max(max_tokens, RAGHyperparameters.MIN_MAX_TOKENS)
+        return temperature, max_tokens
+    
+    def _completion_request(self, question: str, context: str, temperature: float, max_tokens: int) -> Dict[str, Any]:
+        """Build the chat completion arguments using centralized prompts"""
+        user_prompt = RAGPrompts.RAG_USER_PROMPT_TEMPLATE.format(
+            context=context,
+            question=question
+        )
+        return {
+            'model': config.Config.GPT4_DEPLOYMENT_NAME,
+            'messages': [
+                {"role": "system", "content": RAGPrompts.RAG_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'top_p': RAGHyperparameters.TOP_P,
+            'frequency_penalty': RAGHyperparameters.FREQUENCY_PENALTY,
+            'presence_penalty': RAGHyperparameters.PRESENCE_PENALTY
+        }
+    
+    @staticmethod
+    def _estimated_tokens(request: Dict[str, Any]) -> int:
+        """Tokens to reserve for a chat completion: the estimated prompt plus the full completion"""
+        prompt_chars = sum(len(message['content']) for message in request['messages'])
+        return prompt_chars // RAGHyperparameters.CHARS_PER_TOKEN + request['max_tokens']
+    
+    def generate_stream(self, question: str, context: str, temperature: float = None,
+                        max_tokens: int = None) -> Iterator[Dict[str, Any]]:
+        """
+        Generate an answer, yielding tokens as they arrive
+        
+        Args:
+            question: The user's question
+            context: Augmented context from retrieval
+            temperature: Response creativity (0.0-1.0)
+            max_tokens: Maximum response length
+            
+        Yields:
+            {'type': 'token', 'content': str} for each content delta, then one
+            {'type': 'done', ...} event with the full answer, token usage and timings
+            (or {'type': 'error', 'error': str})
+        """
+        start_time = time.time()
+        temperature, max_tokens = self._resolve_parameters(temperature, max_tokens)
+        
+        if not context.strip():
+            logger.warning("No context provided for generation")
+            yield {'type': 'error', 'error': 'No context available'}
+            return
+        
+        request = self._stream_request(question, context, temperature, max_tokens)
+        
+        try:
+            # Retries only cover starting the stream; a stream failing midway is reported as an error
+            stream = self.gateway.call(
+                lambda: self.openai_client.chat.completions.create(**request),
+                tokens=self._estimated_tokens(request)
+            )
+            
+            parts = []
+            usage = None
+            time_to_first_token = None
+            for chunk in stream:
+                if getattr(chunk, 'usage', None):
+                    usage = chunk.usage
+                # Azure sends content-filter chunks without choices
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    if time_to_first_token is None:
+                        time_to_first_token = time.time() - start_time
+                    parts.append(content)
+                    yield {'type': 'token', 'content': content}
+            
+            yield self._stream_done_event(parts, usage, question, context, start_time, time_to_first_token)
+            
+        except Exception as e:
+            logger.error(f"Error streaming from GPT-4: {e}")
+            yield {'type': 'error', 'error': str(e)}
+    
+    def _stream_request(self, question: str, context: str, temperature: float, max_tokens: int) -> Dict[str, Any]:
+        """Chat completion arguments for a streamed answer"""
+        request = self._completion_request(question, context, temperature, max_tokens)
+        request['stream'] = True
+        if RAGHyperparameters.STREAM_INCLUDE_USAGE:
+            request['stream_options'] = {'include_usage': True}
+        return request
+    
+    def _stream_done_event(self, parts, usage, question: str, context: str, start_time: float,
+                           time_to_first_token: Optional[float]) -> Dict[str, Any]:
+        """Final event of a streamed answer"""
+        answer = "".join(parts).strip()
+        generation_time = time.time() - start_time
+        logger.info(f"Streamed answer in {generation_time:.3f}s, first token after {time_to_first_token or 0.0:.3f}s")
+        
+        return {
+            'type': 'done',
+            'answer': answer,
+            'confidence': self._calculate_confidence(answer, context, question),
+            'model': config.Config.GPT4_MODEL,
+            'tokens_used': usage.total_tokens if usage else 0,
+            'prompt_tokens': usage.prompt_tokens if usage else 0,
+            'completion_tokens': usage.completion_tokens if usage else 0,
+            'generation_time': generation_time,
+            'time_to_first_token': time_to_first_token
+        }
     
     def _generate_with_gpt4(self, question: str, context: str, temperature: float, max_tokens: int) -> Dict[str, Any]:
         """
@@ -98,48 +227,43 @@ class GenerationComponent:
             Dictionary with answer and metadata
         """
         try:
-            # Prepare the prompt using centralized prompts
-            system_prompt = RAGPrompts.RAG_SYSTEM_PROMPT
-            user_prompt = RAGPrompts.RAG_USER_PROMPT_TEMPLATE.format(
-                context=context,
-                question=question
-            )
-            
             # Generate response
-            response = self.openai_client.chat.completions.create(
-                model=config.Config.GPT4_DEPLOYMENT_NAME,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens,
-                top_p=RAGHyperparameters.TOP_P,
-                frequency_penalty=RAGHyperparameters.FREQUENCY_PENALTY,
-                presence_penalty=RAGHyperparameters.PRESENCE_PENALTY
+            request = self._completion_request(question, context, temperature, max_tokens)
+            response = self.gateway.call(
+                lambda: self.openai_client.chat.completions.create(**request),
+                tokens=self._estimated_tokens(request)
             )
             
-            answer = response.choices[0].message.content.strip()
-            
-            # Calculate confidence based on response quality
-            confidence = self._calculate_confidence(answer, context, question)
-            
-            return {
-                'answer': answer,
-                'confidence': confidence,
-                'model': config.Config.GPT4_MODEL,
-                'tokens_used': response.usage.total_tokens,
-                'prompt_tokens': response.usage.prompt_tokens,
-                'completion_tokens': response.usage.completion_tokens
-            }
+            return self._completion_result(response, question, context)
             
         except Exception as e:
             logger.error(f"Error generating with GPT-4: {e}")
-            return {
-                'answer': f"Sorry, I couldn't generate an answer due to an error: {str(e)}",
-                'confidence': 0.0,
-                'error': str(e)
-            }
+            return self._completion_error(e)
+    
+    def _completion_result(self, response, question: str, context: str) -> Dict[str, Any]:
+        """Answer and usage from a chat completion response"""
+        answer = response.choices[0].message.content.strip()
+        
+        # Calculate confidence based on response quality
+        confidence = self._calculate_confidence(answer, context, question)
+        
+        return {
+            'answer': answer,
+            'confidence': confidence,
+            'model': config.Config.GPT4_MODEL,
+            'tokens_used': response.usage.total_tokens,
+            'prompt_tokens': response.usage.prompt_tokens,
+            'completion_tokens': response.usage.completion_tokens
+        }
+    
+    @staticmethod
+    def _completion_error(error: Exception) -> Dict[str, Any]:
+        """Result of a failed chat completion"""
+        return {
+            'answer': f"Sorry, I couldn't generate an answer due to an error: {str(error)}",
+            'confidence': 0.0,
+            'error': str(error)
+        }
     
     def _calculate_confidence(self, answer: str, context: str, question: str) -> float:
         """
@@ -263,4 +387,122 @@ class GenerationComponent:
             
         except Exception as e:
             logger.error(f"Error getting generation summary: {e}")
-            return {'error': str(e)} 
\ No newline at end of file
+            return {'error': str(e)}
+
+class AsyncGenerationComponent(GenerationComponent):
+    """Step 3: Async generation, so waiting on GPT-4 does not block the event loop"""
+    
+    def __init__(self):
+        """Initialize the async generation component"""
+        super().__init__()
+        
+        # Async OpenAI client
+        self.async_openai_client = AsyncAzureOpenAI(
+            api_key=config.Config.AZURE_OPENAI_API_KEY,
+            api_version=config.Config.AZURE_OPENAI_API_VERSION,
+            azure_endpoint=config.Config.AZURE_OPENAI_ENDPOINT,
+            max_retries=0
+        )
+    
+    async def generate(self, question: str, context: str, temperature: float = None,
+                       max_tokens: int = None) -> Dict[str, Any]:
+        """
+        Generate answer using GPT-4 with context
+        
+        Args:
+            question: The user's question
+            context: Augmented context from retrieval
+            temperature: Response creativity (0.0-1.0)
+            max_tokens: Maximum response length
+            
+        Returns:
+            Dictionary with generated answer and metadata
+        """
+        start_time = time.time()
+        try:
+            temperature, max_tokens = self._resolve_parameters(temperature, max_tokens)
+            
+            logger.info(f"Generating answer for question: '{question[:50]}...'")
+            
+            if not context.strip():
+                logger.warning("No context provided for generation")
+                return self._no_context_result()
+            
+            try:
+                request = self._completion_request(question, context, temperature, max_tokens)
+                response = await self.gateway.call_async(
+                    lambda: self.async_openai_client.chat.completions.create(**request),
+                    tokens=self._estimated_tokens(request)
+                )
+                result = self._completion_result(response, question, context)
+            except Exception as e:
+                logger.error(f"Error generating with GPT-4: {e}")
+                result = self._completion_error(e)
+            
+            generation_time = time.time() - start_time
+            result['generation_time'] = generation_time
+            
+            logger.info(f"Generated answer in {generation_time:.3f}s, tokens: {result.get('tokens_used', 0)}")
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error in generation: {e}")
+            return self._error_result(e, time.time() - start_time)
+    
+    async def generate_stream(self, question: str, context: str, temperature: float = None,
+                              max_tokens: int = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate an answer, yielding tokens as they arrive
+        
+        Args:
+            question: The user's question
+            context: Augmented context from retrieval
+            temperature: Response creativity (0.0-1.0)
+            max_tokens: Maximum response length
+            
+        Yields:
+            The same events as GenerationComponent.generate_stream
+        """
+        start_time = time.time()
+        temperature, max_tokens = self._resolve_parameters(temperature, max_tokens)
+        
+        if not context.strip():
+            logger.warning("No context provided for generation")
+            yield {'type': 'error', 'error': 'No context available'}
+            return
+        
+        request = self._stream_request(question, context, temperature, max_tokens)
+        
+        try:
+            # Retries only cover starting the stream; a stream failing midway is reported as an error
+            stream = await self.gateway.call_async(
+                lambda: self.async_openai_client.chat.completions.create(**request),
+                tokens=self._estimated_tokens(request)
+            )
+            
+            parts = []
+            usage = None
+            time_to_first_token = None
+            async for chunk in stream:
+                if getattr(chunk, 'usage', None):
+                    usage = chunk.usage
+                # Azure sends content-filter chunks without choices
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    if time_to_first_token is None:
+                        time_to_first_token = time.time() - start_time
+                    parts.append(content)
+                    yield {'type': 'token', 'content': content}
+            
+            yield self._stream_done_event(parts, usage, question, context, start_time, time_to_first_token)
+            
+        except Exception as e:
+            logger.error(f"Error streaming from GPT-4: {e}")
+            yield {'type': 'error', 'error': str(e)}
+    
+    async def close(self):
+        """Close the async client"""
+        await self.async_openai_client.close()
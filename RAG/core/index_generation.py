@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Index Generation
+Reads the counter the ingestion pipeline bumps after every ingestion
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+class IndexGenerationReader:
+    """Cached reader of the index generation file written by the ingestion pipeline"""
+
+    def __init__(self, path: str):
+        """
+        Initialize the reader
+
+        Args:
+            path: JSON file shared with the ingestion pipeline (INDEX_GENERATION_PATH)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._state = {'generation': 0, 'files': {}}
+
+    def _refresh(self) -> Dict[str, Any]:
+        """Re-read the file when its modification time changed"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return self._state
+
+        with self._lock:
+            if mtime != self._mtime:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        self._state = json.load(f)
+                    self._mtime = mtime
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not read index generation from {self.path}: {e}")
+            return self._state
+
+    @property
+    def generation(self) -> int:
+        """Current global generation"""
+        return self._refresh().get('generation', 0)
+
+    def file_generation(self, filename: str) -> int:
+        """Generation at which a file was last ingested (0 if never recorded)"""
+        return self._refresh().get('files', {}).get(filename, 0)
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Azure OpenAI Gateway
+Sends requests to one deployment within its RPM/TPM budget, retrying throttled and transient failures
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+from .rate_limiter import RateLimiter
+from config.hyperparameters import RAGHyperparameters
+
+logger = logging.getLogger(__name__)
+
+# Failures worth retrying; anything else (bad request, auth, content filter) is raised at once
+TRANSIENT_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError)
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a deployment that keeps failing"""
+
+class CircuitBreaker:
+    """Stops calls after repeated transient failures and lets one trial call through after a cool-down"""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        """
+        Initialize the breaker closed
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_seconds: Seconds the circuit stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.opened = 0
+        self.rejected = 0
+
+    def allow(self):
+        """
+        Check that a call may be made
+
+        Raises:
+            CircuitOpenError: The circuit is open, or a trial call is already running
+        """
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = 'half_open'
+            if self.state == 'open' or (self.state == 'half_open' and self._trial_running):
+                self.rejected += 1
+                raise CircuitOpenError(f"circuit open after {self._failures} consecutive failures")
+            if self.state == 'half_open':
+                self._trial_running = True
+
+    def record_success(self):
+        """Close the circuit"""
+        with self._lock:
+            self.state = 'closed'
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        """Count a failure, opening the circuit at the threshold or when the trial call fails"""
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == 'half_open' or self._failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.opened += 1
+                    logger.warning(f"Circuit opened after {self._failures} consecutive failures")
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+
+    def record_neutral(self):
+        """End a trial call that neither proved nor disproved the deployment (e.g. a bad request)"""
+        with self._lock:
+            self._trial_running = False
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Read how long the service asked us to wait from an error's response headers
+
+    Args:
+        error: Exception raised by the OpenAI client
+
+    Returns:
+        Seconds to wait, or None if the response did not say
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = headers.get('retry-after')
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return None
+
+class OpenAIGateway:
+    """Rate-limited, retrying access to one Azure OpenAI deployment, shared by every caller in the process"""
+
+    def __init__(self, deployment: str, limiter: RateLimiter, max_retries: int, base_delay: float,
+                 backoff_multiplier: float, max_delay: float, breaker: CircuitBreaker):
+        """
+        Initialize the gateway
+
+        Args:
+            deployment: Azure OpenAI deployment name
+            limiter: RPM/TPM budget of the deployment
+            max_retries: Retries after the first attempt
+            base_delay: Backoff before the first retry (seconds)
+            backoff_multiplier: Growth of the backoff per retry
+            max_delay: Longest backoff (seconds)
+            breaker: Circuit breaker of the deployment
+        """
+        self.deployment = deployment
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.backoff_multiplier = backoff_multiplier
+        self.max_delay = max_delay
+        self.breaker = breaker
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.throttle_wait_time = 0.0
+
+    def call(self, request: Callable[[], Any], tokens: int = 0, observer: Any = None) -> Any:
+        """
+        Send a request, waiting for budget and retrying throttled or transient failures
+
+        Args:
+            request: Makes the API call and returns its response
+            tokens: Estimated tokens the request will consume
+            observer: Optional object told about each attempt via record_wait(seconds) (time
+                spent waiting for budget), record_throttle() and record_success(latency)
+
+        Returns:
+            The response of the first successful attempt
+
+        Raises:
+            CircuitOpenError: The deployment keeps failing
+            Exception: The last error once retries are exhausted, or any non-transient error
+        """
+        for attempt in range(self.max_retries + 1):
+            self.breaker.allow()
+            waited = self.limiter.acquire(tokens)
+            if observer is not None:
+                observer.record_wait(waited)
+            start = time.monotonic()
+            try:
+                response = request()
+            except Exception as e:
+                time.sleep(self._retry_delay(e, attempt, observer))
+                continue
+            return self._succeeded(response, tokens, time.monotonic() - start, observer)
+
+    async def call_async(self, request: Callable[[], Awaitable[Any]], tokens: int = 0,
+                         observer: Any = None) -> Any:
+        """
+        Send a request from a coroutine, like call() but without blocking the event loop
+
+        Args:
+            request: Returns an awaitable making the API call
+            tokens: Estimated tokens the request will consume
+            observer: Optional object told about each attempt, as in call()
+
+        Returns:
+            The response of the first successful attempt
+
+        Raises:
+            CircuitOpenError: The deployment keeps failing
+            Exception: The last error once retries are exhausted, or any non-transient error
+        """
+        for attempt in range(self.max_retries + 1):
+            self.breaker.allow()
+            waited = await self.limiter.acquire_async(tokens)
+            if observer is not None:
+                observer.record_wait(waited)
+            start = time.monotonic()
+            try:
+                response = await request()
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(e, attempt, observer))
+                continue
+            return self._succeeded(response, tokens, time.monotonic() - start, observer)
+
+    def _retry_delay(self, error: Exception, attempt: int, observer: Any = None) -> float:
+        """Record a failed attempt and return how long to wait before the next one (re-raises if there is none)"""
+        if isinstance(error, RateLimitError):
+            # Throttling is the service working as intended, so it does not trip the breaker
+            self.breaker.record_neutral()
+            with self._lock:
+                self.throttled += 1
+            if observer is not None:
+                observer.record_throttle()
+        elif isinstance(error, TRANSIENT_ERRORS):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_neutral()
+            self._count_failure()
+            raise error
+
+        if attempt == self.max_retries:
+            self._count_failure()
+            raise error
+
+        retry_after = retry_after_seconds(error)
+        delay = random.uniform(0.5, 1.0) * min(self.max_delay, self.base_delay * (self.backoff_multiplier ** attempt))
+        if retry_after is not None:
+            # A little jitter on top keeps callers released together from colliding again
+            delay = max(delay, retry_after + random.uniform(0.0, 0.1 * retry_after + 0.05))
+            if isinstance(error, RateLimitError):
+                # Everyone sharing the deployment waits, not just this caller
+                self.limiter.pause(retry_after)
+
+        logger.warning(f"{self.deployment} request failed ({error}), retrying in {delay:.2f}s "
+                       f"(attempt {attempt + 1}/{self.max_retries + 1})")
+        with self._lock:
+            self.retries += 1
+            if isinstance(error, RateLimitError):
+                self.throttle_wait_time += delay
+        return delay
+
+    def _succeeded(self, response: Any, tokens: int, latency: float, observer: Any = None) -> Any:
+        """Record a successful attempt"""
+        self.breaker.record_success()
+        usage = getattr(response, 'usage', None)
+        self.limiter.reconcile(tokens, getattr(usage, 'total_tokens', None))
+        with self._lock:
+            self.requests += 1
+        if observer is not None:
+            observer.record_success(latency)
+        return response
+
+    def _count_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get request, retry and throttling statistics"""
+        return {
+            'deployment': self.deployment,
+            'requests': self.requests,
+            'retries': self.retries,
+            'throttled': self.throttled,
+            'failures': self.failures,
+            'throttle_wait_time': self.throttle_wait_time,
+            'rate_limit_wait_time': self.limiter.total_wait_time,
+            'circuit_state': self.breaker.state,
+            'circuit_opened': self.breaker.opened,
+            'circuit_rejected': self.breaker.rejected
+        }
+
+_gateways: Dict[str, OpenAIGateway] = {}
+_gateways_lock = threading.Lock()
+
+def get_gateway(deployment: str, requests_per_minute: int, tokens_per_minute: int) -> OpenAIGateway:
+    """
+    Get the process-wide gateway for a deployment, creating it on first use
+
+    Args:
+        deployment: Azure OpenAI deployment name
+        requests_per_minute: Request budget used if the gateway is created
+        tokens_per_minute: Token budget used if the gateway is created
+
+    Returns:
+        Shared OpenAIGateway instance for the deployment
+    """
+    with _gateways_lock:
+        gateway = _gateways.get(deployment)
+        if gateway is None:
+            gateway = OpenAIGateway(
+                deployment,
+                RateLimiter(requests_per_minute, tokens_per_minute, name=deployment),
+                max_retries=RAGHyperparameters.MAX_RETRIES,
+                base_delay=RAGHyperparameters.RETRY_DELAY,
+                backoff_multiplier=RAGHyperparameters.BACKOFF_MULTIPLIER,
+                max_delay=RAGHyperparameters.RETRY_MAX_DELAY,
+                breaker=CircuitBreaker(
+                    RAGHyperparameters.CIRCUIT_FAILURE_THRESHOLD,
+                    RAGHyperparameters.CIRCUIT_RESET_SECONDS
+                )
+            )
+            _gateways[deployment] = gateway
+            logger.info(f"Gateway for {deployment}: {requests_per_minute} RPM, {tokens_per_minute} TPM")
+        return gateway
+
+def get_all_statistics() -> Dict[str, Dict[str, Any]]:
+    """Get the statistics of every gateway created in this process, by deployment"""
+    with _gateways_lock:
+        gateways = list(_gateways.values())
+    return {gateway.deployment: gateway.get_statistics() for gateway in gateways}
@@ -4,25 +4,62 @@ RAG Orchestrator
 Combines Retrieval, Augmentation, and Generation components
 """
 
+import asyncio
+import copy
 import logging
 import time
-from typing import Dict, Any, List, Optional
-from .retrieval import RetrievalComponent
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional
+from .retrieval import RetrievalComponent, AsyncRetrievalComponent
 from .augmentation import AugmentationComponent
-from .generation import GenerationComponent
+from .generation import GenerationComponent, AsyncGenerationComponent
+from .cache import TTLCache, normalize_text, make_key
+from .index_generation import IndexGenerationReader
+from .semantic_cache import SemanticAnswerCache
+from .openai_gateway import get_all_statistics as get_openai_statistics
 from config import config
+from config.hyperparameters import RAGHyperparameters
 
 logger = logging.getLogger(__name__)
 
 class RAGOrchestrator:
     """Orchestrates the complete RAG pipeline: Retrieval → Augmentation → Generation"""
     
-    def __init__(self):
-        """Initialize the RAG orchestrator with all three components"""
+    NO_RESULTS_ANSWER = "I couldn't find any relevant information to answer your question. Please try rephrasing or ask about a different topic."
+    NO_CONTEXT_ANSWER = "I found some documents but couldn't build proper context. Please try a different question."
+    
+    def __init__(self, retrieval: Optional[RetrievalComponent] = None,
+                 augmentation: Optional[AugmentationComponent] = None,
+                 generation: Optional[GenerationComponent] = None):
+        """
+        Initialize the RAG orchestrator with all three components
+        
+        Args:
+            retrieval: Retrieval component (created if not given)
+            augmentation: Augmentation component (created if not given)
+            generation: Generation component (created if not given)
+        """
         # Initialize all three components
-        self.retrieval = RetrievalComponent()
-        self.augmentation = AugmentationComponent()
-        self.generation = GenerationComponent()
+        self.retrieval = retrieval or RetrievalComponent()
+        self.augmentation = augmentation or AugmentationComponent()
+        self.generation = generation or GenerationComponent()
+        
+        # Answer cache, invalidated whenever the ingestion pipeline bumps the index generation
+        self.index_generation = IndexGenerationReader(config.Config.INDEX_GENERATION_PATH)
+        self.answer_cache = None
+        if RAGHyperparameters.CACHE_ENABLED and RAGHyperparameters.ANSWER_CACHE_ENABLED:
+            self.answer_cache = TTLCache(
+                max_entries=RAGHyperparameters.ANSWER_CACHE_MAX_ENTRIES,
+                ttl=RAGHyperparameters.CACHE_TTL,
+                persist_path=RAGHyperparameters.CACHE_PATH if RAGHyperparameters.CACHE_PERSIST else None,
+                name="answers"
+            )
+        self.semantic_cache = None
+        if RAGHyperparameters.CACHE_ENABLED and RAGHyperparameters.SEMANTIC_CACHE_ENABLED:
+            self.semantic_cache = SemanticAnswerCache(
+                max_entries=RAGHyperparameters.SEMANTIC_CACHE_MAX_ENTRIES,
+                threshold=RAGHyperparameters.SEMANTIC_CACHE_THRESHOLD,
+                ttl=RAGHyperparameters.CACHE_TTL
+            )
         
         logger.info("RAG Orchestrator initialized with all three components")
     
@@ -43,45 +80,37 @@ class RAGOrchestrator:
         Returns:
             Complete RAG result with answer and metadata
         """
+        start_time = time.time()
         try:
-            start_time = time.time()
             logger.info(f"Starting RAG pipeline for question: '{question[:50]}...'")
             
+            # Step 0: Answer caches
+            cache_key, cache_status, cached = self._lookup_caches(
+                question, top_k, search_type, context_length, temperature, max_tokens
+            )
+            if cached is not None:
+                cached['processing_time'] = time.time() - start_time
+                return cached
+            
             # Step 1: Retrieval
             logger.info("Step 1: Retrieving relevant documents")
+            step_start = time.time()
             retrieved_chunks = self.retrieval.retrieve(question, top_k, search_type)
+            retrieval_time = time.time() - step_start
             
             if not retrieved_chunks:
                 logger.warning("No relevant documents found")
-                return {
-                    'answer': "I couldn't find any relevant information to answer your question. Please try rephrasing or ask about a different topic.",
-                    'sources': [],
-                    'confidence': 0.0,
-                    'processing_time': time.time() - start_time,
-                    'steps': {
-                        'retrieval': {'status': 'no_results', 'chunks_found': 0},
-                        'augmentation': {'status': 'skipped', 'context_length': 0},
-                        'generation': {'status': 'skipped', 'tokens_used': 0}
-                    }
-                }
+                return self._no_results_result(start_time, cache_status)
             
             # Step 2: Augmentation
             logger.info("Step 2: Augmenting context")
+            step_start = time.time()
             context = self.augmentation.augment(retrieved_chunks, context_length)
+            augmentation_time = time.time() - step_start
             
             if not context.strip():
                 logger.warning("Failed to build context from retrieved chunks")
-                return {
-                    'answer': "I found some documents but couldn't build proper context. Please try a different question.",
-                    'sources': self._format_sources(retrieved_chunks),
-                    'confidence': 0.0,
-                    'processing_time': time.time() - start_time,
-                    'steps': {
-                        'retrieval': {'status': 'success', 'chunks_found': len(retrieved_chunks)},
-                        'augmentation': {'status': 'failed', 'context_length': 0},
-                        'generation': {'status': 'skipped', 'tokens_used': 0}
-                    }
-                }
+                return self._no_context_result(retrieved_chunks, start_time, cache_status)
             
             # Step 3: Generation
             logger.info("Step 3: Generating answer")
@@ -90,50 +119,319 @@ class RAGOrchestrator:
             # Calculate total processing time
             total_time = time.time() - start_time
             
-            # Prepare final result
-            result = {
-                'answer': generation_result['answer'],
-                'sources': self._format_sources(retrieved_chunks),
-                'confidence': generation_result.get('confidence', 0.0),
-                'processing_time': total_time,
-                'context_length': len(context),
-                'search_type': search_type,
-                'steps': {
-                    'retrieval': {
-                        'status': 'success',
-                        'chunks_found': len(retrieved_chunks),
-                        'time': 0.0  # Could be enhanced with timing
-                    },
-                    'augmentation': {
-                        'status': 'success',
-                        'context_length': len(context),
-                        'time': 0.0  # Could be enhanced with timing
-                    },
-                    'generation': {
-                        'status': 'success',
-                        'tokens_used': generation_result.get('tokens_used', 0),
-                        'time': generation_result.get('generation_time', 0.0)
-                    }
-                }
-            }
+            result = self._build_result(
+                generation_result, retrieved_chunks, context, search_type, cache_status,
+                retrieval_time, augmentation_time, total_time
+            )
+            if cache_key is not None and not generation_result.get('error'):
+                self._store_answer(
+                    cache_key, question, top_k, search_type, context_length, temperature, max_tokens,
+                    result, retrieved_chunks
+                )
             
             logger.info(f"RAG pipeline completed in {total_time:.3f}s")
             return result
             
         except Exception as e:
             logger.error(f"Error in RAG pipeline: {e}")
-            return {
-                'answer': f"Sorry, I encountered an error while processing your question: {str(e)}",
-                'sources': [],
-                'confidence': 0.0,
-                'processing_time': time.time() - start_time,
-                'error': str(e),
-                'steps': {
-                    'retrieval': {'status': 'error'},
-                    'augmentation': {'status': 'error'},
-                    'generation': {'status': 'error'}
-                }
+            return self._error_result(e, start_time)
+    
+    def ask_stream(self, question: str, top_k: int = 5, search_type: str = "hybrid",
+                   context_length: int = None, temperature: float = 0.7,
+                   max_tokens: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Complete RAG pipeline, streaming the answer as it is generated
+        
+        Args:
+            question: The user's question
+            top_k: Number of documents to retrieve
+            search_type: Type of search ("semantic", "keyword", "hybrid")
+            context_length: Maximum context length
+            temperature: Response creativity
+            max_tokens: Maximum response length
+            
+        Yields:
+            {'type': 'sources', ...} once retrieval is done, {'type': 'token', 'content': str}
+            per answer fragment, and a final {'type': 'done', ...} event with usage and timings
+            (or {'type': 'error', 'error': str})
+        """
+        start_time = time.time()
+        try:
+            logger.info(f"Starting streaming RAG pipeline for question: '{question[:50]}...'")
+            
+            # Step 0: Answer caches
+            cache_key, cache_status, cached = self._lookup_caches(
+                question, top_k, search_type, context_length, temperature, max_tokens
+            )
+            if cached is not None:
+                yield {'type': 'sources', 'sources': cached['sources']}
+                first_token = time.time() - start_time
+                yield {'type': 'token', 'content': cached['answer']}
+                yield self._done_event(cached, {}, {'time_to_first_token': first_token,
+                                                    'total': time.time() - start_time}, cache_status)
+                return
+            
+            # Step 1: Retrieval (sources are sent before generation starts)
+            step_start = time.time()
+            retrieved_chunks = self.retrieval.retrieve(question, top_k, search_type)
+            retrieval_time = time.time() - step_start
+            yield {'type': 'sources', 'sources': self._format_sources(retrieved_chunks), 'retrieval_time': retrieval_time}
+            
+            if not retrieved_chunks:
+                yield {'type': 'token', 'content': self.NO_RESULTS_ANSWER}
+                yield self._done_event({'answer': self.NO_RESULTS_ANSWER, 'confidence': 0.0}, {},
+                                       {'retrieval': retrieval_time, 'total': time.time() - start_time}, cache_status)
+                return
+            
+            # Step 2: Augmentation
+            step_start = time.time()
+            context = self.augmentation.augment(retrieved_chunks, context_length)
+            augmentation_time = time.time() - step_start
+            
+            if not context.strip():
+                yield {'type': 'token', 'content': self.NO_CONTEXT_ANSWER}
+                yield self._done_event({'answer': self.NO_CONTEXT_ANSWER, 'confidence': 0.0}, {},
+                                       {'retrieval': retrieval_time, 'augmentation': augmentation_time,
+                                        'total': time.time() - start_time}, cache_status)
+                return
+            
+            # Step 3: Generation
+            time_to_first_token = None
+            generation_result = None
+            for event in self.generation.generate_stream(question, context, temperature, max_tokens):
+                if event['type'] == 'token':
+                    if time_to_first_token is None:
+                        time_to_first_token = time.time() - start_time
+                    yield event
+                elif event['type'] == 'done':
+                    generation_result = event
+                else:
+                    yield event
+                    return
+            
+            total_time = time.time() - start_time
+            result = self._build_result(
+                generation_result, retrieved_chunks, context, search_type, cache_status,
+                retrieval_time, augmentation_time, total_time
+            )
+            if cache_key is not None:
+                self._store_answer(
+                    cache_key, question, top_k, search_type, context_length, temperature, max_tokens,
+                    result, retrieved_chunks
+                )
+            
+            logger.info(f"Streaming RAG pipeline completed in {total_time:.3f}s, "
+                        f"first token after {time_to_first_token or 0.0:.3f}s")
+            yield self._done_event(result, generation_result, {
+                'retrieval': retrieval_time,
+                'augmentation': augmentation_time,
+                'generation': generation_result.get('generation_time', 0.0),
+                'time_to_first_token': time_to_first_token,
+                'total': total_time
+            }, cache_status)
+            
+        except Exception as e:
+            logger.error(f"Error in streaming RAG pipeline: {e}")
+            yield {'type': 'error', 'error': str(e)}
+    
+    def _no_results_result(self, start_time: float, cache_status: Dict[str, Any]) -> Dict[str, Any]:
+        """ask() result when retrieval found nothing"""
+        return {
+            'answer': self.NO_RESULTS_ANSWER,
+            'sources': [],
+            'confidence': 0.0,
+            'processing_time': time.time() - start_time,
+            'steps': {
+                'retrieval': {'status': 'no_results', 'chunks_found': 0},
+                'augmentation': {'status': 'skipped', 'context_length': 0},
+                'generation': {'status': 'skipped', 'tokens_used': 0},
+                'cache': cache_status
+            }
+        }
+    
+    def _no_context_result(self, chunks: List[Dict[str, Any]], start_time: float,
+                           cache_status: Dict[str, Any]) -> Dict[str, Any]:
+        """ask() result when no context could be built from the retrieved chunks"""
+        return {
+            'answer': self.NO_CONTEXT_ANSWER,
+            'sources': self._format_sources(chunks),
+            'confidence': 0.0,
+            'processing_time': time.time() - start_time,
+            'steps': {
+                'retrieval': {'status': 'success', 'chunks_found': len(chunks)},
+                'augmentation': {'status': 'failed', 'context_length': 0},
+                'generation': {'status': 'skipped', 'tokens_used': 0},
+                'cache': cache_status
+            }
+        }
+    
+    @staticmethod
+    def _error_result(error: Exception, start_time: float) -> Dict[str, Any]:
+        """ask() result when the pipeline fails"""
+        return {
+            'answer': f"Sorry, I encountered an error while processing your question: {str(error)}",
+            'sources': [],
+            'confidence': 0.0,
+            'processing_time': time.time() - start_time,
+            'error': str(error),
+            'steps': {
+                'retrieval': {'status': 'error'},
+                'augmentation': {'status': 'error'},
+                'generation': {'status': 'error'}
             }
+        }
+    
+    def _build_result(self, generation_result: Dict[str, Any], chunks: List[Dict[str, Any]], context: str,
+                      search_type: str, cache_status: Dict[str, Any], retrieval_time: float,
+                      augmentation_time: float, total_time: float) -> Dict[str, Any]:
+        """Assemble the ask() result for a generated answer"""
+        return {
+            'answer': generation_result['answer'],
+            'sources': self._format_sources(chunks),
+            'confidence': generation_result.get('confidence', 0.0),
+            'processing_time': total_time,
+            'context_length': len(context),
+            'search_type': search_type,
+            'steps': {
+                'retrieval': {
+                    'status': 'success',
+                    'chunks_found': len(chunks),
+                    'time': retrieval_time
+                },
+                'augmentation': {
+                    'status': 'success',
+                    'context_length': len(context),
+                    'time': augmentation_time
+                },
+                'generation': {
+                    'status': 'success',
+                    'tokens_used': generation_result.get('tokens_used', 0),
+                    'time': generation_result.get('generation_time', 0.0)
+                },
+                'cache': cache_status
+            }
+        }
+    
+    @staticmethod
+    def _done_event(result: Dict[str, Any], generation_result: Dict[str, Any],
+                    timings: Dict[str, Any], cache_status: Dict[str, Any]) -> Dict[str, Any]:
+        """Final event of a streamed answer"""
+        return {
+            'type': 'done',
+            'answer': result['answer'],
+            'confidence': result.get('confidence', 0.0),
+            'usage': {
+                'tokens_used': generation_result.get('tokens_used', 0),
+                'prompt_tokens': generation_result.get('prompt_tokens', 0),
+                'completion_tokens': generation_result.get('completion_tokens', 0)
+            },
+            'timings': timings,
+            'cache': cache_status
+        }
+    
+    def _lookup_caches(self, question: str, top_k: int, search_type: str, context_length: Optional[int],
+                       temperature: float, max_tokens: int):
+        """
+        Look up the exact and then the semantic answer cache
+        
+        Returns:
+            (cache_key, status, cached_result) as for _answer_cache_lookup; a cached
+            result already carries the cache status in its steps
+        """
+        cache_key, cache_status, cached = self._answer_cache_lookup(
+            question, top_k, search_type, context_length, temperature, max_tokens
+        )
+        if cached is None and cache_key is not None and self.semantic_cache is not None:
+            cache_status, cached = self._semantic_cache_lookup(
+                self.retrieval.embed_query(question), cache_key,
+                top_k, search_type, context_length, temperature, max_tokens
+            )
+        return self._cache_lookup_result(cache_key, cache_status, cached)
+    
+    @staticmethod
+    def _cache_lookup_result(cache_key: Optional[str], cache_status: Dict[str, Any],
+                             cached: Optional[Dict[str, Any]]):
+        """Attach the cache status to a cached result"""
+        if cached is not None:
+            cached['steps'] = {**cached['steps'], 'cache': cache_status}
+            logger.info(f"Answer cache {cache_status['status']}")
+        return cache_key, cache_status, cached
+    
+    def _store_answer(self, cache_key: str, question: str, top_k: int, search_type: str,
+                      context_length: Optional[int], temperature: float, max_tokens: int,
+                      result: Dict[str, Any], chunks: List[Dict[str, Any]]):
+        """Add a generated answer to the exact and semantic caches"""
+        if self.answer_cache is not None:
+            self.answer_cache.put(cache_key, copy.deepcopy(result), cost_seconds=result['processing_time'])
+        if self.semantic_cache is not None:
+            self._semantic_cache_add(
+                self.retrieval.embed_query(question),
+                top_k, search_type, context_length, temperature, max_tokens, result, chunks
+            )
+    
+    def _answer_cache_lookup(self, question: str, top_k: int, search_type: str, context_length: Optional[int],
+                             temperature: float, max_tokens: int):
+        """
+        Look up a cached answer
+        
+        Returns:
+            (cache_key, status, cached_result): status['status'] is 'hit', 'miss', 'bypass'
+            (temperature too high to cache) or 'disabled'; cache_key is None when
+            the answer must not be cached
+        """
+        if self.answer_cache is None and self.semantic_cache is None:
+            return None, {'status': 'disabled'}, None
+        if temperature is None or temperature > RAGHyperparameters.ANSWER_CACHE_MAX_TEMPERATURE:
+            return None, {'status': 'bypass'}, None
+        
+        cache_key = make_key(
+            normalize_text(question), top_k, search_type, context_length,
+            temperature, max_tokens, self.index_generation.generation
+        )
+        if self.answer_cache is not None:
+            cached = self.answer_cache.get(cache_key)
+            if cached is not None:
+                return cache_key, {'status': 'hit'}, copy.deepcopy(cached)
+        return cache_key, {'status': 'miss'}, None
+    
+    @staticmethod
+    def _request_params_key(top_k: int, search_type: str, context_length: Optional[int],
+                            temperature: float, max_tokens: int) -> str:
+        """Key of the request parameters other than the question"""
+        return make_key(top_k, search_type, context_length, temperature, max_tokens)
+    
+    def _semantic_cache_lookup(self, embedding: List[float], cache_key: str, top_k: int, search_type: str,
+                               context_length: Optional[int], temperature: float, max_tokens: int):
+        """
+        Look up an answer to a paraphrase of the question; a hit is promoted into the exact cache
+        
+        Returns:
+            (status, cached_result): status is {'status': 'semantic_hit', 'similarity': float}
+            on a hit, otherwise {'status': 'miss', 'similarity': best similarity seen}
+        """
+        if not embedding:
+            return {'status': 'miss'}, None
+        
+        params = self._request_params_key(top_k, search_type, context_length, temperature, max_tokens)
+        cached, similarity = self.semantic_cache.lookup(embedding, params, self.index_generation.file_generation)
+        if cached is None:
+            return {'status': 'miss', 'similarity': similarity}, None
+        if self.answer_cache is not None:
+            self.answer_cache.put(cache_key, copy.deepcopy(cached))
+        return {'status': 'semantic_hit', 'similarity': similarity}, cached
+    
+    def _semantic_cache_add(self, embedding: List[float], top_k: int, search_type: str, context_length: Optional[int],
+                            temperature: float, max_tokens: int, result: Dict[str, Any],
+                            chunks: List[Dict[str, Any]]):
+        """Cache an answer for paraphrase lookups, tagged with its source files' generations"""
+        if not embedding:
+            return
+        files = {
+            chunk.get('filename', ''): self.index_generation.file_generation(chunk.get('filename', ''))
+            for chunk in chunks if chunk.get('filename')
+        }
+        params = self._request_params_key(top_k, search_type, context_length, temperature, max_tokens)
+        self.semantic_cache.add(embedding, params, result, files)
     
     def search_only(self, query: str, top_k: int = 5, search_type: str = "hybrid") -> List[Dict[str, Any]]:
         """
@@ -165,6 +463,10 @@ class RAGOrchestrator:
                 'retrieval': retrieval_stats,
                 'augmentation': augmentation_stats,
                 'generation': generation_stats,
+                'answer_cache': self.answer_cache.get_statistics() if self.answer_cache is not None else None,
+                'semantic_cache': self.semantic_cache.get_statistics() if self.semantic_cache is not None else None,
+                'index_generation': self.index_generation.generation,
+                'openai': get_openai_statistics(),
                 'pipeline': 'RAG with GPT-4'
             }
         except Exception as e:
@@ -236,6 +538,305 @@ class RAGOrchestrator:
             logger.error(f"Error validating pipeline: {e}")
             return {'error': str(e)}
 
+class AsyncRAGOrchestrator(RAGOrchestrator):
+    """Async RAG pipeline for the API: no blocking I/O on the event loop, bounded concurrency"""
+    
+    def __init__(self, max_concurrent_requests: Optional[int] = None):
+        """
+        Initialize the async RAG orchestrator
+        
+        Args:
+            max_concurrent_requests: Pipelines allowed to run at once; further requests wait
+                (defaults to MAX_CONCURRENT_REQUESTS)
+        """
+        super().__init__(retrieval=AsyncRetrievalComponent(), generation=AsyncGenerationComponent())
+        self.max_concurrent_requests = max_concurrent_requests or RAGHyperparameters.MAX_CONCURRENT_REQUESTS
+        self._limiter = None
+        
+        # Metrics
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_in_flight = 0
+    
+    @property
+    def limiter(self) -> asyncio.Semaphore:
+        """Concurrency limiter, created on first use so it binds to the running event loop"""
+        if self._limiter is None:
+            self._limiter = asyncio.Semaphore(self.max_concurrent_requests)
+        return self._limiter
+    
+    async def _acquire(self):
+        """Wait for a pipeline slot"""
+        self.waiting += 1
+        try:
+            await self.limiter.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+    
+    def _release(self):
+        """Free a pipeline slot"""
+        self.in_flight -= 1
+        self.limiter.release()
+    
+    async def ask(self, question: str, top_k: int = 5, search_type: str = "hybrid",
+                  context_length: int = None, temperature: float = 0.7,
+                  max_tokens: int = 500) -> Dict[str, Any]:
+        """
+        Complete RAG pipeline: Ask a question and get an answer
+        
+        Args:
+            question: The user's question
+            top_k: Number of documents to retrieve
+            search_type: Type of search ("semantic", "keyword", "hybrid")
+            context_length: Maximum context length
+            temperature: Response creativity
+            max_tokens: Maximum response length
+            
+        Returns:
+            Complete RAG result with answer and metadata
+        """
+        start_time = time.time()
+        await self._acquire()
+        try:
+            logger.info(f"Starting RAG pipeline for question: '{question[:50]}...'")
+            
+            # Step 0: Answer caches
+            cache_key, cache_status, cached = await self._lookup_caches(
+                question, top_k, search_type, context_length, temperature, max_tokens
+            )
+            if cached is not None:
+                cached['processing_time'] = time.time() - start_time
+                return cached
+            
+            # Step 1: Retrieval
+            step_start = time.time()
+            retrieved_chunks = await self.retrieval.retrieve(question, top_k, search_type)
+            retrieval_time = time.time() - step_start
+            
+            if not retrieved_chunks:
+                logger.warning("No relevant documents found")
+                return self._no_results_result(start_time, cache_status)
+            
+            # Step 2: Augmentation (CPU only, fast enough to run on the loop)
+            step_start = time.time()
+            context = self.augmentation.augment(retrieved_chunks, context_length)
+            augmentation_time = time.time() - step_start
+            
+            if not context.strip():
+                logger.warning("Failed to build context from retrieved chunks")
+                return self._no_context_result(retrieved_chunks, start_time, cache_status)
+            
+            # Step 3: Generation
+            generation_result = await self.generation.generate(question, context, temperature, max_tokens)
+            total_time = time.time() - start_time
+            
+            result = self._build_result(
+                generation_result, retrieved_chunks, context, search_type, cache_status,
+                retrieval_time, augmentation_time, total_time
+            )
+            if cache_key is not None and not generation_result.get('error'):
+                await self._store_answer(
+                    cache_key, question, top_k, search_type, context_length, temperature, max_tokens,
+                    result, retrieved_chunks
+                )
+            
+            logger.info(f"RAG pipeline completed in {total_time:.3f}s")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error in RAG pipeline: {e}")
+            return self._error_result(e, start_time)
+        finally:
+            self._release()
+    
+    async def ask_stream(self, question: str, top_k: int = 5, search_type: str = "hybrid",
+                         context_length: int = None, temperature: float = 0.7,
+                         max_tokens: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Complete RAG pipeline, streaming the answer as it is generated
+        
+        Args:
+            question: The user's question
+            top_k: Number of documents to retrieve
+            search_type: Type of search ("semantic", "keyword", "hybrid")
+            context_length: Maximum context length
+            temperature: Response creativity
+            max_tokens: Maximum response length
+            
+        Yields:
+            The same events as RAGOrchestrator.ask_stream
+        """
+        start_time = time.time()
+        await self._acquire()
+        try:
+            logger.info(f"Starting streaming RAG pipeline for question: '{question[:50]}...'")
+            
+            # Step 0: Answer caches
+            cache_key, cache_status, cached = await self._lookup_caches(
+                question, top_k, search_type, context_length, temperature, max_tokens
+            )
+            if cached is not None:
+                yield {'type': 'sources', 'sources': cached['sources']}
+                first_token = time.time() - start_time
+                yield {'type': 'token', 'content': cached['answer']}
+                yield self._done_event(cached, {}, {'time_to_first_token': first_token,
+                                                    'total': time.time() - start_time}, cache_status)
+                return
+            
+            # Step 1: Retrieval (sources are sent before generation starts)
+            step_start = time.time()
+            retrieved_chunks = await self.retrieval.retrieve(question, top_k, search_type)
+            retrieval_time = time.time() - step_start
+            yield {'type': 'sources', 'sources': self._format_sources(retrieved_chunks), 'retrieval_time': retrieval_time}
+            
+            if not retrieved_chunks:
+                yield {'type': 'token', 'content': self.NO_RESULTS_ANSWER}
+                yield self._done_event({'answer': self.NO_RESULTS_ANSWER, 'confidence': 0.0}, {},
+                                       {'retrieval': retrieval_time, 'total': time.time() - start_time}, cache_status)
+                return
+            
+            # Step 2: Augmentation
+            step_start = time.time()
+            context = self.augmentation.augment(retrieved_chunks, context_length)
+            augmentation_time = time.time() - step_start
+            
+            if not context.strip():
+                yield {'type': 'token', 'content': self.NO_CONTEXT_ANSWER}
+                yield self._done_event({'answer': self.NO_CONTEXT_ANSWER, 'confidence': 0.0}, {},
+                                       {'retrieval': retrieval_time, 'augmentation': augmentation_time,
+                                        'total': time.time() - start_time}, cache_status)
+                return
+            
+            # Step 3: Generation
+            time_to_first_token = None
+            generation_result = None
+            async for event in self.generation.generate_stream(question, context, temperature, max_tokens):
+                if event['type'] == 'token':
+                    if time_to_first_token is None:
+                        time_to_first_token = time.time() - start_time
+                    yield event
+                elif event['type'] == 'done':
+                    generation_result = event
+                else:
+                    yield event
+                    return
+            
+            total_time = time.time() - start_time
+            result = self._build_result(
+                generation_result, retrieved_chunks, context, search_type, cache_status,
+                retrieval_time, augmentation_time, total_time
+            )
+            if cache_key is not None:
+                await self._store_answer(
+                    cache_key, question, top_k, search_type, context_length, temperature, max_tokens,
+                    result, retrieved_chunks
+                )
+            
+            logger.info(f"Streaming RAG pipeline completed in {total_time:.3f}s, "
+                        f"first token after {time_to_first_token or 0.0:.3f}s")
+            yield self._done_event(result, generation_result, {
+                'retrieval': retrieval_time,
+                'augmentation': augmentation_time,
+                'generation': generation_result.get('generation_time', 0.0),
+                'time_to_first_token': time_to_first_token,
+                'total': total_time
+            }, cache_status)
+            
+        except Exception as e:
+            logger.error(f"Error in streaming RAG pipeline: {e}")
+            yield {'type': 'error', 'error': str(e)}
+        finally:
+            self._release()
+    
+    async def _lookup_caches(self, question: str, top_k: int, search_type: str, context_length: Optional[int],
+                             temperature: float, max_tokens: int):
+        """Look up the exact and then the semantic answer cache (see RAGOrchestrator._lookup_caches)"""
+        cache_key, cache_status, cached = self._answer_cache_lookup(
+            question, top_k, search_type, context_length, temperature, max_tokens
+        )
+        if cached is None and cache_key is not None and self.semantic_cache is not None:
+            cache_status, cached = self._semantic_cache_lookup(
+                await self.retrieval.embed_query(question), cache_key,
+                top_k, search_type, context_length, temperature, max_tokens
+            )
+        return self._cache_lookup_result(cache_key, cache_status, cached)
+    
+    async def _store_answer(self, cache_key: str, question: str, top_k: int, search_type: str,
+                            context_length: Optional[int], temperature: float, max_tokens: int,
+                            result: Dict[str, Any], chunks: List[Dict[str, Any]]):
+        """Add a generated answer to the exact and semantic caches"""
+        if self.answer_cache is not None:
+            self.answer_cache.put(cache_key, copy.deepcopy(result), cost_seconds=result['processing_time'])
+        if self.semantic_cache is not None:
+            self._semantic_cache_add(
+                await self.retrieval.embed_query(question),
+                top_k, search_type, context_length, temperature, max_tokens, result, chunks
+            )
+    
+    async def search_only(self, query: str, top_k: int = 5, search_type: str = "hybrid") -> List[Dict[str, Any]]:
+        """
+        Only perform retrieval (Step 1)
+        
+        Args:
+            query: Search query
+            top_k: Number of results
+            search_type: Type of search
+            
+        Returns:
+            List of retrieved chunks
+        """
+        await self._acquire()
+        try:
+            logger.info(f"Performing search-only for query: '{query}'")
+            return await self.retrieval.retrieve(query, top_k, search_type)
+        except Exception as e:
+            logger.error(f"Error in search-only: {e}")
+            return []
+        finally:
+            self._release()
+    
+    async def validate_pipeline(self) -> Dict[str, Any]:
+        """Validate that all components are working correctly"""
+        validation = {'retrieval': {'status': 'unknown'}, 'augmentation': {'status': 'unknown'},
+                      'generation': {'status': 'unknown'}}
+        
+        retrieval_stats = await asyncio.to_thread(self.retrieval.get_statistics)
+        if 'error' not in retrieval_stats:
+            validation['retrieval'] = {'status': 'healthy', 'total_docs': retrieval_stats.get('total_documents', 0)}
+        else:
+            validation['retrieval'] = {'status': 'error', 'error': retrieval_stats['error']}
+        
+        try:
+            self.augmentation.augment([], 100)
+            validation['augmentation'] = {'status': 'healthy'}
+        except Exception as e:
+            validation['augmentation'] = {'status': 'error', 'error': str(e)}
+        
+        test_result = await self.generation.generate("test", "test context", 0.7, 50)
+        validation['generation'] = {'status': 'error', 'error': test_result['error']} if test_result.get('error') else {'status': 'healthy'}
+        
+        all_healthy = all(comp['status'] == 'healthy' for comp in validation.values())
+        validation['overall'] = 'healthy' if all_healthy else 'error'
+        return validation
+    
+    def get_pipeline_statistics(self) -> Dict[str, Any]:
+        """Get statistics from all three components and the concurrency limiter"""
+        stats = super().get_pipeline_statistics()
+        stats['concurrency'] = {
+            'max_concurrent_requests': self.max_concurrent_requests,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'peak_in_flight': self.peak_in_flight
+        }
+        return stats
+    
+    async def close(self):
+        """Close the async clients"""
+        await self.retrieval.close()
+        await self.generation.close()
+
 # Example usage
 if __name__ == "__main__":
     # Initialize RAG orchestrator
@@ -7,37 +7,54 @@ Searches through document database to find relevant chunks
 import logging
 import time
 from typing import List, Dict, Any, Optional
-from azure.core.credentials import AzureKeyCredential
-from azure.search.documents import SearchClient
-from azure.search.documents.models import QueryType
-from openai import AzureOpenAI
+from openai import AzureOpenAI, AsyncAzureOpenAI
 from config import config
 from config.hyperparameters import RAGHyperparameters
 from docx import Document
 from pathlib import Path
 
+from .backends import SearchBackend, create_backend
+from .cache import TTLCache, normalize_text, make_key
+from .openai_gateway import get_gateway
+
 logger = logging.getLogger(__name__)
 
 class RetrievalComponent:
     """Step 1: Retrieves relevant documents from the database"""
     
-    def __init__(self):
-        """Initialize the retrieval component"""
-        # Initialize Azure Search client
-        self.search_client = SearchClient(
-            endpoint=config.Config.AZURE_SEARCH_ENDPOINT,
-            index_name=config.Config.AZURE_SEARCH_INDEX_NAME,
-            credential=AzureKeyCredential(config.Config.AZURE_SEARCH_KEY)
-        )
+    def __init__(self, backend: Optional[SearchBackend] = None):
+        """
+        Initialize the retrieval component
+        
+        Args:
+            backend: Search backend to query (defaults to the configured RETRIEVAL_BACKEND)
+        """
+        self.backend = backend or create_backend()
         
-        # Initialize OpenAI client for embeddings
+        # Initialize OpenAI client for embeddings (retries are left to the shared gateway)
         self.openai_client = AzureOpenAI(
             api_key=config.Config.AZURE_OPENAI_API_KEY,
             api_version=config.Config.AZURE_OPENAI_API_VERSION,
-            azure_endpoint=config.Config.AZURE_OPENAI_ENDPOINT
+            azure_endpoint=config.Config.AZURE_OPENAI_ENDPOINT,
+            max_retries=0
+        )
+        self.embedding_gateway = get_gateway(
+            config.Config.EMBEDDING_DEPLOYMENT_NAME,
+            RAGHyperparameters.EMBEDDING_REQUESTS_PER_MINUTE,
+            RAGHyperparameters.EMBEDDING_TOKENS_PER_MINUTE
         )
         
-        logger.info("Retrieval component initialized")
+        # Query embedding cache
+        self.embedding_cache = None
+        if RAGHyperparameters.CACHE_ENABLED:
+            self.embedding_cache = TTLCache(
+                max_entries=RAGHyperparameters.EMBEDDING_CACHE_MAX_ENTRIES,
+                ttl=RAGHyperparameters.CACHE_TTL,
+                persist_path=RAGHyperparameters.CACHE_PATH if RAGHyperparameters.CACHE_PERSIST else None,
+                name="query_embeddings"
+            )
+        
+        logger.info(f"Retrieval component initialized with {self.backend.name} backend")
     
     def retrieve(self, query: str, top_k: int = None, search_type: str = None) -> List[Dict[str, Any]]:
         """
@@ -62,9 +79,14 @@ class RetrievalComponent:
             start_time = time.time()
             logger.info(f"Retrieving documents for query: '{query}'")
             
-            # Force keyword search for all types
-            if search_type in ["semantic", "hybrid"]:
-                logger.warning(f"Vector/hybrid search requested, but index does not support vector search. Using keyword search instead.")
+            # Pick up newly ingested chunks before answering (and caching) against the index
+            self.backend.refresh()
+            
+            if search_type == "semantic":
+                results = self._semantic_search(query, top_k)
+            elif search_type == "hybrid":
+                results = self._hybrid_search(query, top_k)
+            else:
                 results = self._keyword_search(query, top_k)
             
             retrieval_time = time.time() - start_time
@@ -81,37 +103,22 @@ class RetrievalComponent:
         try:
             # Generate query embedding
             query_embedding = self._generate_embedding(query)
+            if not query_embedding:
+                logger.warning("Query embedding unavailable, falling back to keyword search")
+                return self._keyword_search(query, top_k)
             
-            # Perform vector search
-            search_results = self.search_client.search(
-                search_text=query,
-                vector_queries=[{
-                    "vector": query_embedding,
-                    "fields": "content_vector",
-                    "k": top_k,
-                    "kind": "vector"
-                }],
-                select=["id", "content", "filename", "chunk_index", "page_number", "chunk_type", "tags", "upload_date"],
-                top=top_k
-            )
-            
-            return self._process_search_results(search_results)
+            # Perform pure vector search
+            return self.backend.vector_search(query_embedding, top_k)
             
         except Exception as e:
-            logger.error(f"Error in semantic search: {e}")
-            return []
+            # Indexes that have not been migrated to vector search have no vector field
+            logger.warning(f"Vector search failed, falling back to keyword: {e}")
+            return self._keyword_search(query, top_k)
     
     def _keyword_search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
         """Keyword-based search"""
         try:
-            search_results = self.search_client.search(
-                search_text=query,
-                select=["id", "content", "filename", "chunk_index", "page_number", "chunk_type", "tags", "upload_date"],
-                top=top_k,
-                query_type=QueryType.SIMPLE
-            )
-            
-            return self._process_search_results(search_results)
+            return self.backend.keyword_search(query, top_k)
             
         except Exception as e:
             logger.error(f"Error in keyword search: {e}")
@@ -123,22 +130,12 @@ class RetrievalComponent:
             # Generate query embedding
             query_embedding = self._generate_embedding(query)
 
-            # Try vector search first
+            # Keyword and vector rankings fused by the backend
             try:
-                search_results = self.search_client.search(
-                    search_text=query,
-                    vector_queries=[{
-                        "vector": query_embedding,
-                        "fields": "content_vector",
-                        "k": top_k,
-                        "kind": "vector"
-                    }],
-                    select=["id", "content", "filename", "chunk_index", "page_number", "chunk_type", "tags", "upload_date"],
-                    top=top_k,
-                    query_type=QueryType.SIMPLE
-                )
+                if not query_embedding:
+                    raise ValueError("query embedding unavailable")
 
-                results = self._process_search_results(search_results)
+                results = self.backend.hybrid_search(query, query_embedding, top_k)
 
                 # If vector search found results, return them
                 if results:
@@ -156,30 +153,41 @@ class RetrievalComponent:
             logger.error(f"Error in hybrid search: {e}")
             return []
     
-    def _process_search_results(self, search_results) -> List[Dict[str, Any]]:
-        """Process search results into standardized format"""
-        results = []
-        for result in search_results:
-            results.append({
-                'content': result.get('content', ''),
-                'filename': result.get('filename', ''),
-                'chunk_index': result.get('chunk_index', 0),
-                'page_number': result.get('page_number', 0),
-                'chunk_type': result.get('chunk_type', 'text'),
-                'tags': result.get('tags', []),
-                'upload_date': result.get('upload_date', ''),
-                'score': result.get('@search.score', 0.0)
-            })
-        return results
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query with the same (cached) embedding used for retrieval
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Query embedding, or an empty list on failure
+        """
+        return self._generate_embedding(text)
     
     def _generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for text using Azure OpenAI"""
+        """Generate embedding for text using Azure OpenAI (cached per normalized query)"""
         try:
-            response = self.openai_client.embeddings.create(
-                model=config.Config.EMBEDDING_DEPLOYMENT_NAME,
-                input=text
+            cache_key = None
+            if self.embedding_cache is not None:
+                cache_key = make_key(config.Config.EMBEDDING_DEPLOYMENT_NAME, normalize_text(text))
+                cached = self.embedding_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
+            start_time = time.time()
+            response = self.embedding_gateway.call(
+                lambda: self.openai_client.embeddings.create(
+                    model=config.Config.EMBEDDING_DEPLOYMENT_NAME,
+                    input=text
+                ),
+                tokens=len(text) // RAGHyperparameters.CHARS_PER_TOKEN + 1
             )
-            return response.data[0].embedding
+            embedding = response.data[0].embedding
+            
+            if cache_key is not None:
+                self.embedding_cache.put(cache_key, embedding, cost_seconds=time.time() - start_time)
+            return embedding
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             return []
@@ -187,16 +195,168 @@ class RetrievalComponent:
     def get_statistics(self) -> Dict[str, Any]:
         """Get retrieval component statistics"""
         try:
-            total_docs = self.search_client.get_document_count()
-            return {
-                'total_documents': total_docs,
-                'search_service': 'Azure AI Search',
-                'index_name': config.Config.AZURE_SEARCH_INDEX_NAME
-            }
+            stats = self.backend.get_statistics()
+            stats['embedding_gateway'] = self.embedding_gateway.get_statistics()
+            if self.embedding_cache is not None:
+                stats['embedding_cache'] = self.embedding_cache.get_statistics()
+            return stats
         except Exception as e:
             logger.error(f"Error getting statistics: {e}")
             return {'error': str(e)} 
 
+class AsyncRetrievalComponent(RetrievalComponent):
+    """Step 1: Async retrieval, so searches and embedding calls do not block the event loop"""
+    
+    def __init__(self, backend: Optional[SearchBackend] = None):
+        """
+        Initialize the async retrieval component
+        
+        Args:
+            backend: Search backend to query (defaults to the configured RETRIEVAL_BACKEND)
+        """
+        super().__init__(backend)
+        
+        # Async OpenAI client for embeddings
+        self.async_openai_client = AsyncAzureOpenAI(
+            api_key=config.Config.AZURE_OPENAI_API_KEY,
+            api_version=config.Config.AZURE_OPENAI_API_VERSION,
+            azure_endpoint=config.Config.AZURE_OPENAI_ENDPOINT,
+            max_retries=0
+        )
+    
+    async def retrieve(self, query: str, top_k: int = None, search_type: str = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve relevant documents based on the query
+        
+        Args:
+            query: The search query
+            top_k: Number of results to retrieve
+            search_type: Type of search ("semantic", "keyword", "hybrid")
+            
+        Returns:
+            List of relevant document chunks
+        """
+        try:
+            # Use hyperparameters for defaults
+            top_k = top_k or RAGHyperparameters.DEFAULT_TOP_K
+            search_type = search_type or RAGHyperparameters.DEFAULT_SEARCH_TYPE
+            
+            # Validate parameters
+            top_k = min(top_k, RAGHyperparameters.MAX_TOP_K)
+            
+            start_time = time.time()
+            logger.info(f"Retrieving documents for query: '{query}'")
+            
+            # Pick up newly ingested chunks before answering (and caching) against the index
+            await self.backend.refresh_async()
+            
+            if search_type == "semantic":
+                results = await self._semantic_search(query, top_k)
+            elif search_type == "hybrid":
+                results = await self._hybrid_search(query, top_k)
+            else:
+                results = await self._keyword_search(query, top_k)
+            
+            retrieval_time = time.time() - start_time
+            logger.info(f"Retrieved {len(results)} documents in {retrieval_time:.3f}s")
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error in retrieval: {e}")
+            return []
+    
+    async def _semantic_search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Semantic search using vector similarity"""
+        try:
+            query_embedding = await self._generate_embedding(query)
+            if not query_embedding:
+                logger.warning("Query embedding unavailable, falling back to keyword search")
+                return await self._keyword_search(query, top_k)
+            
+            return await self.backend.vector_search_async(query_embedding, top_k)
+            
+        except Exception as e:
+            logger.warning(f"Vector search failed, falling back to keyword: {e}")
+            return await self._keyword_search(query, top_k)
+    
+    async def _keyword_search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Keyword-based search"""
+        try:
+            return await self.backend.keyword_search_async(query, top_k)
+            
+        except Exception as e:
+            logger.error(f"Error in keyword search: {e}")
+            return []
+    
+    async def _hybrid_search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Hybrid search combining vector and keyword search"""
+        try:
+            query_embedding = await self._generate_embedding(query)
+            
+            try:
+                if not query_embedding:
+                    raise ValueError("query embedding unavailable")
+                
+                results = await self.backend.hybrid_search_async(query, query_embedding, top_k)
+                if results:
+                    logger.info(f"Hybrid search (vector) found {len(results)} results")
+                    return results
+                
+            except Exception as vector_error:
+                logger.warning(f"Vector search failed, falling back to keyword: {vector_error}")
+            
+            logger.info("Falling back to keyword search for hybrid")
+            return await self._keyword_search(query, top_k)
+            
+        except Exception as e:
+            logger.error(f"Error in hybrid search: {e}")
+            return []
+    
+    async def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query with the same (cached) embedding used for retrieval
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Query embedding, or an empty list on failure
+        """
+        return await self._generate_embedding(text)
+    
+    async def _generate_embedding(self, text: str) -> List[float]:
+        """Generate embedding for text using Azure OpenAI (cached per normalized query)"""
+        try:
+            cache_key = None
+            if self.embedding_cache is not None:
+                cache_key = make_key(config.Config.EMBEDDING_DEPLOYMENT_NAME, normalize_text(text))
+                cached = self.embedding_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
+            start_time = time.time()
+            response = await self.embedding_gateway.call_async(
+                lambda: self.async_openai_client.embeddings.create(
+                    model=config.Config.EMBEDDING_DEPLOYMENT_NAME,
+                    input=text
+                ),
+                tokens=len(text) // RAGHyperparameters.CHARS_PER_TOKEN + 1
+            )
+            embedding = response.data[0].embedding
+            
+            if cache_key is not None:
+                self.embedding_cache.put(cache_key, embedding, cost_seconds=time.time() - start_time)
+            return embedding
+        except Exception as e:
+            logger.error(f"Error generating embedding: {e}")
+            return []
+    
+    async def close(self):
+        """Close the async clients"""
+        await self.async_openai_client.close()
+        await self.backend.close_async()
+
 def extract_content(self, file_path: Path) -> Dict[str, Any]:
     """Extract content from DOCX file"""
     try:
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Semantic Answer Cache
+Reuses answers for paraphrased questions by comparing question embeddings
+"""
+
+import copy
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class SemanticAnswerCache:
+    """Answers indexed by normalized question embedding, looked up by cosine similarity"""
+
+    def __init__(self, max_entries: int, threshold: float, ttl: float):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of cached answers before the least recently used is evicted
+            threshold: Minimum cosine similarity between questions for a hit
+            ttl: Seconds an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+
+        # One row per slot; the matrix is allocated when the first embedding fixes the dimension
+        self._vectors = None
+        self._expires_at = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._entries = [None] * max_entries  # {'params': str, 'result': dict, 'files': {filename: generation}}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _normalize(self, embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if vector.ndim != 1 or norm == 0:
+            return None
+        if self._vectors is not None and vector.shape[0] != self._vectors.shape[1]:
+            return None
+        return vector / norm
+
+    def _free(self, slot: int):
+        """Release a slot (caller holds the lock)"""
+        self._entries[slot] = None
+        self._expires_at[slot] = 0.0
+
+    def lookup(self, embedding: List[float], params: str,
+               file_generation: Callable[[str], int]) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Find a cached answer for a similar question
+
+        Args:
+            embedding: Question embedding
+            params: Key of the request parameters other than the question; only identical parameters match
+            file_generation: Returns the current ingestion generation of a source file
+
+        Returns:
+            (cached result or None, similarity of the best candidate)
+        """
+        vector = self._normalize(embedding)
+        with self._lock:
+            if vector is None or self._vectors is None:
+                self.misses += 1
+                return None, 0.0
+
+            now = time.time()
+            scores = self._vectors @ vector
+            scores[self._expires_at <= now] = -1.0
+
+            # Walk candidates above the threshold, best first, skipping other parameters and stale sources
+            for slot in np.argsort(-scores):
+                similarity = float(scores[slot])
+                if similarity < self.threshold:
+                    break
+
+                entry = self._entries[slot]
+                if entry is None or entry['params'] != params:
+                    continue
+                if any(file_generation(name) > generation for name, generation in entry['files'].items()):
+                    self._free(slot)
+                    self.invalidations += 1
+                    continue
+
+                self._last_used[slot] = now
+                self.hits += 1
+                return copy.deepcopy(entry['result']), similarity
+
+            self.misses += 1
+            return None, float(scores.max()) if len(scores) else 0.0
+
+    def add(self, embedding: List[float], params: str, result: Dict[str, Any], files: Dict[str, int]):
+        """
+        Cache an answer
+
+        Args:
+            embedding: Question embedding
+            params: Key of the request parameters other than the question
+            result: The answer result to return on later hits
+            files: Source filenames mapped to their ingestion generation when the answer was built
+        """
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+
+            now = time.time()
+            free = np.flatnonzero(self._expires_at <= now)
+            if len(free):
+                slot = int(free[0])
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+
+            self._vectors[slot] = vector
+            self._expires_at[slot] = now + self.ttl
+            self._last_used[slot] = now
+            self._entries[slot] = {'params': params, 'result': copy.deepcopy(result), 'files': dict(files)}
+
+    def invalidate_file(self, filename: str) -> int:
+        """
+        Drop every cached answer that used a file as a source
+
+        Args:
+            filename: Source filename
+
+        Returns:
+            Number of answers dropped
+        """
+        with self._lock:
+            dropped = 0
+            for slot, entry in enumerate(self._entries):
+                if entry is not None and filename in entry['files']:
+                    self._free(slot)
+                    dropped += 1
+            self.invalidations += dropped
+            return dropped
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            for slot in range(self.max_entries):
+                self._free(slot)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': int(np.count_nonzero(self._expires_at > time.time())),
+            'max_entries': self.max_entries,
+            'threshold': self.threshold,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'matrix_bytes': int(self._vectors.nbytes) if self._vectors is not None else 0
+        }